@@ -1,5 +1,5 @@
 import { NextResponse } from 'next/server';
-import { getAvailableCategories } from '@/lib/data/folder-loader';
+import { getAvailableCategories, loadCatalogueStats } from '@/lib/data/folder-loader';
 
 /**
  * GET /api/catalogue/categories
@@ -7,13 +7,18 @@ import { getAvailableCategories } from '@/lib/data/folder-loader';
  */
 export async function GET() {
   try {
-    const categories = await getAvailableCategories();
+    const [categories, stats] = await Promise.all([
+      getAvailableCategories(),
+      loadCatalogueStats(),
+    ]);
     
     return NextResponse.json({
       success: true,
       data: {
         categories,
         count: categories.length,
+        // Per-category thinker and work counts, when the stats artifact is built
+        ...(stats ? { details: stats.categories } : {}),
       },
     });
   } catch (error) {
@@ -1,5 +1,6 @@
 import { NextResponse } from 'next/server';
-import { loadAllThinkersMetadata } from '@/lib/data/folder-loader';
+import { loadAllThinkersMetadata, loadSearchIndex, loadThinkersMetadataByKeys } from '@/lib/data/folder-loader';
+import { findSearchCandidates } from '@/lib/data/search-index';
 
 /**
  * GET /api/catalogue/search
@@ -25,9 +26,13 @@ export async function GET(request: Request) {
       );
     }
     
-    const allThinkers = await loadAllThinkersMetadata();
-    
-    let results = allThinkers;
+    // Only thinkers whose n-gram postings cover the query are expanded and
+    // verified; without an index (or for queries under one n-gram) all are
+    const searchIndex = query ? await loadSearchIndex() : null;
+    const candidates = searchIndex ? findSearchCandidates(searchIndex, query) : null;
+    let results = candidates
+      ? await loadThinkersMetadataByKeys(candidates)
+      : await loadAllThinkersMetadata();
     
     // Filter by category if provided
     if (categoryFilter) {
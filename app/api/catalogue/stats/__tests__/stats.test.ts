@@ -70,6 +70,20 @@ describe('GET /api/catalogue/stats', () => {
     expect(marx.works).toBeGreaterThan(1000);
   });
 
+  it('should include precomputed histogram, subject and source breakdowns', async () => {
+    const request = new Request('http://localhost:3000/api/catalogue/stats');
+    const response = await GET(request);
+    const data = await response.json();
+
+    const histogramTotal = data.data.workCountHistogram.reduce(
+      (sum: number, band: { thinkers: number }) => sum + band.thinkers,
+      0
+    );
+    expect(histogramTotal).toBe(data.data.totalThinkers);
+    expect(data.data.subjects.length).toBeGreaterThan(0);
+    expect(data.data.sources.map((source: { sourceId: string }) => source.sourceId)).toContain('mia');
+  });
+
   it('should have valid timestamp', async () => {
     const request = new Request('http://localhost:3000/api/catalogue/stats');
     const response = await GET(request);
@@ -1,12 +1,43 @@
 import { NextResponse } from 'next/server';
-import { loadAllThinkersMetadata, loadCategoryIndex } from '@/lib/data/folder-loader';
+import {
+  loadAllThinkersMetadata,
+  loadCatalogueStats,
+  loadCategoryIndex,
+} from '@/lib/data/folder-loader';
 
 /**
  * GET /api/catalogue/stats
  * Returns statistics about the entire catalogue
+ *
+ * Served from the precomputed manifests/catalogue-stats.json when present,
+ * otherwise computed from the search manifest.
  */
 export async function GET() {
   try {
+    const stats = await loadCatalogueStats();
+    
+    if (stats) {
+      return NextResponse.json({
+        success: true,
+        data: {
+          totalThinkers: stats.totals.thinkers,
+          totalWorks: stats.totals.works,
+          totalCategories: stats.totals.categories,
+          totalSubjects: stats.totals.subjects,
+          averageWorksPerThinker: Math.round(stats.totals.works / stats.totals.thinkers),
+          topCategories: [...stats.categories]
+            .sort((a, b) => b.works - a.works)
+            .slice(0, 10)
+            .map(({ name, thinkers, works }) => ({ name, thinkers, works })),
+          mostProlificThinkers: stats.topThinkers.slice(0, 10),
+          workCountHistogram: stats.workCountHistogram,
+          subjects: stats.subjects,
+          sources: stats.sources,
+          lastUpdated: new Date().toISOString(),
+        },
+      });
+    }
+    
     const [thinkers, index] = await Promise.all([
       loadAllThinkersMetadata(),
       loadCategoryIndex(),
@@ -1,9 +1,16 @@
 import { NextResponse } from 'next/server';
-import { loadThinkerWorksBySubject } from '@/lib/data/folder-loader';
+import {
+  loadSubjectPageIndex,
+  loadThinkerWorksBySubject,
+  loadThinkerWorksPage,
+} from '@/lib/data/folder-loader';
 
 /**
  * GET /api/catalogue/thinkers/[category]/[name]/subjects/[subject]
  * Returns works for a specific thinker and subject
+ *
+ * Query parameters:
+ * - page: number - Return only this page (1-based) of a paginated subject
  */
 export async function GET(
   request: Request,
@@ -15,6 +22,30 @@ export async function GET(
     const name = decodeURIComponent(nameParam);
     const subject = decodeURIComponent(subjectParam);
     
+    const { searchParams } = new URL(request.url);
+    const page = parseInt(searchParams.get('page') || '', 10);
+    
+    if (page > 0) {
+      const [works, pageIndex] = await Promise.all([
+        loadThinkerWorksPage(category, name, subject, page),
+        loadSubjectPageIndex(category, name, subject),
+      ]);
+      
+      return NextResponse.json({
+        success: true,
+        data: {
+          category,
+          thinker: name,
+          subject,
+          works,
+          count: works.length,
+          page,
+          pages: pageIndex?.pages.length ?? 1,
+          total: pageIndex?.count ?? works.length,
+        },
+      });
+    }
+    
     const works = await loadThinkerWorksBySubject(category, name, subject);
     
     return NextResponse.json({
@@ -1,5 +1,6 @@
 import { render, screen } from "@testing-library/react";
 import type { Thinker } from "@/lib/types/thinker";
+import type { ThinkerGraphLayout } from "@/lib/visualizations/thinker-graph-layout";
 
 const mockThinkers: Thinker[] = [
   {
@@ -14,13 +15,35 @@ const mockThinkers: Thinker[] = [
   },
 ];
 
+const mockLayout: ThinkerGraphLayout = {
+  version: 1,
+  inputHash: "0123456789abcdef",
+  width: 960,
+  height: 640,
+  categories: ["First International"],
+  subjects: [],
+  nodes: { kind: [0], label: ["Karl Marx"], category: [0], works: [120], x: [480], y: [320] },
+  edges: { source: [], target: [], kind: [], weight: [], sharedSubjects: [], sharedRoots: [] },
+};
+const mockLoadThinkerGraphLayout = jest.fn(async (): Promise<ThinkerGraphLayout | null> => mockLayout);
+
 jest.mock("@/lib/data/folder-loader", () => ({
   loadAllThinkersMetadata: jest.fn(async () => mockThinkers),
+  loadThinkerGraphLayout: () => mockLoadThinkerGraphLayout(),
 }));
 
 jest.mock("@/components/visualizations/ThinkerExplorer", () => ({
-  ThinkerExplorer: ({ thinkers }: { thinkers: Thinker[] }) => (
-    <div data-testid="thinker-explorer">{thinkers.length}</div>
+  ThinkerExplorer: ({
+    thinkers,
+    layoutPositions,
+  }: {
+    thinkers: Thinker[];
+    layoutPositions?: Record<string, { x: number; y: number }>;
+  }) => (
+    <div data-testid="thinker-explorer">
+      {thinkers.length}
+      <span data-testid="layout-positions">{JSON.stringify(layoutPositions ?? null)}</span>
+    </div>
   ),
 }));
 
@@ -35,4 +58,21 @@ describe("/visualizations page", () => {
     expect(screen.getByRole("heading", { name: "Catalogue Connections" })).toBeInTheDocument();
     expect(screen.getByTestId("thinker-explorer")).toHaveTextContent("1");
   });
+
+  it("passes the precomputed graph layout to the explorer", async () => {
+    const pageModule = await import("@/app/visualizations/page");
+    render(await pageModule.default());
+
+    expect(screen.getByTestId("layout-positions")).toHaveTextContent(
+      JSON.stringify({ "First International::Karl Marx": { x: 480, y: 320 } })
+    );
+  });
+
+  it("falls back to the client-side layout when the graph manifest is missing", async () => {
+    mockLoadThinkerGraphLayout.mockResolvedValueOnce(null);
+    const pageModule = await import("@/app/visualizations/page");
+    render(await pageModule.default());
+
+    expect(screen.getByTestId("layout-positions")).toHaveTextContent("null");
+  });
 });
@@ -1,8 +1,10 @@
 import { ThinkerExplorer } from "@/components/visualizations/ThinkerExplorer";
-import { loadAllThinkersMetadata } from "@/lib/data/folder-loader";
+import { loadAllThinkersMetadata, loadThinkerGraphLayout } from "@/lib/data/folder-loader";
+import { thinkerLayoutPositions } from "@/lib/visualizations/thinker-graph-layout";
 
 export default async function VisualizationsPage() {
-  const thinkers = await loadAllThinkersMetadata();
+  const [thinkers, layout] = await Promise.all([loadAllThinkersMetadata(), loadThinkerGraphLayout()]);
+  const layoutPositions = layout ? thinkerLayoutPositions(layout) : undefined;
 
   return (
     <div className="min-h-screen bg-[linear-gradient(180deg,rgba(248,250,252,1),rgba(239,246,255,0.75)_28%,rgba(255,255,255,1))]">
@@ -23,7 +25,7 @@ export default async function VisualizationsPage() {
           </div>
         </header>
 
-        <ThinkerExplorer thinkers={thinkers} />
+        <ThinkerExplorer thinkers={thinkers} layoutPositions={layoutPositions} />
       </main>
     </div>
   );
@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { Thinker, Work } from "@/lib/types/thinker";
 import { Accordion, AccordionContent, AccordionItem, AccordionTrigger } from "@/components/ui/accordion";
-import { loadThinkerWorksBySubject } from "@/lib/data/folder-loader";
+import { loadThinkerWorksBySubject, loadThinkerWorksPage } from "@/lib/data/folder-loader";
 
 interface ThinkerWorksBySectionProps {
   thinker: Thinker;
@@ -12,6 +12,8 @@ interface ThinkerWorksBySectionProps {
 export function ThinkerWorksBySection({ thinker }: ThinkerWorksBySectionProps) {
   const [worksBySectionSearchQuery, setWorksBySectionSearchQuery] = useState("");
   const [thinkerWorksBySubjectData, setThinkerWorksBySubjectData] = useState<Record<string, Work[]>>({});
+  const [loadedPages, setLoadedPages] = useState<Record<string, number>>({});
+  const [loadingMore, setLoadingMore] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
 
   useEffect(() => {
@@ -20,16 +22,20 @@ export function ThinkerWorksBySection({ thinker }: ThinkerWorksBySectionProps) {
     async function fetchWorks() {
       if (!thinker?.name || !thinker.category || !thinker.subjects?.length) {
         setThinkerWorksBySubjectData({});
+        setLoadedPages({});
         setLoading(false);
         return;
       }
 
       setLoading(true);
 
+      // Paginated subjects only load their first page up front
       const worksBySubjectEntries = await Promise.all(
         thinker.subjects.map(async (subject) => [
           subject.name,
-          await loadThinkerWorksBySubject(thinker.category, thinker.name, subject.name),
+          subject.pages && subject.pages > 1
+            ? await loadThinkerWorksPage(thinker.category, thinker.name, subject.name, 1)
+            : await loadThinkerWorksBySubject(thinker.category, thinker.name, subject.name),
         ] as const)
       );
 
@@ -42,6 +48,9 @@ export function ThinkerWorksBySection({ thinker }: ThinkerWorksBySectionProps) {
           worksBySubjectEntries.filter(([, works]) => works.length > 0)
         )
       );
+      setLoadedPages(
+        Object.fromEntries(thinker.subjects.map((subject) => [subject.name, 1]))
+      );
       setLoading(false);
     }
 
@@ -52,6 +61,18 @@ export function ThinkerWorksBySection({ thinker }: ThinkerWorksBySectionProps) {
     };
   }, [thinker]);
 
+  async function loadNextPage(subjectName: string) {
+    const nextPage = (loadedPages[subjectName] ?? 1) + 1;
+    setLoadingMore(subjectName);
+    const works = await loadThinkerWorksPage(thinker.category, thinker.name, subjectName, nextPage);
+    setThinkerWorksBySubjectData((current) => ({
+      ...current,
+      [subjectName]: [...(current[subjectName] ?? []), ...works],
+    }));
+    setLoadedPages((current) => ({ ...current, [subjectName]: nextPage }));
+    setLoadingMore(null);
+  }
+
   if (loading) {
     return (
       <div className="bg-card border rounded-lg p-6">
@@ -109,7 +130,9 @@ export function ThinkerWorksBySection({ thinker }: ThinkerWorksBySectionProps) {
           const filteredSubjectWorks = works.filter(work => 
             work.title.toLowerCase().includes(worksBySectionSearchQuery.toLowerCase())
           );  
-          if (filteredSubjectWorks.length === 0) return null; // Don't render empty subjects
+          const totalPages = thinker.subjects?.find((s) => s.name === subject)?.pages ?? 1;
+          const hasMorePages = (loadedPages[subject] ?? 1) < totalPages;
+          if (filteredSubjectWorks.length === 0 && !hasMorePages) return null; // Don't render empty subjects
 
           return (
             <AccordionItem value={subject} key={subject}>
@@ -139,6 +162,18 @@ export function ThinkerWorksBySection({ thinker }: ThinkerWorksBySectionProps) {
                 ) : (
                   <p className="text-sm text-muted-foreground py-4 text-center">No works found in this section matching your filter.</p>
                 )}
+                {hasMorePages && (
+                  <button
+                    type="button"
+                    onClick={() => loadNextPage(subject)}
+                    disabled={loadingMore === subject}
+                    className="w-full p-2 rounded-lg border text-sm text-muted-foreground hover:bg-muted/50 transition-colors disabled:opacity-50"
+                  >
+                    {loadingMore === subject
+                      ? "Loading..."
+                      : `Load more (page ${(loadedPages[subject] ?? 1) + 1} of ${totalPages})`}
+                  </button>
+                )}
               </AccordionContent>
             </AccordionItem>
           );
@@ -6,16 +6,21 @@ import { CategoryThinkerGraph } from "@/components/visualizations/CategoryThinke
 import { ThinkerBubbleChart } from "@/components/visualizations/ThinkerBubbleChart";
 import { WorkCountDistributionChart } from "@/components/visualizations/WorkCountDistributionChart";
 import { OverviewNetworkGraph } from "@/components/visualizations/OverviewNetworkGraph";
+import { ThinkerNetworkGraph } from "@/components/visualizations/ThinkerNetworkGraph";
 import { categories as categoryMetadata } from "@/lib/data/categories";
 import {
   buildThinkerOverviewNetwork,
   getThinkersForOverviewSelection,
   type OverviewSelection,
 } from "@/lib/visualizations/thinker-overview";
+import { buildThinkerGraph } from "@/lib/visualizations/thinker-graph";
+import type { LayoutPosition } from "@/lib/visualizations/thinker-graph-layout";
 import { buildWorkCountBuckets } from "@/lib/visualizations/work-count-buckets";
 
 type ThinkerExplorerProps = {
   thinkers: Thinker[];
+  /** Offline force-layout coordinates for the connections view, keyed by thinker id. */
+  layoutPositions?: Record<string, LayoutPosition>;
 };
 
 type SubjectSummaryRow = {
@@ -375,11 +380,11 @@ function TemporalSeriesCard({
   );
 }
 
-export function ThinkerExplorer({ thinkers }: ThinkerExplorerProps) {
+export function ThinkerExplorer({ thinkers, layoutPositions }: ThinkerExplorerProps) {
   const [selection, setSelection] = useState<OverviewSelection | null>(null);
   const [searchQuery, setSearchQuery] = useState("");
   const [selectedThinkerId, setSelectedThinkerId] = useState<string | null>(null);
-  const [mainView, setMainView] = useState<"network" | "bubbles">("network");
+  const [mainView, setMainView] = useState<"network" | "connections" | "bubbles">("network");
 
   const overview = useMemo(
     () =>
@@ -414,6 +419,14 @@ export function ThinkerExplorer({ thinkers }: ThinkerExplorerProps) {
     const pool = selectionThinkers.length > 0 ? selectionThinkers : thinkers;
     return pool.find((thinker) => `${thinker.category}::${thinker.name}` === selectedThinkerId) ?? null;
   }, [selectedThinkerId, selectionThinkers, thinkers]);
+  const connectionGraph = useMemo(
+    () => (mainView === "connections" ? buildThinkerGraph(selection ? selectionThinkers : thinkers) : null),
+    [mainView, selection, selectionThinkers, thinkers]
+  );
+  const highlightedThinkerIds = useMemo(
+    () => searchResults.map((thinker) => `${thinker.category}::${thinker.name}`),
+    [searchResults]
+  );
   const selectionSubjectSummary = useMemo(
     () => buildSelectionSubjectSummary(selectionThinkers),
     [selectionThinkers]
@@ -609,6 +622,15 @@ export function ThinkerExplorer({ thinkers }: ThinkerExplorerProps) {
             >
               {selection?.type === "category" ? "List" : "Network"}
             </button>
+            <button
+              type="button"
+              onClick={() => setMainView("connections")}
+              className={`rounded-md px-3 py-1.5 text-xs font-medium transition ${
+                mainView === "connections" ? "bg-background text-foreground shadow-sm" : "text-muted-foreground hover:text-foreground"
+              }`}
+            >
+              Connections
+            </button>
             <button
               type="button"
               onClick={() => setMainView("bubbles")}
@@ -621,7 +643,18 @@ export function ThinkerExplorer({ thinkers }: ThinkerExplorerProps) {
           </div>
         </div>
         <div className="grid gap-5 xl:grid-cols-[minmax(0,1.72fr)_minmax(380px,0.82fr)]">
-          {mainView === "bubbles" ? (
+          {connectionGraph ? (
+            <ThinkerNetworkGraph
+              graph={connectionGraph}
+              mode="hybrid"
+              clusterLens="categories"
+              selectedNodeId={selectedThinkerId}
+              highlightedNodeIds={highlightedThinkerIds}
+              nodeSizeMetric="connections"
+              onSelectNode={setSelectedThinkerId}
+              positions={layoutPositions}
+            />
+          ) : mainView === "bubbles" ? (
             <ThinkerBubbleChart
               thinkers={selection ? selectionThinkers : thinkers}
               selectedThinkerId={selectedThinkerId}
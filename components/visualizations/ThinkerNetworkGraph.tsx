@@ -12,6 +12,7 @@ import type {
   ThinkerNodeSizeMetric,
 } from "@/lib/visualizations/thinker-graph";
 import { summarizeGraphClusters } from "@/lib/visualizations/thinker-graph";
+import type { LayoutPosition } from "@/lib/visualizations/thinker-graph-layout";
 
 type ThinkerNetworkGraphProps = {
   graph: ThinkerGraph;
@@ -21,6 +22,8 @@ type ThinkerNetworkGraphProps = {
   highlightedNodeIds: string[];
   nodeSizeMetric: ThinkerNodeSizeMetric;
   onSelectNode: (id: string) => void;
+  /** Precomputed coordinates (see thinkerLayoutPositions); skips the force simulation when every node has one. */
+  positions?: Record<string, LayoutPosition>;
 };
 
 type SimNode = ThinkerGraphNode & d3.SimulationNodeDatum;
@@ -69,6 +72,7 @@ export function ThinkerNetworkGraph({
   highlightedNodeIds,
   nodeSizeMetric,
   onSelectNode,
+  positions,
 }: ThinkerNetworkGraphProps) {
   const svgRef = useRef<SVGSVGElement | null>(null);
   const tooltipRef = useRef<HTMLDivElement | null>(null);
@@ -95,8 +99,15 @@ export function ThinkerNetworkGraph({
     const width = 960;
     const height = 640;
     const isSearching = highlightedSet.size > 0;
-    const simNodes = graph.nodes.map((node) => ({ ...node })) as SimNode[];
-    const simLinks = graph.links.map((link) => ({ ...link })) as SimLink[];
+    const simNodes = graph.nodes.map((node) => ({ ...node, ...positions?.[node.id] })) as SimNode[];
+    const precomputed = Boolean(positions) && graph.nodes.every((node) => positions?.[node.id]);
+    const nodeById = new Map(simNodes.map((node) => [node.id, node]));
+    // Resolve endpoints up front so links render without a simulation
+    const simLinks = graph.links.map((link) => ({
+      ...link,
+      source: nodeById.get(link.source) ?? link.source,
+      target: nodeById.get(link.target) ?? link.target,
+    })) as SimLink[];
     const container = svg.attr("viewBox", `0 0 ${width} ${height}`).append("g");
     const categories = Array.from(new Set(simNodes.map((node) => node.category))).sort((a, b) =>
       a.localeCompare(b)
@@ -120,8 +131,9 @@ export function ThinkerNetworkGraph({
     });
     svg.call(zoom);
 
-    const simulation = d3
-      .forceSimulation<SimNode>(simNodes)
+    let simulation: d3.Simulation<SimNode, SimLink> | null = null;
+    const createSimulation = () => d3
+      .forceSimulation<SimNode, SimLink>(simNodes)
       .force(
         "link",
         d3
@@ -144,7 +156,8 @@ export function ThinkerNetworkGraph({
           mode === "categories" ? 0.3 : 0.14
         )
       )
-      .force("collision", d3.forceCollide<SimNode>().radius((node) => getNodeRadius(node, nodeSizeMetric) + 6));
+      .force("collision", d3.forceCollide<SimNode>().radius((node) => getNodeRadius(node, nodeSizeMetric) + 6))
+      .on("tick", render);
 
     const linkSelection = container
       .append("g")
@@ -202,6 +215,8 @@ export function ThinkerNetworkGraph({
           .drag<SVGCircleElement, SimNode>()
           .on("start", (event: d3.D3DragEvent<SVGCircleElement, SimNode, SimNode>) => {
             if (!event.active) {
+              // A precomputed layout only starts a simulation once a node is dragged
+              simulation = simulation ?? createSimulation();
               simulation.alphaTarget(0.3).restart();
             }
             event.subject.fx = event.subject.x;
@@ -213,7 +228,7 @@ export function ThinkerNetworkGraph({
           })
           .on("end", (event: d3.D3DragEvent<SVGCircleElement, SimNode, SimNode>) => {
             if (!event.active) {
-              simulation.alphaTarget(0);
+              simulation?.alphaTarget(0);
             }
             event.subject.fx = null;
             event.subject.fy = null;
@@ -293,7 +308,7 @@ export function ThinkerNetworkGraph({
       .attr("fill", "#64748b")
       .style("opacity", clusterModeActive ? 1 : 0);
 
-    simulation.on("tick", () => {
+    const render = () => {
       linkSelection
         .attr("x1", (link: SimLink) => (link.source as SimNode).x ?? 0)
         .attr("y1", (link: SimLink) => (link.source as SimNode).y ?? 0)
@@ -361,13 +376,19 @@ export function ThinkerNetworkGraph({
         return 0;
       });
       clusterGroups.style("opacity", clusterModeActive ? 1 : 0);
-    });
+    };
+
+    if (precomputed) {
+      render();
+    } else {
+      simulation = createSimulation();
+    }
 
     return () => {
-      simulation.stop();
+      simulation?.stop();
       svg.selectAll("*").remove();
     };
-  }, [clusterLens, clusterModeActive, clusters, graph, highlightedSet, mode, nodeSizeMetric, onSelectNode, selectedNodeId]);
+  }, [clusterLens, clusterModeActive, clusters, graph, highlightedSet, mode, nodeSizeMetric, onSelectNode, positions, selectedNodeId]);
 
   return (
     <div className="relative overflow-hidden rounded-[1.5rem] border border-border/70 bg-[radial-gradient(circle_at_top,_rgba(15,118,110,0.12),_transparent_35%),linear-gradient(180deg,rgba(255,255,255,0.92),rgba(248,250,252,0.96))]">
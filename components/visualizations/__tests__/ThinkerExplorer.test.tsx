@@ -56,6 +56,21 @@ jest.mock("@/components/visualizations/CategoryThinkerGraph", () => ({
   ),
 }));
 
+jest.mock("@/components/visualizations/ThinkerNetworkGraph", () => ({
+  ThinkerNetworkGraph: ({
+    graph,
+    positions,
+  }: {
+    graph: { nodes: Array<{ id: string }> };
+    positions?: Record<string, { x: number; y: number }>;
+  }) => (
+    <div data-testid="thinker-network-graph">
+      <div data-testid="thinker-network-node-count">{graph.nodes.length}</div>
+      <div data-testid="thinker-network-positions">{Object.keys(positions ?? {}).join(",")}</div>
+    </div>
+  ),
+}));
+
 jest.mock("@/components/visualizations/WorkCountDistributionChart", () => ({
   WorkCountDistributionChart: ({ data }: { data: Array<{ label: string; value: number }> }) => (
     <div data-testid="distribution-chart">{data.length}</div>
@@ -147,6 +162,24 @@ describe("ThinkerExplorer", () => {
     });
   });
 
+  it("renders the thinker network with precomputed positions in the connections view", async () => {
+    render(
+      <ThinkerExplorer
+        thinkers={thinkers}
+        layoutPositions={{ "First International::Karl Marx": { x: 10, y: 20 } }}
+      />
+    );
+
+    expect(screen.queryByTestId("thinker-network-graph")).toBeNull();
+    fireEvent.click(screen.getByRole("button", { name: "Connections" }));
+
+    await waitFor(() => {
+      expect(screen.queryByTestId("overview-network")).toBeNull();
+      expect(screen.getByTestId("thinker-network-node-count")).toHaveTextContent("3");
+      expect(screen.getByTestId("thinker-network-positions")).toHaveTextContent("First International::Karl Marx");
+    });
+  });
+
   it("renders a category-to-thinkers drill-down graph when a category is selected", async () => {
     render(<ThinkerExplorer thinkers={thinkers} />);
 
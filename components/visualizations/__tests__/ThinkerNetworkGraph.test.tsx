@@ -0,0 +1,87 @@
+import { render } from "@testing-library/react";
+import * as d3 from "d3";
+import { ThinkerNetworkGraph } from "@/components/visualizations/ThinkerNetworkGraph";
+import type { ThinkerGraph, ThinkerGraphNode } from "@/lib/visualizations/thinker-graph";
+
+jest.mock("d3", () => {
+  const actual = jest.requireActual("d3");
+  return { ...actual, forceSimulation: jest.fn(actual.forceSimulation) };
+});
+
+function node(name: string, category: string): ThinkerGraphNode {
+  return {
+    id: `${category}::${name}`,
+    name,
+    category,
+    workCount: 10,
+    subjectCount: 1,
+    topSubjects: ["Economics"],
+    group: 0,
+    degree: 1,
+    bridgeScore: 0,
+    description: "",
+    allSubjects: [{ name: "Economics", count: 5 }],
+  };
+}
+
+const graph: ThinkerGraph = {
+  nodes: [node("Karl Marx", "First International"), node("Vladimir Lenin", "Bolsheviks")],
+  links: [
+    {
+      source: "First International::Karl Marx",
+      target: "Bolsheviks::Vladimir Lenin",
+      strength: 6,
+      primaryType: "subject",
+      reasons: [{ type: "subject", label: "Shared subject: Economics", value: 6 }],
+    },
+  ],
+};
+
+function renderGraph(positions?: Record<string, { x: number; y: number }>) {
+  return render(
+    <ThinkerNetworkGraph
+      graph={graph}
+      mode="hybrid"
+      clusterLens="categories"
+      selectedNodeId={null}
+      highlightedNodeIds={[]}
+      nodeSizeMetric="connections"
+      onSelectNode={() => {}}
+      positions={positions}
+    />
+  );
+}
+
+describe("ThinkerNetworkGraph", () => {
+  beforeEach(() => {
+    jest.mocked(d3.forceSimulation).mockClear();
+  });
+
+  it("draws precomputed positions without running the force simulation", () => {
+    const { container } = renderGraph({
+      "First International::Karl Marx": { x: 100, y: 200 },
+      "Bolsheviks::Vladimir Lenin": { x: 300, y: 400 },
+    });
+
+    expect(d3.forceSimulation).not.toHaveBeenCalled();
+    const circles = container.querySelectorAll("svg > g > g:nth-of-type(2) circle");
+    expect(Array.from(circles, (circle) => [circle.getAttribute("cx"), circle.getAttribute("cy")])).toEqual([
+      ["100", "200"],
+      ["300", "400"],
+    ]);
+    const line = container.querySelector("line");
+    expect([line?.getAttribute("x1"), line?.getAttribute("y2")]).toEqual(["100", "400"]);
+  });
+
+  it("runs the force simulation when a node has no precomputed position", () => {
+    renderGraph({ "First International::Karl Marx": { x: 100, y: 200 } });
+
+    expect(d3.forceSimulation).toHaveBeenCalledTimes(1);
+  });
+
+  it("runs the force simulation when no positions are given", () => {
+    renderGraph();
+
+    expect(d3.forceSimulation).toHaveBeenCalledTimes(1);
+  });
+});
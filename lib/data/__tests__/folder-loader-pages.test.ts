@@ -0,0 +1,64 @@
+import {
+  loadSubjectPageIndex,
+  loadThinkerWorksBySubject,
+  loadThinkerWorksPage,
+} from '../folder-loader';
+
+const pageIndex = {
+  subject: 'Letters',
+  count: 3,
+  pageSize: 2,
+  pages: [
+    { page: 1, count: 2, first: 'A', last: 'B' },
+    { page: 2, count: 1, first: 'C', last: 'C' },
+  ],
+};
+
+const files: Record<string, unknown> = {
+  '/data-v2/maoists/Mao%20Zedong/Letters/index.json': pageIndex,
+  '/data-v2/maoists/Mao%20Zedong/Letters/1.json': [
+    { title: 'A', url: 'https://example.org/a' },
+    { title: 'B', url: 'https://example.org/b' },
+  ],
+  '/data-v2/maoists/Mao%20Zedong/Letters/2.json': [
+    { title: 'C', url: 'https://example.org/c' },
+  ],
+  '/data-v2/maoists/Mao%20Zedong/General.json': [
+    { title: 'D', url: 'https://example.org/d' },
+  ],
+};
+
+describe('folder-loader paginated subjects', () => {
+  beforeEach(() => {
+    global.fetch = jest.fn(async (url: string) => ({
+      ok: url in files,
+      status: url in files ? 200 : 404,
+      json: async () => files[url],
+    })) as unknown as typeof fetch;
+  });
+
+  it('loads every page when the subject has no single file', async () => {
+    const works = await loadThinkerWorksBySubject('maoists', 'Mao Zedong', 'Letters');
+
+    expect(works.map((work) => work.title)).toEqual(['A', 'B', 'C']);
+  });
+
+  it('loads a single page of a paginated subject', async () => {
+    const works = await loadThinkerWorksPage('maoists', 'Mao Zedong', 'Letters', 2);
+
+    expect(works.map((work) => work.title)).toEqual(['C']);
+  });
+
+  it('treats a single-file subject as one page', async () => {
+    expect(await loadThinkerWorksPage('maoists', 'Mao Zedong', 'General', 1)).toHaveLength(1);
+    expect(await loadThinkerWorksPage('maoists', 'Mao Zedong', 'General', 2)).toEqual([]);
+    expect(await loadSubjectPageIndex('maoists', 'Mao Zedong', 'General')).toBeNull();
+  });
+
+  it('reads the page index', async () => {
+    const index = await loadSubjectPageIndex('maoists', 'Mao Zedong', 'Letters');
+
+    expect(index?.pages).toHaveLength(2);
+    expect(index?.count).toBe(3);
+  });
+});
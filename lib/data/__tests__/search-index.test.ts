@@ -0,0 +1,70 @@
+/**
+ * @jest-environment node
+ */
+import {
+  loadAllThinkersMetadata,
+  loadSearchIndex,
+  loadSearchManifest,
+  loadThinkersMetadataByKeys,
+} from '../folder-loader';
+import { decodePostings, findSearchCandidates, searchIndexKey, searchManifestHash } from '../search-index';
+
+describe('search index', () => {
+  it('decodes delta-encoded postings', () => {
+    expect(decodePostings([3, 1, 4])).toEqual([3, 4, 8]);
+    expect(decodePostings([])).toEqual([]);
+  });
+
+  it('returns null for queries shorter than one n-gram', async () => {
+    const index = await loadSearchIndex();
+
+    expect(index).toBeTruthy();
+    expect(findSearchCandidates(index!, 'ma')).toBeNull();
+  });
+
+  it('returns a superset of the thinkers matched by a full scan', async () => {
+    const index = await loadSearchIndex();
+    const thinkers = await loadAllThinkersMetadata();
+
+    for (const query of ['marx', 'anarch', 'political economy', 'zzzqx']) {
+      const candidates = findSearchCandidates(index!, query);
+      const matches = thinkers.filter((thinker) => thinker.searchText?.includes(query));
+
+      expect(candidates).not.toBeNull();
+      matches.forEach((thinker) => {
+        expect(candidates!.has(searchIndexKey(thinker.category, thinker.name))).toBe(true);
+      });
+    }
+  });
+
+  it('matches the hash of the current search manifest', async () => {
+    const index = await loadSearchIndex();
+    const manifest = await loadSearchManifest();
+
+    expect(index!.manifestHash).toBe(searchManifestHash(manifest));
+  });
+
+  it('changes the manifest hash when any search text changes', async () => {
+    const manifest = await loadSearchManifest();
+    const edited = manifest.map((thinker, position) =>
+      position === 0 ? { ...thinker, s: `${thinker.s} extra` } : thinker
+    );
+
+    expect(searchManifestHash(edited)).not.toBe(searchManifestHash(manifest));
+    expect(searchManifestHash([...manifest].reverse())).toBe(searchManifestHash(manifest));
+  });
+
+  it('expands only the requested thinkers, in manifest order', async () => {
+    const thinkers = await loadAllThinkersMetadata();
+    const [first, second] = thinkers;
+    const keys = [
+      searchIndexKey(second.category, second.name),
+      searchIndexKey('missing', 'Nobody'),
+      searchIndexKey(first.category, first.name),
+    ];
+
+    const expanded = await loadThinkersMetadataByKeys(keys);
+
+    expect(expanded.map((thinker) => thinker.name)).toEqual([first.name, second.name]);
+  });
+});
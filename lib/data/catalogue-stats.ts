@@ -0,0 +1,36 @@
+/**
+ * Shape of public/data-v2/manifests/catalogue-stats.json, written by
+ * scripts/python/build-catalogue-stats.py.
+ */
+
+export interface CategoryStats {
+  id: string;
+  name: string;
+  path: string;
+  thinkers: number;
+  thinkersWithWorks: number;
+  works: number;
+}
+
+export interface WorkCountBand {
+  label: string;
+  min: number;
+  max: number | null;
+  thinkers: number;
+}
+
+export interface CatalogueStats {
+  version: number;
+  totals: {
+    thinkers: number;
+    thinkersWithWorks: number;
+    works: number;
+    categories: number;
+    subjects: number;
+  };
+  categories: CategoryStats[];
+  workCountHistogram: WorkCountBand[];
+  subjects: { name: string; thinkers: number; works: number }[];
+  sources: { sourceId: string; works: number; thinkers: number }[];
+  topThinkers: { name: string; category: string; works: number }[];
+}
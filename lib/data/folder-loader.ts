@@ -1,6 +1,9 @@
 import categoryIndexData from '../../public/data-v2/index.json';
 import searchManifestData from '../../public/data-v2/manifests/search-manifest.json';
-import { SearchManifestThinker, Thinker, Work } from '../types/thinker';
+import { SearchManifestThinker, SubjectPageIndex, Thinker, Work } from '../types/thinker';
+import { CatalogueStats } from './catalogue-stats';
+import { SEARCH_INDEX_VERSION, SearchIndex, searchIndexKey, searchManifestHash } from './search-index';
+import { ThinkerGraphLayout } from '../visualizations/thinker-graph-layout';
 
 const DATA_BASE = '/data-v2';
 
@@ -97,6 +100,72 @@ export async function loadSearchManifest(): Promise<SearchManifestThinker[]> {
   return searchManifest;
 }
 
+let searchIndexPromise: Promise<SearchIndex | null> | null = null;
+
+/**
+ * Load the prebuilt postings index, or null if it is missing, in an older
+ * format, or was built from different search text than the current search
+ * manifest (its manifestHash no longer matches).
+ */
+export async function loadSearchIndex(): Promise<SearchIndex | null> {
+  if (!searchIndexPromise) {
+    searchIndexPromise = readDataJson<SearchIndex>('manifests/search-index.json')
+      .then((index) =>
+        index.version === SEARCH_INDEX_VERSION && index.manifestHash === searchManifestHash(searchManifest)
+          ? index
+          : null
+      )
+      .catch(() => null);
+  }
+  return searchIndexPromise;
+}
+
+let manifestPositions: Map<string, number> | null = null;
+
+/**
+ * Expand only the thinkers with the given searchIndexKey()s, in search
+ * manifest order. Unknown keys are skipped.
+ */
+export async function loadThinkersMetadataByKeys(keys: Iterable<string>): Promise<Thinker[]> {
+  if (!manifestPositions) {
+    manifestPositions = new Map(
+      searchManifest.map((thinker, position) => [searchIndexKey(thinker.c, thinker.n), position])
+    );
+  }
+  const positions: number[] = [];
+  for (const key of keys) {
+    const position = manifestPositions.get(key);
+    if (position !== undefined) {
+      positions.push(position);
+    }
+  }
+  return positions.sort((a, b) => a - b).map((position) => expandMetadata(searchManifest[position]));
+}
+
+let catalogueStatsPromise: Promise<CatalogueStats | null> | null = null;
+
+/**
+ * Load the precomputed catalogue statistics, or null if they have not been built.
+ */
+export async function loadCatalogueStats(): Promise<CatalogueStats | null> {
+  if (!catalogueStatsPromise) {
+    catalogueStatsPromise = readDataJson<CatalogueStats>('manifests/catalogue-stats.json').catch(() => null);
+  }
+  return catalogueStatsPromise;
+}
+
+let thinkerGraphLayoutPromise: Promise<ThinkerGraphLayout | null> | null = null;
+
+/**
+ * Load the precomputed thinker graph and layout, or null if it has not been built.
+ */
+export async function loadThinkerGraphLayout(): Promise<ThinkerGraphLayout | null> {
+  if (!thinkerGraphLayoutPromise) {
+    thinkerGraphLayoutPromise = readDataJson<ThinkerGraphLayout>('manifests/thinker-graph.json').catch(() => null);
+  }
+  return thinkerGraphLayoutPromise;
+}
+
 export async function loadCategoryMetadata(category: string): Promise<SearchManifestThinker[]> {
   const categoryPath = await getCategoryPath(category);
   return searchManifest.filter(
@@ -133,22 +202,83 @@ export async function loadThinkerManifest(
   }
 }
 
+function isMissingFileError(error: unknown): boolean {
+  const message = error instanceof Error ? error.message : String(error);
+  return message.includes('ENOENT') || message.includes('Failed to load');
+}
+
+async function getSubjectPath(category: string, thinkerName: string, subject: string): Promise<string> {
+  const categoryPath = await getCategoryPath(category);
+  return `${categoryPath}/${sanitizePath(thinkerName)}/${sanitizePath(subject)}`;
+}
+
+export async function loadSubjectPageIndex(
+  category: string,
+  thinkerName: string,
+  subject: string
+): Promise<SubjectPageIndex | null> {
+  try {
+    const subjectPath = await getSubjectPath(category, thinkerName, subject);
+    return await readDataJson<SubjectPageIndex>(`${subjectPath}/index.json`);
+  } catch (error) {
+    if (!isMissingFileError(error)) {
+      console.error(`Failed to load page index for ${thinkerName} - ${subject}:`, error);
+    }
+    return null;
+  }
+}
+
+/**
+ * Load one page (1-based) of a paginated subject. Subjects stored as a single
+ * file have exactly one page.
+ */
+export async function loadThinkerWorksPage(
+  category: string,
+  thinkerName: string,
+  subject: string,
+  page: number
+): Promise<Work[]> {
+  const subjectPath = await getSubjectPath(category, thinkerName, subject);
+
+  try {
+    return await readDataJson<Work[]>(`${subjectPath}/${page}.json`);
+  } catch (error) {
+    if (!isMissingFileError(error)) {
+      console.error(`Failed to load page ${page} of ${thinkerName} - ${subject}:`, error);
+      return [];
+    }
+  }
+
+  return page === 1 ? loadThinkerWorksBySubject(category, thinkerName, subject) : [];
+}
+
 export async function loadThinkerWorksBySubject(
   category: string,
   thinkerName: string,
   subject: string
 ): Promise<Work[]> {
   try {
-    const categoryPath = await getCategoryPath(category);
-    const relativePath = `${categoryPath}/${sanitizePath(thinkerName)}/${sanitizePath(subject)}.json`;
-    return await readDataJson<Work[]>(relativePath);
+    const subjectPath = await getSubjectPath(category, thinkerName, subject);
+    return await readDataJson<Work[]>(`${subjectPath}.json`);
   } catch (error) {
-    const message = error instanceof Error ? error.message : String(error);
-    if (!message.includes('ENOENT') && !message.includes('Failed to load')) {
+    if (!isMissingFileError(error)) {
       console.error(`Failed to load works for ${thinkerName} - ${subject}:`, error);
+      return [];
     }
+  }
+
+  const pageIndex = await loadSubjectPageIndex(category, thinkerName, subject);
+  if (!pageIndex) {
     return [];
   }
+
+  const subjectPath = await getSubjectPath(category, thinkerName, subject);
+  const pages = await Promise.all(
+    pageIndex.pages.map(({ page }) =>
+      readDataJson<Work[]>(`${subjectPath}/${page}.json`).catch(() => [] as Work[])
+    )
+  );
+  return pages.flat();
 }
 
 export async function loadThinkerWorks(
@@ -202,6 +332,9 @@ export async function getThinkerSubjects(category: string, thinkerName: string):
 
 export function clearCache(): void {
   categoryPathCache.clear();
+  searchIndexPromise = null;
+  catalogueStatsPromise = null;
+  thinkerGraphLayoutPromise = null;
 }
 
 export function getCacheStats(): { cachedCategories: number; manifestEntries: number } {
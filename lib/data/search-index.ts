@@ -0,0 +1,92 @@
+/**
+ * Lookups against the prebuilt postings index written by
+ * scripts/python/build-search-index.py (public/data-v2/manifests/search-index.json).
+ */
+import { SearchManifestThinker } from '../types/thinker';
+
+export const SEARCH_INDEX_VERSION = 2;
+
+const FNV_OFFSET = 0x811c9dc5;
+const FNV_PRIME = 0x01000193;
+
+export interface SearchIndex {
+  version: number;
+  ngramSize: number;
+  /** searchManifestHash() of the thinkers the index was built from */
+  manifestHash: string;
+  /** [category, name] per document id */
+  docs: [string, string][];
+  /** Delta-encoded postings lists keyed by character n-gram */
+  ngrams: Record<string, number[]>;
+}
+
+export function searchIndexKey(category: string, name: string): string {
+  return `${category}\u0000${name}`;
+}
+
+function fnv1a(bytes: Uint8Array): number {
+  let value = FNV_OFFSET;
+  for (const byte of bytes) {
+    value = Math.imul(value ^ byte, FNV_PRIME) >>> 0;
+  }
+  return value;
+}
+
+/**
+ * Order-independent hash of every thinker's category, name and search text;
+ * mirrors manifest_hash() in scripts/python/build-search-index.py.
+ */
+export function searchManifestHash(manifest: SearchManifestThinker[]): string {
+  const encoder = new TextEncoder();
+  let total = 0;
+  for (const thinker of manifest) {
+    const key = [thinker.c ?? '', thinker.n, thinker.s ?? ''].join('\u0000');
+    total = (total + fnv1a(encoder.encode(key))) >>> 0;
+  }
+  return total.toString(16).padStart(8, '0');
+}
+
+export function decodePostings(gaps: number[]): number[] {
+  const ids: number[] = [];
+  let total = 0;
+  for (const gap of gaps) {
+    total += gap;
+    ids.push(total);
+  }
+  return ids;
+}
+
+/**
+ * Return the keys of thinkers whose search text may contain `query`, or null
+ * when the query is shorter than one n-gram and the index cannot narrow it.
+ * Candidates are a superset of the real matches and still need verifying.
+ */
+export function findSearchCandidates(index: SearchIndex, query: string): Set<string> | null {
+  const normalized = query.toLowerCase();
+  const size = index.ngramSize;
+  if (normalized.length < size) {
+    return null;
+  }
+
+  let candidates: Set<number> | null = null;
+  for (let start = 0; start + size <= normalized.length; start++) {
+    const postings = index.ngrams[normalized.slice(start, start + size)];
+    if (!postings) {
+      return new Set();
+    }
+    const ids = decodePostings(postings);
+    candidates = candidates === null
+      ? new Set(ids)
+      : new Set(ids.filter((id) => candidates!.has(id)));
+    if (candidates.size === 0) {
+      break;
+    }
+  }
+
+  const keys = new Set<string>();
+  for (const id of candidates ?? []) {
+    const [category, name] = index.docs[id];
+    keys.add(searchIndexKey(category, name));
+  }
+  return keys;
+}
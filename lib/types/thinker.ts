@@ -27,6 +27,15 @@ export interface Thinker {
 export interface SubjectSummary {
   name: string;
   count: number;
+  pages?: number; // Set when the subject is split into <Subject>/<page>.json files
+}
+
+// <Thinker>/<Subject>/index.json for paginated subjects
+export interface SubjectPageIndex {
+  subject: string;
+  count: number;
+  pageSize: number;
+  pages: { page: number; count: number; first: string; last: string }[];
 }
 
 // Lightweight metadata for initial bundle (works loaded separately)
@@ -0,0 +1,46 @@
+import {
+  LAYOUT_EDGE_KIND,
+  LAYOUT_NODE_KIND,
+  thinkerLayoutPositions,
+  type ThinkerGraphLayout,
+} from "@/lib/visualizations/thinker-graph-layout";
+
+const layout: ThinkerGraphLayout = {
+  version: 1,
+  inputHash: "0123456789abcdef",
+  width: 960,
+  height: 640,
+  categories: ["Anarchists", "Bolsheviks"],
+  subjects: ["Economics"],
+  nodes: {
+    kind: [
+      LAYOUT_NODE_KIND.thinker,
+      LAYOUT_NODE_KIND.thinker,
+      LAYOUT_NODE_KIND.category,
+      LAYOUT_NODE_KIND.category,
+      LAYOUT_NODE_KIND.subject,
+    ],
+    label: ["Emma Goldman", "Vladimir Lenin", "Anarchists", "Bolsheviks", "Economics"],
+    category: [0, 1, 0, 1, -1],
+    works: [12, 900, 12, 900, 40],
+    x: [100, 800, 120, 780, 480],
+    y: [200, 300, 210, 310, 320],
+  },
+  edges: {
+    source: [0, 1, 0],
+    target: [2, 3, 1],
+    kind: [LAYOUT_EDGE_KIND.membership, LAYOUT_EDGE_KIND.membership, LAYOUT_EDGE_KIND.thinker],
+    weight: [1, 1, 4],
+    sharedSubjects: [0, 0, 1],
+    sharedRoots: [0, 0, 0],
+  },
+};
+
+describe("thinkerLayoutPositions", () => {
+  it("keys thinker coordinates by graph node id and skips other node kinds", () => {
+    expect(thinkerLayoutPositions(layout)).toEqual({
+      "Anarchists::Emma Goldman": { x: 100, y: 200 },
+      "Bolsheviks::Vladimir Lenin": { x: 800, y: 300 },
+    });
+  });
+});
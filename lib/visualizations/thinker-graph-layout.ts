@@ -0,0 +1,57 @@
+/**
+ * Shape of public/data-v2/manifests/thinker-graph.json, written by
+ * scripts/python/build-thinker-graph.py: the thinker–category–subject graph
+ * with force-layout coordinates already computed in a 960×640 viewport.
+ */
+
+export const LAYOUT_NODE_KIND = { thinker: 0, category: 1, subject: 2 } as const;
+export const LAYOUT_EDGE_KIND = { membership: 0, subject: 1, thinker: 2 } as const;
+
+export interface ThinkerGraphLayout {
+  version: number;
+  inputHash: string;
+  width: number;
+  height: number;
+  categories: string[];
+  subjects: string[];
+  nodes: {
+    kind: number[];
+    label: string[];
+    category: number[];
+    works: number[];
+    x: number[];
+    y: number[];
+  };
+  edges: {
+    source: number[];
+    target: number[];
+    kind: number[];
+    weight: number[];
+    sharedSubjects: number[];
+    sharedRoots: number[];
+  };
+}
+
+export type LayoutPosition = { x: number; y: number };
+
+/**
+ * Precomputed thinker coordinates keyed like ThinkerGraphNode ids
+ * (`${category}::${name}`). A plain object so it can cross the server/client
+ * component boundary.
+ */
+export function thinkerLayoutPositions(layout: ThinkerGraphLayout): Record<string, LayoutPosition> {
+  const positions: Record<string, LayoutPosition> = {};
+  const { nodes, categories } = layout;
+
+  nodes.kind.forEach((kind, index) => {
+    if (kind !== LAYOUT_NODE_KIND.thinker) {
+      return;
+    }
+    positions[`${categories[nodes.category[index]]}::${nodes.label[index]}`] = {
+      x: nodes.x[index],
+      y: nodes.y[index],
+    };
+  });
+
+  return positions;
+}
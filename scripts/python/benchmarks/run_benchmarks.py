@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the hot paths of the harvest and data pipelines.
+
+Nothing here touches the network. The HTML parsers run against the
+snapshots in benchmarks/fixtures/ (index pages in each site's markup, filled
+with names and URLs from the dataset); everything else runs against the
+real public/data-v2 tree and data/zero-works-harvest.
+
+    mia_author_lookup        AuthorIndexMapper.build_author_lookup  (map_zero_work_sources)
+    redtexts_index           parse_redtexts_index                   (map_redtexts_sources)
+    anarchist_library_index  parse_author_listing                   (map_anarchist_library)
+    mao_sections             collect_sections                       (fetch_mao_selected_works)
+    candidate_work_filter    WorkHarvester._is_candidate_work       (harvest_zero_work_thinkers)
+    merge_payloads           merge_payloads                         (merge_harvest_sources)
+    build_register           build_register                         (util/build_source_register)
+    augment_with_dataset     augment_with_dataset                   (util/build_source_register)
+    gather_metadata          gather_metadata                        (util/generate_work_coverage_audit)
+
+Each benchmark is run --repeat times after one warm-up call, with inputs
+prepared outside the timed region, and the median is compared to
+benchmarks/baseline.json. A benchmark whose median is more than
+--tolerance slower than its baseline (and by more than MIN_REGRESSION_SECONDS)
+fails the run with exit status 1.
+
+The memoized URL and name helpers (MEMOIZED_HELPERS) are cleared after
+every setup(), so each timed run starts as cold as a fresh pipeline
+process instead of reusing what the warm-up or earlier runs cached.
+
+Baselines only mean something on the machine that recorded them; refresh
+them after an intentional change or on a new machine with --update-baseline.
+
+Usage:
+    python scripts/python/benchmarks/run_benchmarks.py
+    python scripts/python/benchmarks/run_benchmarks.py --only merge_payloads build_register
+    python scripts/python/benchmarks/run_benchmarks.py --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrapers.fetch_mao_selected_works import collect_sections  # noqa: E402
+from scrapers.harvest_zero_work_thinkers import WorkHarvester  # noqa: E402
+from scrapers.map_anarchist_library import parse_author_listing  # noqa: E402
+from scrapers.map_redtexts_sources import parse_redtexts_index  # noqa: E402
+from scrapers.map_zero_work_sources import AuthorIndexMapper  # noqa: E402
+from scrapers.merge_harvest_sources import iter_thinker_groups, merge_payloads  # noqa: E402
+from util.build_source_register import _normalize_works_root, augment_with_dataset, build_register  # noqa: E402
+from util.generate_work_coverage_audit import gather_metadata  # noqa: E402
+from util.names import canonical_key, normalize_name  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.urls import canonicalize_url, url_equivalence_key  # noqa: E402
+from util.works_pages import iter_subject_works  # noqa: E402
+
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+FIXTURE_DIR = BENCHMARK_DIR / "fixtures"
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+BASELINE_VERSION = 1
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.5
+# Differences below this are timer noise, however large they are relative to the baseline
+MIN_REGRESSION_SECONDS = 0.005
+MERGE_SOURCES = ("mia", "redtexts", "anarchist_library", "goldman_archive")
+# lru_cache'd helpers whose contents depend on the data being processed
+MEMOIZED_HELPERS = (_normalize_works_root, canonical_key, normalize_name, canonicalize_url, url_equivalence_key)
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Tuple[object, ...]]
+    run: Callable[..., object]
+    # Expensive benchmarks can cap the repeat count
+    max_repeat: Optional[int] = None
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURE_DIR / name).read_text(encoding="utf-8")
+
+
+def _candidate_work_inputs(data_dir: Path) -> List[Tuple[str, str, int, str, str]]:
+    """(url, title, depth, source_root, source_url) for every work in data-v2.
+
+    The landing page stands in for the one the harvester would start from:
+    the index.htm of the directory holding the thinker's first work.
+    """
+    inputs = []
+    for collection_dir in sorted(path for path in data_dir.iterdir() if path.is_dir()):
+        for thinker_dir in sorted(path for path in collection_dir.iterdir() if path.is_dir()):
+            works = [work for _, subject_works in iter_subject_works(thinker_dir) for work in subject_works]
+            urls = [str(work.get("url") or "") for work in works]
+            if not urls or not urls[0]:
+                continue
+            source_url = urls[0].rsplit("/", 1)[0] + "/index.htm"
+            source_root = WorkHarvester._get_author_root(source_url)
+            for position, (work, url) in enumerate(zip(works, urls)):
+                inputs.append((url, str(work.get("title") or ""), position % 3, source_root, source_url))
+    return inputs
+
+
+def _check_candidate_works(harvester: WorkHarvester, inputs: List[Tuple[str, str, int, str, str]]) -> int:
+    return sum(1 for arguments in inputs if harvester._is_candidate_work(*arguments))
+
+
+def _harvest_groups(harvest_dir: Path) -> List[List[dict]]:
+    groups = []
+    for _, paths in iter_thinker_groups([harvest_dir / source for source in MERGE_SOURCES]):
+        groups.append([json.loads(path.read_text(encoding="utf-8")) for path in paths])
+    return groups
+
+
+def _merge_all(groups: List[List[dict]]) -> int:
+    return sum(len(merge_payloads(payloads)["works"]) for payloads in groups)
+
+
+def build_benchmarks(data_dir: Path, harvest_dir: Path) -> List[Benchmark]:
+    mapper = AuthorIndexMapper()
+    harvester = WorkHarvester()
+    return [
+        Benchmark(
+            "mia_author_lookup",
+            lambda: (BeautifulSoup(_fixture("mia-archive-index.html"), "html.parser"),),
+            mapper.build_author_lookup,
+        ),
+        Benchmark(
+            "redtexts_index",
+            lambda: (_fixture("redtexts-index.html"), "https://redtexts.org/"),
+            parse_redtexts_index,
+        ),
+        Benchmark(
+            "anarchist_library_index",
+            lambda: (_fixture("anarchist-library-authors.html"), "https://theanarchistlibrary.org"),
+            parse_author_listing,
+        ),
+        Benchmark(
+            "mao_sections",
+            lambda: (BeautifulSoup(_fixture("mao-date-index.html"), "html.parser"),),
+            collect_sections,
+        ),
+        Benchmark(
+            "candidate_work_filter",
+            lambda: (harvester, _candidate_work_inputs(data_dir)),
+            _check_candidate_works,
+        ),
+        Benchmark("merge_payloads", lambda: (_harvest_groups(harvest_dir),), _merge_all),
+        Benchmark("build_register", lambda: (harvest_dir,), build_register),
+        Benchmark(
+            "augment_with_dataset",
+            lambda: (build_register(harvest_dir), data_dir),
+            augment_with_dataset,
+            max_repeat=3,
+        ),
+        Benchmark("gather_metadata", lambda: (data_dir,), gather_metadata),
+    ]
+
+
+def clear_memoized_helpers() -> None:
+    for helper in MEMOIZED_HELPERS:
+        helper.cache_clear()
+
+
+def measure(benchmark: Benchmark, repeat: int) -> Dict[str, float]:
+    """Median and min wall time of benchmark.run over fresh setup() inputs and cold caches."""
+    if benchmark.max_repeat:
+        repeat = min(repeat, benchmark.max_repeat)
+    benchmark.run(*benchmark.setup())
+    timings = []
+    for _ in range(repeat):
+        arguments = benchmark.setup()
+        # setup() itself may warm the caches (augment_with_dataset builds a register)
+        clear_memoized_helpers()
+        started = time.perf_counter()
+        benchmark.run(*arguments)
+        timings.append(time.perf_counter() - started)
+    return {"median": statistics.median(timings), "min": min(timings), "repeat": repeat}
+
+
+def load_baseline(path: Path) -> Dict[str, object]:
+    if not path.exists():
+        return {}
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    if baseline.get("version") != BASELINE_VERSION:
+        print(f"[WARN] Ignoring {path}: unsupported baseline version {baseline.get('version')}")
+        return {}
+    return baseline
+
+
+def machine_info() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """Print one line per benchmark and return the names that regressed."""
+    regressions = []
+    for name, result in results.items():
+        line = f"  {name:<24} {result['median'] * 1000:10.2f} ms  (min {result['min'] * 1000:.2f} ms, n={result['repeat']})"
+        previous = baseline.get(name)
+        if previous:
+            ratio = result["median"] / previous["median"] if previous["median"] else float("inf")
+            line += f"  baseline {previous['median'] * 1000:.2f} ms, {ratio:.2f}x"
+            if ratio > 1 + tolerance and result["median"] - previous["median"] > MIN_REGRESSION_SECONDS:
+                regressions.append(name)
+                line += "  REGRESSION"
+        else:
+            line += "  (no baseline)"
+        print(line)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the offline pipeline benchmarks and check them against a baseline.")
+    parser.add_argument("--data-dir", type=Path, default=Path("public/data-v2"), help="Root of the data-v2 tree.")
+    parser.add_argument(
+        "--harvest-dir",
+        type=Path,
+        default=Path("data/zero-works-harvest"),
+        help="Harvest directory with per-source subdirectories.",
+    )
+    parser.add_argument("--only", nargs="+", default=None, help="Run only these benchmarks.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per benchmark.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed slowdown over the baseline median before failing (0.25 = 25%%).",
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Record these results as the new baseline instead of checking against it.",
+    )
+    parser.add_argument("--output-file", type=Path, default=None, help="Also write the results JSON here.")
+    args = parser.parse_args()
+
+    for path in (args.data_dir, args.harvest_dir):
+        if not path.exists():
+            raise FileNotFoundError(f"Benchmark input not found: {path}")
+
+    benchmarks = build_benchmarks(args.data_dir, args.harvest_dir)
+    if args.only:
+        unknown = set(args.only) - {benchmark.name for benchmark in benchmarks}
+        if unknown:
+            parser.error(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+        benchmarks = [benchmark for benchmark in benchmarks if benchmark.name in args.only]
+
+    results: Dict[str, Dict[str, float]] = {}
+    for benchmark in benchmarks:
+        results[benchmark.name] = measure(benchmark, max(1, args.repeat))
+
+    baseline = load_baseline(args.baseline)
+    recorded: Dict[str, Dict[str, float]] = baseline.get("benchmarks") or {}  # type: ignore[assignment]
+    machine = machine_info()
+    if recorded and not args.update_baseline and baseline.get("machine") != machine:
+        print(f"[WARN] Baseline was recorded on {baseline.get('machine')}; timings may not be comparable.")
+
+    print(f"Benchmarks ({len(results)}):")
+    regressions = compare(results, {} if args.update_baseline else recorded, args.tolerance)
+
+    payload = {
+        "version": BASELINE_VERSION,
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine,
+        "benchmarks": results,
+    }
+    if args.output_file:
+        args.output_file.parent.mkdir(parents=True, exist_ok=True)
+        args.output_file.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+    if args.update_baseline:
+        # Keep baselines for benchmarks left out with --only
+        payload["benchmarks"] = {**recorded, **results}
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if regressions:
+        print(f"[ERROR] {len(regressions)} benchmark(s) regressed more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run_profiled(main)
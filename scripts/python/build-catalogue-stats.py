@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Precompute catalogue statistics for /api/catalogue/stats and
+/api/catalogue/categories.
+
+Reads public/data-v2/index.json, every category metadata.json and the works
+files in one pass and writes public/data-v2/manifests/catalogue-stats.json:
+
+- totals:      thinkers, works, categories, distinct subjects
+- categories:  per-category thinker/work counts (in index order)
+- workCountHistogram: thinkers per work-count band (same bands as
+               lib/visualizations/work-count-buckets.ts, plus 0)
+- subjects:    thinkers and works per subject name
+- sources:     works and thinkers per source_id ("unattributed" when unset)
+- topThinkers: the --top-n thinkers with the most works
+
+The output depends only on the data (no timestamp), so rebuilding an
+unchanged tree leaves the file byte-for-byte identical. It runs in prebuild.
+
+Usage:
+    python scripts/python/build-catalogue-stats.py \
+        --data-dir public/data-v2 \
+        --output-file public/data-v2/manifests/catalogue-stats.json
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from util.profiling import run_profiled, stage  # noqa: E402
+from util.works_pages import iter_subject_works  # noqa: E402
+
+STATS_VERSION = 1
+DEFAULT_TOP_N = 25
+UNATTRIBUTED_SOURCE = 'unattributed'
+WORK_COUNT_BANDS = [
+    (0, 0),
+    (1, 4),
+    (5, 9),
+    (10, 24),
+    (25, 49),
+    (50, 99),
+    (100, 249),
+    (250, 499),
+    (500, 999),
+    (1000, None),
+]
+
+
+def band_label(low, high):
+    if high is None:
+        return f"{low}+"
+    return str(low) if low == high else f"{low}-{high}"
+
+
+def build_histogram(counts):
+    histogram = []
+    for low, high in WORK_COUNT_BANDS:
+        histogram.append({
+            'label': band_label(low, high),
+            'min': low,
+            'max': high,
+            'thinkers': sum(1 for count in counts if count >= low and (high is None or count <= high)),
+        })
+    return histogram
+
+
+def build_stats(data_dir, top_n=DEFAULT_TOP_N):
+    """Aggregate every statistic in one pass over data-v2"""
+    index = json.loads((data_dir / 'index.json').read_text(encoding='utf-8'))
+
+    categories = []
+    thinkers = []
+    subject_thinkers = Counter()
+    subject_works = Counter()
+    source_works = Counter()
+    source_thinkers = defaultdict(set)
+
+    for category in index['categories']:
+        collection_dir = data_dir / category['path']
+        metadata = json.loads((collection_dir / 'metadata.json').read_text(encoding='utf-8'))
+        category_works = 0
+        with_works = 0
+        label = None
+
+        for entry in metadata:
+            if not entry.get('n'):
+                continue
+            works = entry.get('w') or 0
+            label = label or entry.get('c')
+            category_works += works
+            with_works += 1 if works else 0
+            thinkers.append({'name': entry['n'], 'category': entry.get('c', ''), 'works': works})
+            for subject in entry.get('subjects') or []:
+                subject_thinkers[subject['name']] += 1
+                subject_works[subject['name']] += subject.get('count') or 0
+
+        if collection_dir.is_dir():
+            for thinker_dir in (path for path in collection_dir.iterdir() if path.is_dir()):
+                for _, works in iter_subject_works(thinker_dir):
+                    for work in works:
+                        source_id = work.get('source_id') or UNATTRIBUTED_SOURCE
+                        source_works[source_id] += 1
+                        source_thinkers[source_id].add((category['path'], thinker_dir.name))
+
+        categories.append({
+            'id': category['id'],
+            'name': label or category['name'],
+            'path': category['path'],
+            'thinkers': sum(1 for entry in metadata if entry.get('n')),
+            'thinkersWithWorks': with_works,
+            'works': category_works,
+        })
+
+    total_works = sum(thinker['works'] for thinker in thinkers)
+    top_thinkers = sorted(
+        (thinker for thinker in thinkers if thinker['works'] > 0),
+        key=lambda thinker: (-thinker['works'], thinker['name']),
+    )[:top_n]
+
+    return {
+        'version': STATS_VERSION,
+        'totals': {
+            'thinkers': len(thinkers),
+            'thinkersWithWorks': sum(1 for thinker in thinkers if thinker['works']),
+            'works': total_works,
+            'categories': len(categories),
+            'subjects': len(subject_thinkers),
+        },
+        'categories': categories,
+        'workCountHistogram': build_histogram([thinker['works'] for thinker in thinkers]),
+        'subjects': [
+            {'name': name, 'thinkers': subject_thinkers[name], 'works': subject_works[name]}
+            for name in sorted(subject_thinkers, key=lambda name: (-subject_works[name], name))
+        ],
+        'sources': [
+            {'sourceId': source_id, 'works': count, 'thinkers': len(source_thinkers[source_id])}
+            for source_id, count in source_works.most_common()
+        ],
+        'topThinkers': top_thinkers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute catalogue statistics for the stats API.")
+    parser.add_argument('--data-dir', type=Path, default=Path('public/data-v2'), help="Root of the data-v2 tree.")
+    parser.add_argument(
+        '--output-file',
+        type=Path,
+        default=Path('public/data-v2/manifests/catalogue-stats.json'),
+        help="Destination for the stats JSON.",
+    )
+    parser.add_argument('--top-n', type=int, default=DEFAULT_TOP_N, help="Number of top thinkers to keep.")
+    args = parser.parse_args()
+
+    if not args.data_dir.exists():
+        raise FileNotFoundError(f"Data directory not found: {args.data_dir}")
+
+    with stage('build stats'):
+        stats = build_stats(args.data_dir, top_n=args.top_n)
+
+    args.output_file.parent.mkdir(parents=True, exist_ok=True)
+    with stage('write stats'):
+        args.output_file.write_text(
+            json.dumps(stats, ensure_ascii=False, separators=(',', ':')) + "\n",
+            encoding='utf-8',
+        )
+    totals = stats['totals']
+    print(
+        f"{totals['thinkers']} thinkers, {totals['works']} works, {totals['categories']} categories, "
+        f"{totals['subjects']} subjects, {len(stats['sources'])} sources -> {args.output_file}"
+    )
+
+
+if __name__ == '__main__':
+    run_profiled(main)
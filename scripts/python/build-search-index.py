@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Build a prebuilt inverted search index for /api/catalogue/search.
+
+Reads public/data-v2/index.json and every category metadata.json, rebuilds
+the same lower-cased search text as generate-search-manifest.mjs (name,
+category, description, subject names, major work titles) and writes
+public/data-v2/manifests/search-index.json with `ngrams`, character trigram
+-> thinkers.
+
+Thinkers are numbered by their position in `docs` ([category, name] pairs)
+and each postings list is sorted and delta-encoded (first id, then gaps).
+A substring query of 3+ characters only needs to intersect the postings of
+its trigrams and verify the few remaining candidates.
+
+`manifestHash` fingerprints every thinker's search text (see
+manifest_hash()); lib/data/folder-loader.ts computes the same hash over the
+search manifest and ignores an index built from different data. The index
+is rebuilt by `npm run build` (prebuild).
+
+Usage:
+    python scripts/python/build-search-index.py \
+        --data-dir public/data-v2 \
+        --output-file public/data-v2/manifests/search-index.json
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from util.profiling import run_profiled, stage  # noqa: E402
+
+INDEX_VERSION = 2
+NGRAM_SIZE = 3
+FNV_OFFSET = 0x811C9DC5
+FNV_PRIME = 0x01000193
+
+
+def build_search_text(entry):
+    """Mirror buildSearchText() in scripts/typescript/generate-search-manifest.mjs"""
+    parts = [entry.get('n'), entry.get('c'), entry.get('d')]
+    parts.extend(subject.get('name') for subject in entry.get('subjects') or [])
+    parts.extend(work.get('title') for work in entry.get('j') or [])
+    return ' '.join(part for part in parts if part).lower()
+
+
+def iter_metadata(data_dir):
+    """Yield metadata entries for every category listed in index.json"""
+    index = json.loads((data_dir / 'index.json').read_text(encoding='utf-8'))
+    for category in index['categories']:
+        metadata_path = data_dir / category['path'] / 'metadata.json'
+        for entry in json.loads(metadata_path.read_text(encoding='utf-8')):
+            if entry.get('n'):
+                yield entry
+
+
+def delta_encode(ids):
+    ordered = sorted(ids)
+    return [value - previous for previous, value in zip([0] + ordered, ordered)]
+
+
+def fnv1a(data):
+    value = FNV_OFFSET
+    for byte in data:
+        value = ((value ^ byte) * FNV_PRIME) & 0xFFFFFFFF
+    return value
+
+
+def manifest_hash(entries):
+    """Order-independent hash of each thinker's category, name and search text.
+
+    Mirrors searchManifestHash() in lib/data/search-index.ts: the sum, mod
+    2**32, of the FNV-1a hash of "<category>\\0<name>\\0<search text>" in UTF-8.
+    """
+    total = 0
+    for entry in entries:
+        key = '\0'.join((entry.get('c', ''), entry['n'], build_search_text(entry)))
+        total = (total + fnv1a(key.encode('utf-8'))) & 0xFFFFFFFF
+    return f'{total:08x}'
+
+
+def build_index(entries):
+    """Return the index payload for a list of metadata entries"""
+    docs = []
+    ngrams = defaultdict(set)
+
+    for doc_id, entry in enumerate(entries):
+        docs.append([entry.get('c', ''), entry['n']])
+        text = build_search_text(entry)
+        for start in range(len(text) - NGRAM_SIZE + 1):
+            ngrams[text[start:start + NGRAM_SIZE]].add(doc_id)
+
+    return {
+        'version': INDEX_VERSION,
+        'ngramSize': NGRAM_SIZE,
+        'manifestHash': manifest_hash(entries),
+        'docs': docs,
+        'ngrams': {key: delta_encode(ids) for key, ids in sorted(ngrams.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the catalogue search postings index.")
+    parser.add_argument('--data-dir', type=Path, default=Path('public/data-v2'), help="Root of the data-v2 tree.")
+    parser.add_argument(
+        '--output-file',
+        type=Path,
+        default=Path('public/data-v2/manifests/search-index.json'),
+        help="Destination for the index JSON.",
+    )
+    args = parser.parse_args()
+
+    if not args.data_dir.exists():
+        raise FileNotFoundError(f"Data directory not found: {args.data_dir}")
+
+    with stage('read metadata'):
+        entries = list(iter_metadata(args.data_dir))
+    with stage('build index'):
+        index = build_index(entries)
+
+    args.output_file.parent.mkdir(parents=True, exist_ok=True)
+    with stage('write index'):
+        args.output_file.write_text(
+            json.dumps(index, ensure_ascii=False, separators=(',', ':')) + "\n",
+            encoding='utf-8',
+        )
+    print(
+        f"Indexed {len(index['docs'])} thinkers: {len(index['ngrams'])} ngrams, "
+        f"hash {index['manifestHash']} -> {args.output_file}"
+    )
+
+
+if __name__ == '__main__':
+    run_profiled(main)
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Precompute the thinker network graph and its force-directed layout.
+
+Builds the thinker-category-subject graph from public/data-v2 metadata and
+data/thinker-source-register.json, lays it out offline and writes
+public/data-v2/manifests/thinker-graph.json, so the browser only has to
+draw it. Edges are:
+
+- thinker -> category   membership
+- thinker -> subject    every subject except "General", weighted by work count
+- thinker -> thinker    the same strength as lib/visualizations/thinker-graph.ts
+                        in hybrid mode (3 per shared subject, +1 per shared top
+                        subject, +2 same category, +1 comparable work volume)
+                        plus 3 per works root the two share in the source
+                        register, pruned to --max-edges-per-node per thinker
+
+The layout is Fruchterman-Reingold with a pull towards each category's
+anchor on an ellipse (the same arrangement ThinkerNetworkGraph uses).
+With NumPy installed every iteration is vectorized over all node pairs;
+without it a pure-Python loop runs the same algorithm, over ten times
+slower (the two agree on structure, not to the pixel).
+
+Output is columnar so it stays small:
+
+    {
+      "version": 1, "inputHash": "...", "width": 960, "height": 640,
+      "categories": [...], "subjects": [...],
+      "nodes": {"kind": [...], "label": [...], "category": [...],
+                "works": [...], "x": [...], "y": [...]},
+      "edges": {"source": [...], "target": [...], "kind": [...], "weight": [...],
+                "sharedSubjects": [...], "sharedRoots": [...]}
+    }
+
+Node kinds are 0 thinker, 1 category, 2 subject; edge kinds 0 membership,
+1 subject, 2 thinker link. "category" is an index into "categories" (-1
+for subject nodes). "inputHash" covers the graph and layout settings, not
+the coordinates: when it matches the existing output the layout is not
+recomputed and the file is left untouched, so the script can run in
+prebuild (use --force to lay out again anyway).
+
+Usage:
+    python scripts/python/build-thinker-graph.py \
+        --data-dir public/data-v2 \
+        --register data/thinker-source-register.json \
+        --output-file public/data-v2/manifests/thinker-graph.json
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+from itertools import combinations
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from util.names import canonical_key  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+
+GRAPH_VERSION = 1
+GENERAL_SUBJECT = 'general'
+LAYOUT_WIDTH = 960
+LAYOUT_HEIGHT = 640
+LAYOUT_MARGIN = 24
+DEFAULT_ITERATIONS = 300
+DEFAULT_SEED = 7
+DEFAULT_MIN_LINK_STRENGTH = 4
+DEFAULT_MAX_EDGES_PER_NODE = 4
+SHARED_ROOT_SCORE = 3
+# Roots such as the MIA volunteer biographies page are shared by dozens of
+# unrelated thinkers; they say nothing about affinity
+MAX_ROOT_SHARE = 6
+CATEGORY_GRAVITY = 0.05
+
+NODE_THINKER, NODE_CATEGORY, NODE_SUBJECT = 0, 1, 2
+EDGE_MEMBERSHIP, EDGE_SUBJECT, EDGE_THINKER = 0, 1, 2
+
+
+def normalize_key(value):
+    return value.strip().lower().replace(' ', '-')
+
+
+def meaningful_subjects(entry):
+    subjects = [
+        subject for subject in entry.get('subjects') or []
+        if subject['name'].strip().lower() != GENERAL_SUBJECT
+    ]
+    return sorted(subjects, key=lambda subject: (-subject.get('count', 0), subject['name']))
+
+
+def load_thinkers(data_dir):
+    index = json.loads((data_dir / 'index.json').read_text(encoding='utf-8'))
+    thinkers = []
+    for category in index['categories']:
+        metadata_path = data_dir / category['path'] / 'metadata.json'
+        if not metadata_path.exists():
+            continue
+        for entry in json.loads(metadata_path.read_text(encoding='utf-8')):
+            if not entry.get('n'):
+                continue
+            subjects = meaningful_subjects(entry)
+            thinkers.append({
+                'name': entry['n'],
+                'category': entry.get('c') or category['name'],
+                'path': category['path'],
+                'works': entry.get('w') or 0,
+                'subjects': subjects,
+                'top': {subject['name'].strip().lower() for subject in subjects[:3]},
+            })
+    return thinkers
+
+
+def load_works_roots(register_path, thinkers):
+    """Map thinker index -> set of works roots, ignoring roots shared too widely."""
+    if not register_path or not register_path.exists():
+        return {}
+    lookup = {(normalize_key(thinker['path']), canonical_key(thinker['name'])): position for position, thinker in enumerate(thinkers)}
+    roots = defaultdict(set)
+    for record in json.loads(register_path.read_text(encoding='utf-8')):
+        position = lookup.get((normalize_key(record.get('collection', '')), canonical_key(record.get('thinker', ''))))
+        if position is None:
+            continue
+        for source in record.get('sources') or []:
+            if source.get('works_root'):
+                roots[position].add(source['works_root'])
+
+    holders = defaultdict(set)
+    for position, thinker_roots in roots.items():
+        for root in thinker_roots:
+            holders[root].add(position)
+    return {
+        position: {root for root in thinker_roots if len(holders[root]) <= MAX_ROOT_SHARE}
+        for position, thinker_roots in roots.items()
+    }
+
+
+def scale_score(a, b):
+    if a <= 0 or b <= 0:
+        return 0
+    return 1 if max(a, b) / min(a, b) <= 2 else 0
+
+
+def build_thinker_links(thinkers, works_roots, min_strength, max_edges_per_node):
+    """Score every pair that shares a subject or works root, then prune like pruneLinks."""
+    by_key = defaultdict(set)
+    for position, thinker in enumerate(thinkers):
+        for subject in thinker['subjects']:
+            by_key[('subject', subject['name'].strip().lower())].add(position)
+        for root in works_roots.get(position, ()):
+            by_key[('root', root)].add(position)
+
+    shared = defaultdict(lambda: [set(), set()])
+    for (kind, key), positions in by_key.items():
+        for a, b in combinations(sorted(positions), 2):
+            shared[(a, b)][0 if kind == 'subject' else 1].add(key)
+
+    links = []
+    for (a, b), (subjects, roots) in shared.items():
+        left, right = thinkers[a], thinkers[b]
+        top = left['top'] | right['top']
+        strength = (
+            len(subjects) * 3
+            + sum(1 for subject in subjects if subject in top)
+            + (2 if left['category'] == right['category'] else 0)
+            + scale_score(left['works'], right['works'])
+            + len(roots) * SHARED_ROOT_SCORE
+        )
+        if strength >= min_strength:
+            links.append((a, b, strength, len(subjects), len(roots)))
+
+    per_node = defaultdict(list)
+    for link in links:
+        per_node[link[0]].append(link)
+        per_node[link[1]].append(link)
+    keep = set()
+    for position, node_links in per_node.items():
+        ranked = sorted(
+            node_links,
+            key=lambda link: (-link[2], thinkers[link[1] if link[0] == position else link[0]]['name']),
+        )
+        keep.update((link[0], link[1]) for link in ranked[:max_edges_per_node])
+    return sorted(link for link in links if (link[0], link[1]) in keep)
+
+
+def build_graph(thinkers, works_roots, min_strength, max_edges_per_node):
+    categories = sorted({thinker['category'] for thinker in thinkers})
+    subjects = sorted({subject['name'] for thinker in thinkers for subject in thinker['subjects']})
+    category_index = {name: position for position, name in enumerate(categories)}
+
+    nodes = {'kind': [], 'label': [], 'category': [], 'works': []}
+    for thinker in thinkers:
+        nodes['kind'].append(NODE_THINKER)
+        nodes['label'].append(thinker['name'])
+        nodes['category'].append(category_index[thinker['category']])
+        nodes['works'].append(thinker['works'])
+    category_offset = len(thinkers)
+    for position, name in enumerate(categories):
+        nodes['kind'].append(NODE_CATEGORY)
+        nodes['label'].append(name)
+        nodes['category'].append(position)
+        nodes['works'].append(sum(thinker['works'] for thinker in thinkers if thinker['category'] == name))
+    subject_offset = category_offset + len(categories)
+    subject_node = {name: subject_offset + position for position, name in enumerate(subjects)}
+    subject_works = defaultdict(int)
+
+    edges = {'source': [], 'target': [], 'kind': [], 'weight': [], 'sharedSubjects': [], 'sharedRoots': []}
+
+    def add_edge(source, target, kind, weight, shared_subjects=0, shared_roots=0):
+        edges['source'].append(source)
+        edges['target'].append(target)
+        edges['kind'].append(kind)
+        edges['weight'].append(weight)
+        edges['sharedSubjects'].append(shared_subjects)
+        edges['sharedRoots'].append(shared_roots)
+
+    for position, thinker in enumerate(thinkers):
+        add_edge(position, category_offset + category_index[thinker['category']], EDGE_MEMBERSHIP, 1)
+        for subject in thinker['subjects']:
+            count = subject.get('count') or 0
+            subject_works[subject['name']] += count
+            add_edge(position, subject_node[subject['name']], EDGE_SUBJECT, count)
+
+    for name in subjects:
+        nodes['kind'].append(NODE_SUBJECT)
+        nodes['label'].append(name)
+        nodes['category'].append(-1)
+        nodes['works'].append(subject_works[name])
+
+    links = build_thinker_links(thinkers, works_roots, min_strength, max_edges_per_node)
+    for a, b, strength, shared_subjects, shared_roots in links:
+        add_edge(a, b, EDGE_THINKER, strength, shared_subjects, shared_roots)
+
+    return categories, subjects, nodes, edges
+
+
+def layout_weights(edges):
+    """Spring weight per edge, in 0..1 within each edge kind."""
+    peaks = defaultdict(int)
+    for kind, weight in zip(edges['kind'], edges['weight']):
+        peaks[kind] = max(peaks[kind], weight)
+    scale = {EDGE_MEMBERSHIP: 0.6, EDGE_SUBJECT: 0.15, EDGE_THINKER: 1.0}
+    return [
+        scale[kind] * (math.log1p(weight) / math.log1p(peaks[kind]) if peaks[kind] else 0)
+        for kind, weight in zip(edges['kind'], edges['weight'])
+    ]
+
+
+def initial_positions(nodes, category_count, seed):
+    """Categories on an ellipse, members jittered around their category, subjects near the centre."""
+    rng = random.Random(seed)
+    center_x, center_y = LAYOUT_WIDTH / 2, LAYOUT_HEIGHT / 2
+    radius = min(LAYOUT_WIDTH, LAYOUT_HEIGHT) * 0.3
+    anchors = []
+    for position in range(category_count):
+        angle = position / max(category_count, 1) * math.pi * 2 - math.pi / 2
+        anchors.append((center_x + math.cos(angle) * radius, center_y + math.sin(angle) * radius * 0.72))
+
+    positions = []
+    targets = []
+    for kind, category in zip(nodes['kind'], nodes['category']):
+        anchor = anchors[category] if category >= 0 else (center_x, center_y)
+        spread = 4 if kind == NODE_CATEGORY else 40
+        positions.append([anchor[0] + rng.uniform(-spread, spread), anchor[1] + rng.uniform(-spread, spread)])
+        targets.append(anchor)
+    return positions, targets
+
+
+def layout_numpy(positions, targets, sources, destinations, weights, iterations):
+    pos = np.array(positions, dtype=np.float64)
+    anchors = np.array(targets, dtype=np.float64)
+    src = np.array(sources, dtype=np.int64)
+    dst = np.array(destinations, dtype=np.int64)
+    spring = np.array(weights, dtype=np.float64)
+    k = math.sqrt(LAYOUT_WIDTH * LAYOUT_HEIGHT / len(pos))
+    temperature = LAYOUT_WIDTH / 10
+
+    for iteration in range(iterations):
+        # Separate x/y planes: reducing an (n, n, 2) array over its last axis is far slower
+        dx = pos[:, 0, None] - pos[None, :, 0]
+        dy = pos[:, 1, None] - pos[None, :, 1]
+        repulsion = k * k / np.maximum(dx * dx + dy * dy, 0.0001)
+        displacement = np.column_stack(((dx * repulsion).sum(axis=1), (dy * repulsion).sum(axis=1)))
+
+        edge_delta = pos[src] - pos[dst]
+        edge_distance = np.maximum(np.hypot(edge_delta[:, 0], edge_delta[:, 1]), 0.01)
+        pull = edge_delta * (edge_distance * spring / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] += np.bincount(dst, pull[:, axis], len(pos))
+            displacement[:, axis] -= np.bincount(src, pull[:, axis], len(pos))
+
+        displacement += (anchors - pos) * CATEGORY_GRAVITY * k
+
+        length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), 0.01)
+        step = temperature * (1 - iteration / iterations)
+        pos += displacement / length[:, None] * np.minimum(length, step)[:, None]
+    return pos.tolist()
+
+
+def layout_python(positions, targets, sources, destinations, weights, iterations):
+    pos = [list(point) for point in positions]
+    count = len(pos)
+    k = math.sqrt(LAYOUT_WIDTH * LAYOUT_HEIGHT / count)
+    k2 = k * k
+    temperature = LAYOUT_WIDTH / 10
+
+    for iteration in range(iterations):
+        displacement = [[0.0, 0.0] for _ in range(count)]
+        for a in range(count):
+            ax, ay = pos[a]
+            da = displacement[a]
+            for b in range(a + 1, count):
+                dx = ax - pos[b][0]
+                dy = ay - pos[b][1]
+                distance2 = max(dx * dx + dy * dy, 0.0001)
+                force = k2 / distance2
+                da[0] += dx * force
+                da[1] += dy * force
+                displacement[b][0] -= dx * force
+                displacement[b][1] -= dy * force
+
+        for source, target, spring in zip(sources, destinations, weights):
+            dx = pos[source][0] - pos[target][0]
+            dy = pos[source][1] - pos[target][1]
+            factor = max(math.hypot(dx, dy), 0.01) * spring / k
+            displacement[source][0] -= dx * factor
+            displacement[source][1] -= dy * factor
+            displacement[target][0] += dx * factor
+            displacement[target][1] += dy * factor
+
+        step = temperature * (1 - iteration / iterations)
+        for point, shift, anchor in zip(pos, displacement, targets):
+            shift[0] += (anchor[0] - point[0]) * CATEGORY_GRAVITY * k
+            shift[1] += (anchor[1] - point[1]) * CATEGORY_GRAVITY * k
+            length = max(math.hypot(shift[0], shift[1]), 0.01)
+            move = min(length, step) / length
+            point[0] += shift[0] * move
+            point[1] += shift[1] * move
+    return pos
+
+
+def fit_to_viewport(positions):
+    xs = [point[0] for point in positions]
+    ys = [point[1] for point in positions]
+    span = max(max(xs) - min(xs), 1e-6), max(max(ys) - min(ys), 1e-6)
+    scale = min((LAYOUT_WIDTH - 2 * LAYOUT_MARGIN) / span[0], (LAYOUT_HEIGHT - 2 * LAYOUT_MARGIN) / span[1])
+    offset_x = (LAYOUT_WIDTH - span[0] * scale) / 2
+    offset_y = (LAYOUT_HEIGHT - span[1] * scale) / 2
+    return (
+        [round((x - min(xs)) * scale + offset_x, 1) for x in xs],
+        [round((y - min(ys)) * scale + offset_y, 1) for y in ys],
+    )
+
+
+def compute_layout(nodes, edges, category_count, iterations, seed, use_numpy=True):
+    positions, targets = initial_positions(nodes, category_count, seed)
+    weights = layout_weights(edges)
+    layout = layout_numpy if use_numpy and np is not None else layout_python
+    return fit_to_viewport(layout(positions, targets, edges['source'], edges['target'], weights, iterations))
+
+
+def graph_input_hash(categories, subjects, nodes, edges, iterations, seed):
+    """Hash of everything the layout depends on, to tell whether an existing output is current"""
+    inputs = {
+        'version': GRAPH_VERSION,
+        'iterations': iterations,
+        'seed': seed,
+        'categories': categories,
+        'subjects': subjects,
+        'nodes': nodes,
+        'edges': edges,
+    }
+    encoded = json.dumps(inputs, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def read_input_hash(path):
+    try:
+        return json.loads(path.read_text(encoding='utf-8')).get('inputHash')
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the thinker network graph and layout.")
+    parser.add_argument('--data-dir', type=Path, default=Path('public/data-v2'), help="Root of the data-v2 tree.")
+    parser.add_argument(
+        '--register',
+        type=Path,
+        default=Path('data/thinker-source-register.json'),
+        help="Source register used for shared works-root edges.",
+    )
+    parser.add_argument(
+        '--output-file',
+        type=Path,
+        default=Path('public/data-v2/manifests/thinker-graph.json'),
+        help="Destination for the graph JSON.",
+    )
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help="Force layout iterations.")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Seed for the initial jitter.")
+    parser.add_argument('--min-link-strength', type=int, default=DEFAULT_MIN_LINK_STRENGTH)
+    parser.add_argument('--max-edges-per-node', type=int, default=DEFAULT_MAX_EDGES_PER_NODE)
+    parser.add_argument('--no-numpy', action='store_true', help="Use the pure-Python layout even if NumPy is installed.")
+    parser.add_argument('--force', action='store_true', help="Recompute the layout even if the inputs are unchanged.")
+    args = parser.parse_args()
+
+    if not args.data_dir.exists():
+        raise FileNotFoundError(f"Data directory not found: {args.data_dir}")
+
+    thinkers = load_thinkers(args.data_dir)
+    works_roots = load_works_roots(args.register, thinkers)
+    categories, subjects, nodes, edges = build_graph(
+        thinkers, works_roots, args.min_link_strength, args.max_edges_per_node
+    )
+
+    input_hash = graph_input_hash(categories, subjects, nodes, edges, args.iterations, args.seed)
+    if not args.force and read_input_hash(args.output_file) == input_hash:
+        print(f"Graph inputs unchanged ({input_hash}); keeping {args.output_file}")
+        return
+
+    use_numpy = np is not None and not args.no_numpy
+    if np is None and not args.no_numpy:
+        print("[WARN] NumPy not installed; using the pure-Python layout (slower)")
+    started = time.perf_counter()
+    nodes['x'], nodes['y'] = compute_layout(nodes, edges, len(categories), args.iterations, args.seed, use_numpy)
+    elapsed = time.perf_counter() - started
+
+    graph = {
+        'version': GRAPH_VERSION,
+        'inputHash': input_hash,
+        'width': LAYOUT_WIDTH,
+        'height': LAYOUT_HEIGHT,
+        'categories': categories,
+        'subjects': subjects,
+        'nodes': nodes,
+        'edges': edges,
+    }
+    args.output_file.parent.mkdir(parents=True, exist_ok=True)
+    args.output_file.write_text(
+        json.dumps(graph, ensure_ascii=False, separators=(',', ':')) + "\n",
+        encoding='utf-8',
+    )
+    thinker_links = sum(1 for kind in edges['kind'] if kind == EDGE_THINKER)
+    print(
+        f"{len(nodes['kind'])} nodes, {len(edges['kind'])} edges ({thinker_links} thinker links), "
+        f"layout {elapsed:.1f}s ({'numpy' if use_numpy else 'python'}) -> {args.output_file}"
+    )
+
+
+if __name__ == '__main__':
+    run_profiled(main)
@@ -4,18 +4,138 @@ Convert thinkers-bundle.json into efficient formats:
 - thinkers-metadata.json (compressed metadata)
 - thinkers-works.json (works lookup)
 - Split category files in public/data/thinkers-by-category/
+
+Files served from public/ are written as minified JSON with precompressed
+.gz and .br siblings (maximum compression), so the CDN never compresses per
+request. The same post-processing can be run over other trees such as
+public/data-v2 with --precompress-dir; there the source JSON is left as-is
+and the siblings hold its minified form. Brotli output needs the optional
+`brotli` package and is skipped when it is not installed.
+
+With --compact, every metadata list also gets a .compact.json sibling using
+a shared string table and prefix-compressed URLs (see
+util/compact_metadata.py, which holds the decoder). Each file is checked
+to decode back to the original before it is written.
 """
 
+import argparse
+import gzip
 import json
 import os
+import sys
 from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from util.compact_metadata import encode_metadata, minified_size, verify_round_trip  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+def write_json(path, data, minify=False):
+    """Write JSON either indented (for humans) or minified (for serving)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        if minify:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def precompress_file(path):
+    """Write .gz/.br siblings of a JSON file from its minified form and return the sizes"""
+    path = Path(path)
+    raw = path.read_bytes()
+    minified = json.dumps(
+        json.loads(raw.decode('utf-8')), ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+    sizes = {'raw': len(raw), 'minified': len(minified)}
+
+    gz_path = path.with_name(path.name + '.gz')
+    if not gz_path.exists() or gz_path.stat().st_mtime < path.stat().st_mtime:
+        # mtime=0 keeps the output byte-identical across runs
+        gz_path.write_bytes(gzip.compress(minified, compresslevel=9, mtime=0))
+    sizes['gzip'] = gz_path.stat().st_size
+
+    if brotli is not None:
+        br_path = path.with_name(path.name + '.br')
+        if not br_path.exists() or br_path.stat().st_mtime < path.stat().st_mtime:
+            br_path.write_bytes(brotli.compress(minified, mode=brotli.MODE_TEXT, quality=11))
+        sizes['brotli'] = br_path.stat().st_size
+
+    return sizes
+
+
+def precompress_tree(paths):
+    """Precompress every JSON file under the given files/directories"""
+    report = {'files': 0, 'raw': 0, 'minified': 0, 'gzip': 0, 'brotli': 0}
+    for root in paths:
+        root = Path(root)
+        files = [root] if root.is_file() else sorted(root.rglob('*.json'))
+        for file_path in files:
+            sizes = precompress_file(file_path)
+            report['files'] += 1
+            for key, value in sizes.items():
+                report[key] += value
+    if brotli is None:
+        report.pop('brotli')
+    return report
+
+
+def write_compact(path, metadata):
+    """Write the compact encoding of a metadata list next to `path` and return (plain, compact) sizes"""
+    path = Path(path)
+    mismatch = verify_round_trip(metadata)
+    if mismatch is not None:
+        raise ValueError(f"Compact encoding of {path} does not round-trip (entry {mismatch})")
+    compact = encode_metadata(metadata)
+    compact_path = path.with_name(path.stem + '.compact.json')
+    write_json(compact_path, compact, minify=True)
+    return compact_path, minified_size(metadata), minified_size(compact)
 
-def convert_to_efficient_formats():
+
+def compact_tree(root):
+    """Write .compact.json siblings for every metadata.json under root"""
+    report = {'files': 0, 'minified': 0, 'compact': 0, 'written': []}
+    for metadata_path in sorted(Path(root).rglob('metadata.json')):
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        compact_path, plain, compact = write_compact(metadata_path, metadata)
+        report['files'] += 1
+        report['minified'] += plain
+        report['compact'] += compact
+        report['written'].append(str(compact_path))
+    return report
+
+
+def print_compact_report(label, report):
+    """Print the size saved by the compact metadata encoding"""
+    minified = report['minified'] or 1
+    print(f"\n{label}: {report['files']} compact metadata files")
+    print(f"  - minified {report['minified'] / 1024:>10.1f} KiB")
+    print(f"  - compact  {report['compact'] / 1024:>10.1f} KiB ({report['compact'] / minified * 100:5.1f}%)")
+
+
+def print_size_report(label, report):
+    """Print total sizes for a precompressed set of files"""
+    raw = report['raw'] or 1
+    print(f"\n{label}: {report['files']} JSON files")
+    for key in ('raw', 'minified', 'gzip', 'brotli'):
+        if key in report:
+            print(f"  - {key:<8} {report[key] / 1024:>10.1f} KiB ({report[key] / raw * 100:5.1f}%)")
+    if brotli is None:
+        print("  - brotli   skipped (pip install brotli)")
+
+
+def convert_to_efficient_formats(bundle_file='data/thinkers-bundle.json', compact=False):
     """Convert bundle to efficient formats"""
     
     # Read the bundle
     print("Reading thinkers-bundle.json...")
-    with open('data/thinkers-bundle.json', 'r', encoding='utf-8') as f:
+    with open(bundle_file, 'r', encoding='utf-8') as f:
         bundle_data = json.load(f)
     
     # Initialize structures
@@ -54,8 +174,8 @@ def convert_to_efficient_formats():
         json.dump(works_lookup, f, indent=2, ensure_ascii=False)
     
     # Also write to public directory for client-side loading
-    with open('public/data/thinkers-works.json', 'w', encoding='utf-8') as f:
-        json.dump(works_lookup, f, indent=2, ensure_ascii=False)
+    served_files = ['public/data/thinkers-works.json']
+    write_json('public/data/thinkers-works.json', works_lookup, minify=True)
     
     # Create output directory if it doesn't exist
     os.makedirs('public/data/thinkers-by-category', exist_ok=True)
@@ -63,6 +183,7 @@ def convert_to_efficient_formats():
     # Write category files and build index
     print("Writing category files...")
     category_index = {}
+    compact_report = {'files': 0, 'minified': 0, 'compact': 0}
     summary_data = {
         'total_thinkers': 0,
         'total_categories': len(metadata_by_category),
@@ -76,8 +197,14 @@ def convert_to_efficient_formats():
         
         # Write category file
         filepath = f'public/data/thinkers-by-category/{filename}'
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(thinkers, f, indent=2, ensure_ascii=False)
+        write_json(filepath, thinkers, minify=True)
+        served_files.append(filepath)
+        if compact:
+            compact_path, plain, compact_size = write_compact(filepath, thinkers)
+            served_files.append(str(compact_path))
+            compact_report['files'] += 1
+            compact_report['minified'] += plain
+            compact_report['compact'] += compact_size
         
         summary_data['categories'].append({
             'category': category,
@@ -92,13 +219,17 @@ def convert_to_efficient_formats():
     
     # Write index file
     print("Writing index.json...")
-    with open('public/data/thinkers-by-category/index.json', 'w', encoding='utf-8') as f:
-        json.dump(category_index, f, indent=2, ensure_ascii=False)
+    write_json('public/data/thinkers-by-category/index.json', category_index, minify=True)
+    served_files.append('public/data/thinkers-by-category/index.json')
     
     # Write summary file
     print("Writing summary.json...")
-    with open('public/data/thinkers-by-category/summary.json', 'w', encoding='utf-8') as f:
-        json.dump(summary_data, f, indent=2, ensure_ascii=False)
+    write_json('public/data/thinkers-by-category/summary.json', summary_data, minify=True)
+    served_files.append('public/data/thinkers-by-category/summary.json')
+
+    # Precompress everything served from public/
+    print("Precompressing public files...")
+    report = precompress_tree(served_files)
     
     print(f"\n✓ Conversion complete!")
     print(f"  - Processed {summary_data['total_thinkers']} thinkers across {summary_data['total_categories']} categories")
@@ -108,6 +239,51 @@ def convert_to_efficient_formats():
     print(f"    - data/thinkers-works.json")
     print(f"    - public/data/thinkers-works.json")
     print(f"    - public/data/thinkers-by-category/ (31 category files)")
+    print_size_report('public/data', report)
+    if compact:
+        print_compact_report('public/data/thinkers-by-category', compact_report)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert thinkers-bundle.json and precompress served JSON.")
+    parser.add_argument('--bundle-file', default='data/thinkers-bundle.json', help="Path to thinkers bundle JSON.")
+    parser.add_argument(
+        '--precompress-dir',
+        action='append',
+        default=[],
+        help="Extra tree to precompress, e.g. public/data-v2 (repeatable).",
+    )
+    parser.add_argument('--skip-convert', action='store_true', help="Only precompress the --precompress-dir trees.")
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help="Also write .compact.json metadata (string table + URL prefixes) for category files "
+             "and for every metadata.json under the --precompress-dir trees.",
+    )
+    parser.add_argument('--report-file', default=None, help="Optional JSON file for the size report.")
+    args = parser.parse_args()
+
+    reports = {}
+    if not args.skip_convert:
+        reports['public/data'] = convert_to_efficient_formats(args.bundle_file, compact=args.compact)
+
+    for directory in args.precompress_dir:
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"Directory not found: {directory}")
+        if args.compact:
+            print(f"Writing compact metadata under {directory}...")
+            compact_report = compact_tree(directory)
+            print_compact_report(directory, compact_report)
+            compact_report.pop('written')
+            reports[f'{directory} (compact)'] = compact_report
+        print(f"Precompressing {directory}...")
+        reports[directory] = precompress_tree([directory])
+        print_size_report(directory, reports[directory])
+
+    if args.report_file:
+        write_json(args.report_file, reports)
+
 
 if __name__ == '__main__':
-    convert_to_efficient_formats()
+    run_profiled(main)
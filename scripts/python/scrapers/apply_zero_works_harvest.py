@@ -18,10 +18,15 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import sys
 import unicodedata
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
-from urllib.parse import urlparse, urlunparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.profiling import run_profiled, stage  # noqa: E402
+from util.urls import canonicalize_url  # noqa: E402
+from util.works_pages import write_subject_works  # noqa: E402
 
 
 DEFAULT_SUBJECT = "General"
@@ -31,7 +36,8 @@ def load_harvest_records(harvest_dir: Path) -> Iterable[Tuple[Path, dict]]:
     """Yield (path, payload) pairs for each harvest JSON file."""
     for file_path in sorted(harvest_dir.rglob("*.json")):
         try:
-            payload = json.loads(file_path.read_text(encoding="utf-8"))
+            with stage("read harvest files"):
+                payload = json.loads(file_path.read_text(encoding="utf-8"))
         except json.JSONDecodeError as exc:
             print(f"[ERROR] Failed to parse {file_path}: {exc}")
             continue
@@ -61,8 +67,13 @@ def save_metadata(collection_dir: Path, metadata: List[Dict[str, object]]) -> No
     metadata_file.write_text(json.dumps(metadata, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
 
 
-def update_metadata_entry(entry: Dict[str, object], subject: str, work_count: int) -> None:
-    """Set overall work count and per-subject tally on a metadata entry."""
+def update_metadata_entry(
+    entry: Dict[str, object],
+    subject: str,
+    work_count: int,
+    pages: Optional[int] = None,
+) -> None:
+    """Set overall work count and per-subject tally (and page count, if paginated) on a metadata entry."""
     entry["w"] = work_count
 
     subjects = entry.get("subjects") or []
@@ -72,11 +83,18 @@ def update_metadata_entry(entry: Dict[str, object], subject: str, work_count: in
     for subject_entry in subjects:
         if subject_entry.get("name") == subject:
             subject_entry["count"] = work_count
+            if pages:
+                subject_entry["pages"] = pages
+            else:
+                subject_entry.pop("pages", None)
             updated = True
             break
 
     if not updated:
-        subjects.append({"name": subject, "count": work_count})
+        subject_entry = {"name": subject, "count": work_count}
+        if pages:
+            subject_entry["pages"] = pages
+        subjects.append(subject_entry)
 
     entry["subjects"] = subjects
 
@@ -87,50 +105,46 @@ def apply_harvest_record(
     thinker: str,
     works: List[Dict[str, object]],
     subject: str = DEFAULT_SUBJECT,
+    page_size: Optional[int] = None,
 ) -> None:
     thinker_dir = ensure_thinker_directory(base_dir, collection, thinker)
-    subject_file = thinker_dir / f"{subject}.json"
 
     unique_by_url: Dict[str, Dict[str, object]] = {}
-    for item in works:
-        if not isinstance(item, dict):
-            continue
-        url = item.get("url")
-        title = item.get("title")
-        if not url or not title:
-            continue
-        canonical_url = canonicalize_url(str(url))
-        cleaned_title = str(title).strip()
-        if not canonical_url or not cleaned_title:
-            continue
-        work_entry: Dict[str, object] = {"title": cleaned_title, "url": canonical_url}
-        if item.get("source_id"):
-            work_entry["source_id"] = item["source_id"]
-        unique_by_url.setdefault(canonical_url, work_entry)
+    with stage("canonicalize works"):
+        for item in works:
+            if not isinstance(item, dict):
+                continue
+            url = item.get("url")
+            title = item.get("title")
+            if not url or not title:
+                continue
+            canonical_url = canonicalize_url(str(url))
+            cleaned_title = str(title).strip()
+            if not canonical_url or not cleaned_title:
+                continue
+            work_entry: Dict[str, object] = {"title": cleaned_title, "url": canonical_url}
+            if item.get("source_id"):
+                work_entry["source_id"] = item["source_id"]
+            unique_by_url.setdefault(canonical_url, work_entry)
 
     # Sort works by title for determinism
     sorted_works = sorted(unique_by_url.values(), key=lambda item: str(item["title"]).lower())
-    subject_file.write_text(json.dumps(sorted_works, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    with stage("write works"):
+        subject_entry = write_subject_works(thinker_dir, subject, sorted_works, page_size=page_size)
 
     collection_dir = resolve_collection_dir(base_dir, collection)
-    metadata = load_metadata(collection_dir)
+    with stage("load metadata"):
+        metadata = load_metadata(collection_dir)
     for entry in metadata:
         if entry.get("n") == thinker:
-            update_metadata_entry(entry, subject, len(sorted_works))
+            update_metadata_entry(entry, subject, len(sorted_works), pages=subject_entry.get("pages"))
             break
     else:
         print(f"[WARN] Metadata entry not found for thinker '{thinker}' in collection '{collection}'.")
         return
 
-    save_metadata(collection_dir, metadata)
-
-
-def canonicalize_url(url: str) -> str:
-    parsed = urlparse(url)
-    if not parsed.scheme or not parsed.netloc:
-        return ""
-    cleaned = parsed._replace(query="", fragment="")
-    return urlunparse(cleaned)
+    with stage("save metadata"):
+        save_metadata(collection_dir, metadata)
 
 
 def resolve_collection_dir(base_dir: Path, collection: str) -> Path:
@@ -173,6 +187,11 @@ def main() -> None:
         default=DEFAULT_SUBJECT,
         help="Subject label to use when writing works (default: General).",
     )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        help="Split subjects with more works than this into paginated files plus an index.json.",
+    )
     args = parser.parse_args()
 
     if not args.harvest_dir.exists():
@@ -205,7 +224,9 @@ def main() -> None:
             continue
 
         try:
-            apply_harvest_record(args.data_dir, collection, thinker, works, subject=args.subject)
+            apply_harvest_record(
+                args.data_dir, collection, thinker, works, subject=args.subject, page_size=args.page_size
+            )
             applied += 1
         except FileNotFoundError as exc:
             print(f"[ERROR] {exc}")
@@ -224,4 +245,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
@@ -13,6 +13,9 @@ import argparse
 import re
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.profiling import run_profiled  # noqa: E402
+
 DEFAULT_AUDIT_PATH = Path("docs/work-coverage-audit.md")
 EXCLUDED_THINKER_NAMES = {"full biography"}
 
@@ -72,4 +75,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled(main))
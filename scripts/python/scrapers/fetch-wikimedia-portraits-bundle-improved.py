@@ -7,22 +7,28 @@ Supports parallel processing for faster execution
 
 import argparse
 import json
-import time
+import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 from threading import Lock
 from typing import Any, Dict, Optional, Tuple
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.http_metrics import HttpMetrics, add_metrics_argument, finish_run  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import build_session, fetch, host_policy  # noqa: E402
 
 WIKIMEDIA_API_BASE = "https://commons.wikimedia.org/w/api.php"
 DEFAULT_BUNDLE_PATH = "data/thinkers-bundle.json"
-REQUEST_TIMEOUT = 10
-MAX_RETRIES = 3
+# Rate, concurrency, timeout and user agent come from "hosts" in scripts/config/sources.json
+WIKIMEDIA_POLICY = host_policy("commons.wikimedia.org")
 
 # Thread-safe print lock
 print_lock = Lock()
+# Every worker's session reports into the same run metrics
+http_metrics = HttpMetrics("fetch-wikimedia-portraits")
 
 def thread_safe_print(*args, **kwargs):
     """Thread-safe print function"""
@@ -30,20 +36,8 @@ def thread_safe_print(*args, **kwargs):
         print(*args, **kwargs)
 
 def create_session() -> requests.Session:
-    session = requests.Session()
-    session.headers.update(
-        {"User-Agent": "Marxists Explorer Bot 1.0 (https://github.com/user/marxists-explorer)"}
-    )
-    retry = Retry(
-        total=MAX_RETRIES,
-        backoff_factor=0.5,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=("GET",),
-        respect_retry_after_header=True,
-    )
-    session.mount("https://", HTTPAdapter(max_retries=retry))
-    session.mount("http://", HTTPAdapter(max_retries=retry))
-    return session
+    # Requests go through the shared crawl scheduler, which holds Wikimedia to WIKIMEDIA_POLICY
+    return build_session(WIKIMEDIA_POLICY, http_metrics.name, http_metrics)
 
 
 def get_wikimedia_image(search_term: str, session: requests.Session) -> Optional[Dict[str, str]]:
@@ -59,8 +53,7 @@ def get_wikimedia_image(search_term: str, session: requests.Session) -> Optional
             'srlimit': 1
         }
         
-        response = session.get(WIKIMEDIA_API_BASE, params=search_params, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
+        response = fetch(session, WIKIMEDIA_API_BASE, params=search_params)
         data = response.json()
         
         if 'query' in data and 'search' in data['query'] and len(data['query']['search']) > 0:
@@ -76,8 +69,7 @@ def get_wikimedia_image(search_term: str, session: requests.Session) -> Optional
                 'iiurlwidth': '200'  # Request thumbnail of 200px width
             }
             
-            response2 = session.get(WIKIMEDIA_API_BASE, params=image_params, timeout=REQUEST_TIMEOUT)
-            response2.raise_for_status()
+            response2 = fetch(session, WIKIMEDIA_API_BASE, params=image_params)
             data2 = response2.json()
             
             pages = data2.get('query', {}).get('pages', {})
@@ -96,14 +88,13 @@ def get_wikimedia_image(search_term: str, session: requests.Session) -> Optional
     return None
 
 
-def process_thinker(args: Tuple[int, Dict[str, Any], int]) -> Dict[str, Any]:
+def process_thinker(args: Tuple[int, Dict[str, Any], int, requests.Session]) -> Dict[str, Any]:
     """Process a single thinker to fetch images. Designed for parallel execution."""
-    index, thinker, total_thinkers = args
+    index, thinker, total_thinkers, session = args
     name = thinker.get('name', '').strip()
     if not name:
         return {'success': False, 'name': '', 'skipped': True}
 
-    session = create_session()
     result = {'success': False, 'name': name, 'skipped': False}
     
     # Skip if already has both image and thumbnail
@@ -148,8 +139,6 @@ def process_thinker(args: Tuple[int, Dict[str, Any], int]) -> Dict[str, Any]:
     if not found_image:
         thread_safe_print(f"[{index}/{total_thinkers}] ✗ No image found for {name}")
     
-    # Small delay to be respectful with rate limiting
-    time.sleep(0.1)
     return result
 
 def update_thinker_images(bundle_data: Dict[str, Any], max_thinkers: Optional[int] = None, max_workers: int = 8):
@@ -167,8 +156,9 @@ def update_thinker_images(bundle_data: Dict[str, Any], max_thinkers: Optional[in
     thread_safe_print(f"Fetching portrait URLs from Wikimedia Commons...\n")
     thread_safe_print(f"Processing {total_thinkers} thinkers with {max_workers} workers...\n")
     
-    # Prepare arguments for parallel processing
-    args = [(i + 1, thinker, total_thinkers) for i, (_category, thinker) in enumerate(all_thinkers)]
+    # Prepare arguments for parallel processing; one session keeps connections alive across thinkers
+    session = create_session()
+    args = [(i + 1, thinker, total_thinkers, session) for i, (_category, thinker) in enumerate(all_thinkers)]
     
     success_count = 0
     
@@ -211,6 +201,7 @@ def main() -> None:
         default=8,
         help="Number of parallel workers (default: 8).",
     )
+    add_metrics_argument(parser, "fetch-wikimedia-portraits")
     args = parser.parse_args()
 
     # Read the thinkers bundle data
@@ -229,6 +220,7 @@ def main() -> None:
         json.dump(bundle_data, f, indent=2, ensure_ascii=False)
 
     print("\nDone! Updated thinkers-bundle.json with Wikimedia image URLs and thumbnails.")
+    finish_run(http_metrics, args.metrics_file)
 
 if __name__ == '__main__':
-    main()
+    run_profiled(main)
@@ -18,43 +18,29 @@ import re
 import sys
 import argparse
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from bs4 import BeautifulSoup
 from bs4.element import NavigableString, Tag
-from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin
-from urllib3.util.retry import Retry
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.http_metrics import add_metrics_argument, finish_run  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import build_session, fetch, get_source  # noqa: E402
+from util.works_pages import list_subjects, remove_subject_works, write_subject_works  # noqa: E402
 
 BASE_URL = "https://www.marxists.org/reference/archive/mao/selected-works/date-index.htm"
 DEFAULT_DATA_ROOT = Path("public/data-v2/maoists/Mao Zedong")
 DEFAULT_METADATA_PATH = Path("public/data-v2/maoists/metadata.json")
-USER_AGENT = "MarxistsExplorer/1.0 (+https://github.com/jeremy/marxists-explorer)"
+# The date index is one large page; allow longer than the MIA policy's timeout
 REQUEST_TIMEOUT = 60
-MAX_RETRIES = 3
-
-
-def build_session() -> requests.Session:
-    session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT})
-    retry = Retry(
-        total=MAX_RETRIES,
-        backoff_factor=0.5,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=("GET",),
-        respect_retry_after_header=True,
-    )
-    session.mount("https://", HTTPAdapter(max_retries=retry))
-    session.mount("http://", HTTPAdapter(max_retries=retry))
-    return session
 
 
 def fetch_html(url: str, session: requests.Session, verify_tls: bool = True) -> BeautifulSoup:
-    """Download the HTML page and return a BeautifulSoup parser."""
-    response = session.get(url, timeout=REQUEST_TIMEOUT, verify=verify_tls)
-    response.raise_for_status()
+    """Download the HTML page through the crawl scheduler and return a BeautifulSoup parser."""
+    response = fetch(session, url, timeout=REQUEST_TIMEOUT, verify=verify_tls)
     return BeautifulSoup(response.content, "html.parser")
 
 
@@ -162,28 +148,39 @@ def collect_sections(soup: BeautifulSoup) -> Tuple[Dict[str, List[Dict[str, str]
     return sections, recommended
 
 
-def write_section_files(sections: Dict[str, List[Dict[str, str]]], data_root: Path) -> None:
-    """Write JSON files for each subject and clean up obsolete files."""
+def write_section_files(
+    sections: Dict[str, List[Dict[str, str]]],
+    data_root: Path,
+    page_size: Optional[int] = None,
+) -> List[Dict[str, object]]:
+    """Write JSON files for each subject, clean up obsolete files, and return the metadata subject entries.
+
+    With page_size set, subjects longer than one page are split into numbered
+    page files plus an index.json (see util/works_pages.py).
+    """
     data_root.mkdir(parents=True, exist_ok=True)
 
-    new_filenames = {f"{subject}.json" for subject in sections}
-    for existing_file in data_root.glob("*.json"):
-        if existing_file.name not in new_filenames:
-            existing_file.unlink()
+    for existing_subject in list_subjects(data_root):
+        if existing_subject not in sections:
+            remove_subject_works(data_root, existing_subject)
 
-    for subject, works in sections.items():
-        out_path = data_root / f"{subject}.json"
-        with out_path.open("w", encoding="utf-8") as handle:
-            json.dump(works, handle, indent=2, ensure_ascii=False)
-            handle.write("\n")
+    return [
+        write_subject_works(data_root, subject, works, page_size=page_size)
+        for subject, works in sections.items()
+    ]
 
 
 def update_metadata(
     sections: Dict[str, List[Dict[str, str]]],
     recommended: List[Dict[str, str]],
     metadata_path: Path,
+    subject_entries: Optional[List[Dict[str, object]]] = None,
 ) -> None:
-    """Update Mao Zedong's metadata entry with new subjects, counts, totals, and major works."""
+    """Update Mao Zedong's metadata entry with new subjects, counts, totals, and major works.
+
+    subject_entries, as returned by write_section_files, carry page counts for
+    paginated subjects; without them plain name/count entries are written.
+    """
     if not metadata_path.exists():
         raise FileNotFoundError(f"Metadata file not found: {metadata_path}")
 
@@ -192,7 +189,9 @@ def update_metadata(
 
     updated = False
     total_works = sum(len(items) for items in sections.values())
-    subjects_payload = [{"name": subject, "count": len(items)} for subject, items in sections.items()]
+    subjects_payload = subject_entries or [
+        {"name": subject, "count": len(items)} for subject, items in sections.items()
+    ]
     major_works = recommended[:25]
 
     for entry in metadata:
@@ -242,18 +241,25 @@ def main() -> int:
         action="store_true",
         help="Disable TLS certificate verification for legacy environments.",
     )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        help="Split subjects with more works than this into paginated files plus an index.json.",
+    )
+    add_metrics_argument(parser, "fetch_mao_selected_works")
     args = parser.parse_args()
 
-    session = build_session()
+    session = build_session(get_source("mia").policy, "fetch_mao_selected_works")
     soup = fetch_html(args.url, session=session, verify_tls=not args.insecure)
+    finish_run(session.http_metrics, args.metrics_file)
     sections, recommended = collect_sections(soup)
 
     if not sections:
         print("No sections were parsed from the source page.", file=sys.stderr)
         return 1
 
-    write_section_files(sections, data_root=args.data_root)
-    update_metadata(sections, recommended, metadata_path=args.metadata_path)
+    subject_entries = write_section_files(sections, data_root=args.data_root, page_size=args.page_size)
+    update_metadata(sections, recommended, metadata_path=args.metadata_path, subject_entries=subject_entries)
 
     print(f"Updated {len(sections)} subject files for Mao Zedong with {sum(len(v) for v in sections.values())} works.")
     print(f"Marked {len(recommended)} works as recommended.")
@@ -261,5 +267,5 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled(main))
 
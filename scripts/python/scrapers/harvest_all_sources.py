@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Harvest works from every enabled source in one run.
+
+Loads the harvester plugin of each source enabled in scripts/config/sources.json
+(util/sources.py), reads the source's matches file and harvests all sources
+at the same time. Each source keeps --workers-per-source thinkers in
+progress; their requests all go through the process-wide crawl scheduler
+(util/crawl_scheduler.py), which holds every host to its policy's rate and
+concurrency and sends whichever host's request is due next, so hosts are
+fetched side by side instead of one script after another.
+
+Payloads are written exactly as the per-source harvest scripts write them,
+to <output-root>/<source_id>/<collection>/<slug>.json, ready for
+merge_harvest_sources.py.
+
+Usage:
+    python scripts/python/scrapers/harvest_all_sources.py
+    python scripts/python/scrapers/harvest_all_sources.py --sources anarchist_library goldman_archive --limit 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrapers.harvest_zero_work_thinkers import DEFAULT_WORKERS, MAX_CRAWL_DEPTH  # noqa: E402
+from util.http_metrics import HttpMetrics, add_metrics_argument, finish_run  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import (  # noqa: E402
+    DEFAULT_HARVEST_ROOT,
+    DEFAULT_SOURCES_FILE,
+    HarvesterPlugin,
+    create_harvester,
+    select_sources,
+    write_harvest_payload,
+)
+
+
+def load_records(path: Optional[Path], limit: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+    if path is None or not path.exists():
+        return None
+    records = json.loads(path.read_text(encoding="utf-8"))
+    return records[:limit] if limit is not None else records
+
+
+def run_harvester(
+    harvester: HarvesterPlugin,
+    records: List[Dict[str, Any]],
+    output_dir: Path,
+    workers: int = DEFAULT_WORKERS,
+) -> Counter:
+    """Harvest every record, several thinkers at a time; returns status counts."""
+    source = harvester.source
+
+    def harvest(record: Dict[str, Any]) -> str:
+        payload = harvester.harvest(record)
+        write_harvest_payload(output_dir, payload)
+        return payload["status"]
+
+    with ThreadPoolExecutor(max_workers=max(source.policy.concurrency, workers), thread_name_prefix=source.id) as executor:
+        statuses = Counter(executor.map(harvest, records))
+    print(f"  {source.id}: {sum(statuses.values())} thinkers, {statuses['success']} successful. Wrote {output_dir}")
+    return statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Harvest works from every enabled source concurrently.")
+    parser.add_argument(
+        "--sources-file",
+        type=Path,
+        default=DEFAULT_SOURCES_FILE,
+        help="Source config; sources with \"enabled\": false are skipped.",
+    )
+    parser.add_argument("--sources", nargs="+", default=None, help="Only harvest these source ids.")
+    parser.add_argument(
+        "--matches-dir",
+        type=Path,
+        default=None,
+        help="Read the matches files from here instead of their configured paths (see map_all_sources.py --output-dir).",
+    )
+    parser.add_argument(
+        "--output-root",
+        type=Path,
+        default=DEFAULT_HARVEST_ROOT,
+        help="Harvest files go to <output-root>/<source_id>/.",
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Limit thinkers per source (debug).")
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=MAX_CRAWL_DEPTH,
+        help=f"Maximum crawl depth for crawling harvesters (default: {MAX_CRAWL_DEPTH}).",
+    )
+    parser.add_argument(
+        "--workers-per-source",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Thinkers harvested concurrently per source (default: {DEFAULT_WORKERS}).",
+    )
+    add_metrics_argument(parser, "harvest_all_sources")
+    args = parser.parse_args()
+
+    try:
+        sources = select_sources("harvester", args.sources, args.sources_file)
+    except KeyError as exc:
+        parser.error(str(exc))
+
+    metrics = HttpMetrics("harvest_all_sources")
+    jobs = []
+    for source in sources:
+        matches_file = source.matches_file
+        if matches_file is not None and args.matches_dir is not None:
+            matches_file = args.matches_dir / matches_file.name
+        records = load_records(matches_file, args.limit)
+        if records is None:
+            print(f"[WARN] {source.id}: matches file {matches_file} not found; run map_all_sources.py first")
+            continue
+        harvester = create_harvester(source, metrics, max_depth=args.max_depth)
+        jobs.append((harvester, records, args.output_root / source.id, args.workers_per_source))
+    if not jobs:
+        parser.error("Nothing to harvest")
+
+    print(f"Harvesting {len(jobs)} sources...")
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [executor.submit(run_harvester, *job) for job in jobs]
+        totals = sum((future.result() for future in futures), Counter())
+
+    print(f"Completed harvest for {sum(totals.values())} thinker/source pairs. Successful: {totals['success']}")
+    finish_run(metrics, args.metrics_file)
+
+
+if __name__ == "__main__":
+    run_profiled(main)
@@ -17,22 +17,29 @@ from __future__ import annotations
 import argparse
 import json
 import re
-import time
+import sys
 from pathlib import Path
 from typing import Any, Dict, List
 from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.http_metrics import HttpMetrics, add_metrics_argument, finish_run  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import (  # noqa: E402
+    HarvesterPlugin,
+    SourceConfig,
+    build_session,
+    fetch,
+    get_source,
+    write_harvest_payload,
+)
 
-USER_AGENT = "Marxists Explorer Bot/0.1 (+https://github.com/jeremy-marxists-explorer)"
-REQUEST_TIMEOUT = 15
-REQUEST_DELAY_SECONDS = 1.5
-MAX_RETRIES = 3
-TAL_BASE = "https://theanarchistlibrary.org"
+
+SOURCE = get_source("anarchist_library")
+TAL_BASE = SOURCE.base_url or "https://theanarchistlibrary.org"
 
 
 def clean_title(text: str) -> str:
@@ -44,17 +51,14 @@ def clean_title(text: str) -> str:
     return " ".join(text.split()).strip()
 
 
-def fetch_author_works(author_url: str, session: requests.Session) -> List[Dict[str, str]]:
+def fetch_author_works(author_url: str, session: requests.Session, parser: str = "html.parser") -> List[Dict[str, str]]:
     """Fetch author category page and return list of {title, url} for library texts."""
     try:
-        if REQUEST_DELAY_SECONDS > 0:
-            time.sleep(REQUEST_DELAY_SECONDS)
-        resp = session.get(author_url, timeout=REQUEST_TIMEOUT)
-        resp.raise_for_status()
+        resp = fetch(session, author_url)
     except requests.RequestException:
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = BeautifulSoup(resp.text, parser)
     works: List[Dict[str, str]] = []
     seen_urls: set = set()
 
@@ -76,6 +80,49 @@ def fetch_author_works(author_url: str, session: requests.Session) -> List[Dict[
     return works
 
 
+def harvest_record(record: Dict[str, Any], session: requests.Session, source: SourceConfig = SOURCE) -> Dict[str, Any]:
+    """Harvest payload for one match record from map_anarchist_library.py."""
+    collection = record.get("collection") or ""
+    thinker = record.get("thinker") or ""
+    slug = record.get("slug") or ""
+    matches = record.get("matches") or []
+
+    if not matches or not collection or not slug:
+        return {
+            "collection": collection,
+            "thinker": thinker,
+            "slug": slug,
+            "source_url": None,
+            "source_id": source.id,
+            "status": "no_source_match",
+            "message": "No Anarchist Library author page matched.",
+            "warnings": record.get("notes", []),
+            "works": [],
+            "visited_urls": [],
+        }
+
+    author_url = matches[0].get("url", "")
+    works = fetch_author_works(author_url, session, source.policy.parser)
+    works_with_source = [{**w, "source_id": source.id} for w in works]
+    return {
+        "collection": collection,
+        "thinker": thinker,
+        "slug": slug,
+        "source_url": author_url,
+        "source_id": source.id,
+        "status": "success" if works_with_source else "no_works_found",
+        "message": f"Collected {len(works_with_source)} works from The Anarchist Library." if works_with_source else "No works found on author page.",
+        "warnings": record.get("notes", []),
+        "works": works_with_source,
+        "visited_urls": [author_url],
+    }
+
+
+def create_harvester(source: SourceConfig, metrics: HttpMetrics, **options: Any) -> HarvesterPlugin:
+    session = build_session(source.policy, "harvest_anarchist_library", metrics)
+    return HarvesterPlugin(source, lambda record: harvest_record(record, session, source), metrics)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Harvest works from The Anarchist Library author pages."
@@ -83,16 +130,17 @@ def main() -> None:
     parser.add_argument(
         "--matches-file",
         type=Path,
-        default=Path("data/zero-works-anarchist-library-matches.json"),
+        default=SOURCE.matches_file,
         help="Output from map_anarchist_library.py",
     )
     parser.add_argument(
         "--output-dir",
         type=Path,
-        default=Path("data/zero-works-harvest/anarchist_library"),
+        default=SOURCE.harvest_dir,
         help="Directory to write per-thinker harvest JSONs.",
     )
     parser.add_argument("--limit", type=int, default=None, help="Limit number of thinkers (debug).")
+    add_metrics_argument(parser, "harvest_anarchist_library")
     args = parser.parse_args()
 
     if not args.matches_file.exists():
@@ -102,65 +150,21 @@ def main() -> None:
     if args.limit is not None:
         records = records[: args.limit]
 
-    session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT})
-    retry = Retry(
-        total=MAX_RETRIES,
-        backoff_factor=0.5,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=("GET",),
-        respect_retry_after_header=True,
-    )
-    session.mount("https://", HTTPAdapter(max_retries=retry))
+    session = build_session(SOURCE.policy, "harvest_anarchist_library")
+    metrics = session.http_metrics
 
     written = 0
     success = 0
     for record in records:
-        collection = record.get("collection") or ""
-        thinker = record.get("thinker") or ""
-        slug = record.get("slug") or ""
-        matches = record.get("matches") or []
-
-        if not matches or not collection or not slug:
-            payload = {
-                "collection": collection,
-                "thinker": thinker,
-                "slug": slug,
-                "source_url": None,
-                "source_id": "anarchist_library",
-                "status": "no_source_match",
-                "message": "No Anarchist Library author page matched.",
-                "warnings": record.get("notes", []),
-                "works": [],
-                "visited_urls": [],
-            }
-        else:
-            author_url = matches[0].get("url", "")
-            works = fetch_author_works(author_url, session)
-            works_with_source = [{**w, "source_id": "anarchist_library"} for w in works]
-            payload = {
-                "collection": collection,
-                "thinker": thinker,
-                "slug": slug,
-                "source_url": author_url,
-                "source_id": "anarchist_library",
-                "status": "success" if works_with_source else "no_works_found",
-                "message": f"Collected {len(works_with_source)} works from The Anarchist Library." if works_with_source else "No works found on author page.",
-                "warnings": record.get("notes", []),
-                "works": works_with_source,
-                "visited_urls": [author_url],
-            }
-            if works_with_source:
-                success += 1
-
-        out_dir = args.output_dir / collection
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_file = out_dir / f"{slug}.json"
-        out_file.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        payload = harvest_record(record, session)
+        write_harvest_payload(args.output_dir, payload)
         written += 1
+        if payload["status"] == "success":
+            success += 1
 
     print(f"Wrote {written} harvest files to {args.output_dir}. Successful: {success}")
+    finish_run(metrics, args.metrics_file)
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
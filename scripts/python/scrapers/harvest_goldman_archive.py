@@ -17,22 +17,29 @@ from __future__ import annotations
 import argparse
 import json
 import re
-import time
+import sys
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Set
 from urllib.parse import urljoin, urlparse
 
 import requests
 from bs4 import BeautifulSoup
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
-
-USER_AGENT = "Marxists Explorer Bot/0.1 (+https://github.com/jeremy-marxists-explorer)"
-REQUEST_TIMEOUT = 15
-REQUEST_DELAY_SECONDS = 1.5
-MAX_RETRIES = 3
-ALLOWED_HOST = "dwardmac.pitzer.edu"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.http_metrics import HttpMetrics, add_metrics_argument, finish_run  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import (  # noqa: E402
+    HarvesterPlugin,
+    SourceConfig,
+    build_session,
+    fetch,
+    get_source,
+    write_harvest_payload,
+)
+
+
+SOURCE = get_source("goldman_archive")
+ALLOWED_HOST = urlparse(SOURCE.base_url).netloc or "dwardmac.pitzer.edu"
 NAV_TITLES = frozenset({
     "home", "about us", "contact us", "other links", "critics corner",
     "biography", "bibliography", "commentary", "graphics", "collected works",
@@ -55,9 +62,9 @@ def is_content_link(href: str, link_text: str) -> bool:
     return True
 
 
-def collect_works_from_page(page_url: str, html: str) -> List[Dict[str, str]]:
+def collect_works_from_page(page_url: str, html: str, parser: str = "html.parser") -> List[Dict[str, str]]:
     """Extract same-domain .htm/.html links from page."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, parser)
     works: List[Dict[str, str]] = []
     seen: Set[str] = set()
     for a in soup.find_all("a", href=True):
@@ -79,9 +86,9 @@ def collect_works_from_page(page_url: str, html: str) -> List[Dict[str, str]]:
     return works
 
 
-def find_collected_works_link(html: str, base_url: str) -> str | None:
+def find_collected_works_link(html: str, base_url: str, parser: str = "html.parser") -> str | None:
     """Find href to 'Collected Works' or 'GoldmanCW' type page."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, parser)
     for a in soup.find_all("a", href=True):
         text = a.get_text(strip=True).lower()
         if "collected works" in text or "writings" in text:
@@ -91,24 +98,19 @@ def find_collected_works_link(html: str, base_url: str) -> str | None:
     return None
 
 
-def fetch_author_works(archive_url: str, session: requests.Session) -> List[Dict[str, str]]:
+def fetch_author_works(archive_url: str, session: requests.Session, parser: str = "html.parser") -> List[Dict[str, str]]:
     """Fetch archive page and optionally Collected Works page; return all work links."""
     try:
-        if REQUEST_DELAY_SECONDS > 0:
-            time.sleep(REQUEST_DELAY_SECONDS)
-        resp = session.get(archive_url, timeout=REQUEST_TIMEOUT)
-        resp.raise_for_status()
+        resp = fetch(session, archive_url)
     except requests.RequestException:
         return []
 
-    works = collect_works_from_page(archive_url, resp.text)
-    cw_url = find_collected_works_link(resp.text, archive_url)
+    works = collect_works_from_page(archive_url, resp.text, parser)
+    cw_url = find_collected_works_link(resp.text, archive_url, parser)
     if cw_url and cw_url != archive_url:
         try:
-            time.sleep(REQUEST_DELAY_SECONDS)
-            resp2 = session.get(cw_url, timeout=REQUEST_TIMEOUT)
-            resp2.raise_for_status()
-            extra = collect_works_from_page(cw_url, resp2.text)
+            resp2 = fetch(session, cw_url)
+            extra = collect_works_from_page(cw_url, resp2.text, parser)
             seen_urls = {w["url"] for w in works}
             for w in extra:
                 if w["url"] not in seen_urls:
@@ -119,6 +121,49 @@ def fetch_author_works(archive_url: str, session: requests.Session) -> List[Dict
     return works
 
 
+def harvest_record(record: Dict[str, Any], session: requests.Session, source: SourceConfig = SOURCE) -> Dict[str, Any]:
+    """Harvest payload for one match record from map_goldman_archive.py."""
+    collection = record.get("collection") or ""
+    thinker = record.get("thinker") or ""
+    slug = record.get("slug") or ""
+    matches = record.get("matches") or []
+
+    if not matches or not collection or not slug:
+        return {
+            "collection": collection,
+            "thinker": thinker,
+            "slug": slug,
+            "source_url": None,
+            "source_id": source.id,
+            "status": "no_source_match",
+            "message": "No Goldman Archive author page matched.",
+            "warnings": record.get("notes", []),
+            "works": [],
+            "visited_urls": [],
+        }
+
+    author_url = matches[0].get("url", "")
+    works = fetch_author_works(author_url, session, source.policy.parser)
+    works_with_source = [{**w, "source_id": source.id} for w in works]
+    return {
+        "collection": collection,
+        "thinker": thinker,
+        "slug": slug,
+        "source_url": author_url,
+        "source_id": source.id,
+        "status": "success" if works_with_source else "no_works_found",
+        "message": f"Collected {len(works_with_source)} works from Goldman Archive." if works_with_source else "No works found on author page.",
+        "warnings": record.get("notes", []),
+        "works": works_with_source,
+        "visited_urls": [author_url],
+    }
+
+
+def create_harvester(source: SourceConfig, metrics: HttpMetrics, **options: Any) -> HarvesterPlugin:
+    session = build_session(source.policy, "harvest_goldman_archive", metrics)
+    return HarvesterPlugin(source, lambda record: harvest_record(record, session, source), metrics)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Harvest works from Goldman Archive author pages."
@@ -126,16 +171,17 @@ def main() -> None:
     parser.add_argument(
         "--matches-file",
         type=Path,
-        default=Path("data/zero-works-goldman-archive-matches.json"),
+        default=SOURCE.matches_file,
         help="Output from map_goldman_archive.py",
     )
     parser.add_argument(
         "--output-dir",
         type=Path,
-        default=Path("data/zero-works-harvest/goldman_archive"),
+        default=SOURCE.harvest_dir,
         help="Directory to write per-thinker harvest JSONs.",
     )
     parser.add_argument("--limit", type=int, default=None, help="Limit thinkers (debug).")
+    add_metrics_argument(parser, "harvest_goldman_archive")
     args = parser.parse_args()
 
     if not args.matches_file.exists():
@@ -145,65 +191,21 @@ def main() -> None:
     if args.limit is not None:
         records = records[: args.limit]
 
-    session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT})
-    retry = Retry(
-        total=MAX_RETRIES,
-        backoff_factor=0.5,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=("GET",),
-        respect_retry_after_header=True,
-    )
-    session.mount("http://", HTTPAdapter(max_retries=retry))
+    session = build_session(SOURCE.policy, "harvest_goldman_archive")
+    metrics = session.http_metrics
 
     written = 0
     success = 0
     for record in records:
-        collection = record.get("collection") or ""
-        thinker = record.get("thinker") or ""
-        slug = record.get("slug") or ""
-        matches = record.get("matches") or []
-
-        if not matches or not collection or not slug:
-            payload = {
-                "collection": collection,
-                "thinker": thinker,
-                "slug": slug,
-                "source_url": None,
-                "source_id": "goldman_archive",
-                "status": "no_source_match",
-                "message": "No Goldman Archive author page matched.",
-                "warnings": record.get("notes", []),
-                "works": [],
-                "visited_urls": [],
-            }
-        else:
-            author_url = matches[0].get("url", "")
-            works = fetch_author_works(author_url, session)
-            works_with_source = [{**w, "source_id": "goldman_archive"} for w in works]
-            payload = {
-                "collection": collection,
-                "thinker": thinker,
-                "slug": slug,
-                "source_url": author_url,
-                "source_id": "goldman_archive",
-                "status": "success" if works_with_source else "no_works_found",
-                "message": f"Collected {len(works_with_source)} works from Goldman Archive." if works_with_source else "No works found on author page.",
-                "warnings": record.get("notes", []),
-                "works": works_with_source,
-                "visited_urls": [author_url],
-            }
-            if works_with_source:
-                success += 1
-
-        out_dir = args.output_dir / collection
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_file = out_dir / f"{slug}.json"
-        out_file.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        payload = harvest_record(record, session)
+        write_harvest_payload(args.output_dir, payload)
         written += 1
+        if payload["status"] == "success":
+            success += 1
 
     print(f"Wrote {written} harvest files to {args.output_dir}. Successful: {success}")
+    finish_run(metrics, args.metrics_file)
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
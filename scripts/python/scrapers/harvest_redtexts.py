@@ -17,10 +17,61 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
+from typing import Any, Dict
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.http_metrics import HttpMetrics  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import HarvesterPlugin, SourceConfig, get_source, write_harvest_payload  # noqa: E402
 
-REDTEXTS_INDEX_URL = "https://www.redtexts.org/"
+
+SOURCE = get_source("redtexts")
+REDTEXTS_INDEX_URL = SOURCE.index_url or "https://www.redtexts.org/"
+
+
+def harvest_record(record: Dict[str, Any], source: SourceConfig = SOURCE) -> Dict[str, Any]:
+    """Harvest payload for one match record; the works are already embedded in it."""
+    collection = record.get("collection") or ""
+    thinker = record.get("thinker") or ""
+    slug = record.get("slug") or ""
+    matches = record.get("matches") or []
+
+    if not matches or not collection or not slug:
+        return {
+            "collection": collection,
+            "thinker": thinker,
+            "slug": slug,
+            "source_url": None,
+            "source_id": source.id,
+            "status": "no_source_match",
+            "message": "No redtexts.org author section matched.",
+            "warnings": record.get("notes", []),
+            "works": [],
+            "visited_urls": [],
+        }
+
+    first_match = matches[0]
+    works = first_match.get("works") or []
+    works_with_source = [{**w, "source_id": source.id} for w in works]
+    return {
+        "collection": collection,
+        "thinker": thinker,
+        "slug": slug,
+        "source_url": first_match.get("url") or REDTEXTS_INDEX_URL,
+        "source_id": source.id,
+        "status": "success" if works_with_source else "no_works_found",
+        "message": f"Collected {len(works_with_source)} works from redtexts.org." if works_with_source else "No works in matched section.",
+        "warnings": record.get("notes", []),
+        "works": works_with_source,
+        "visited_urls": [REDTEXTS_INDEX_URL],
+    }
+
+
+def create_harvester(source: SourceConfig, metrics: HttpMetrics, **options: Any) -> HarvesterPlugin:
+    # Nothing to fetch: map_redtexts_sources.py already embedded the works
+    return HarvesterPlugin(source, lambda record: harvest_record(record, source), metrics)
 
 
 def main() -> None:
@@ -30,13 +81,13 @@ def main() -> None:
     parser.add_argument(
         "--matches-file",
         type=Path,
-        default=Path("data/zero-works-redtexts-matches.json"),
+        default=SOURCE.matches_file,
         help="Output from map_redtexts_sources.py",
     )
     parser.add_argument(
         "--output-dir",
         type=Path,
-        default=Path("data/zero-works-harvest/redtexts"),
+        default=SOURCE.harvest_dir,
         help="Directory to write per-thinker harvest JSONs.",
     )
     args = parser.parse_args()
@@ -47,49 +98,11 @@ def main() -> None:
     records = json.loads(args.matches_file.read_text(encoding="utf-8"))
     written = 0
     for record in records:
-        collection = record.get("collection") or ""
-        thinker = record.get("thinker") or ""
-        slug = record.get("slug") or ""
-        matches = record.get("matches") or []
-
-        if not matches or not collection or not slug:
-            payload = {
-                "collection": collection,
-                "thinker": thinker,
-                "slug": slug,
-                "source_url": None,
-                "source_id": "redtexts",
-                "status": "no_source_match",
-                "message": "No redtexts.org author section matched.",
-                "warnings": record.get("notes", []),
-                "works": [],
-                "visited_urls": [],
-            }
-        else:
-            first_match = matches[0]
-            works = first_match.get("works") or []
-            works_with_source = [{**w, "source_id": "redtexts"} for w in works]
-            payload = {
-                "collection": collection,
-                "thinker": thinker,
-                "slug": slug,
-                "source_url": first_match.get("url") or REDTEXTS_INDEX_URL,
-                "source_id": "redtexts",
-                "status": "success" if works_with_source else "no_works_found",
-                "message": f"Collected {len(works_with_source)} works from redtexts.org." if works_with_source else "No works in matched section.",
-                "warnings": record.get("notes", []),
-                "works": works_with_source,
-                "visited_urls": [REDTEXTS_INDEX_URL],
-            }
-
-        out_dir = args.output_dir / collection
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_file = out_dir / f"{slug}.json"
-        out_file.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        write_harvest_payload(args.output_dir, harvest_record(record))
         written += 1
 
     print(f"Wrote {written} harvest files to {args.output_dir}")
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
@@ -18,26 +18,37 @@ from __future__ import annotations
 import argparse
 import json
 import re
-import time
+import sys
 import unicodedata
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import requests
 from bs4 import BeautifulSoup
 from requests import Response
-from requests.adapters import HTTPAdapter
-from urllib.parse import urljoin, urlparse, urlunparse
-from urllib3.util.retry import Retry
+from urllib.parse import urljoin, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.http_metrics import HttpMetrics, add_metrics_argument, finish_run  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import (  # noqa: E402
+    HarvesterPlugin,
+    SourceConfig,
+    build_session,
+    fetch,
+    get_source,
+    write_harvest_payload,
+)
+from util.urls import canonicalize_url  # noqa: E402
 
 
-USER_AGENT = "Marxists Explorer Bot/0.1 (+https://github.com/jeremy-marxists-explorer)"
-REQUEST_TIMEOUT = 15
-REQUEST_DELAY_SECONDS = 1.0
+SOURCE = get_source("mia")
 MAX_CRAWL_DEPTH = 3
-MAX_RETRIES = 3
+# Thinkers crawled at once; the crawl scheduler still holds the host to its policy
+DEFAULT_WORKERS = 4
 
 LINK_KEYWORDS = (
     "/works/",
@@ -95,32 +106,15 @@ class HarvestResult:
 
 
 class WorkHarvester:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": USER_AGENT})
-        retry = Retry(
-            total=MAX_RETRIES,
-            backoff_factor=0.5,
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=("GET",),
-            respect_retry_after_header=True,
-        )
-        self.session.mount("https://", HTTPAdapter(max_retries=retry))
-        self.session.mount("http://", HTTPAdapter(max_retries=retry))
-        self._last_request_timestamp = 0.0
-
-    def _throttled_get(self, url: str) -> Response:
-        elapsed = time.time() - self._last_request_timestamp
-        if elapsed < REQUEST_DELAY_SECONDS:
-            time.sleep(max(0.0, REQUEST_DELAY_SECONDS - elapsed))
-        response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        self._last_request_timestamp = time.time()
-        return response
+    def __init__(self, metrics: Optional[HttpMetrics] = None, source: SourceConfig = SOURCE):
+        self.source = source
+        self.parser = source.policy.parser
+        self.session = build_session(source.policy, "harvest_zero_work_thinkers", metrics)
+        self.metrics: HttpMetrics = self.session.http_metrics
 
     def _parse(self, url: str) -> Tuple[BeautifulSoup, Response]:
-        response = self._throttled_get(url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = fetch(self.session, url)
+        soup = BeautifulSoup(response.content, self.parser)
         return soup, response
 
     def harvest(self, thinker: ThinkerMatch, max_depth: int = MAX_CRAWL_DEPTH) -> HarvestResult:
@@ -135,12 +129,12 @@ class WorkHarvester:
                 status="no_source_match",
                 message="No Marxists.org author page was identified.",
                 warnings=thinker.notes,
-                source_id="mia",
+                source_id=self.source.id,
             )
 
         # Prefer the first match (closest to exact name)
         primary_match = thinker.matches[0]
-        source_url = self._canonicalize_url(primary_match["url"])
+        source_url = canonicalize_url(primary_match["url"])
         source_root = self._get_author_root(source_url)
 
         queue: deque[Tuple[str, int]] = deque()
@@ -172,7 +166,7 @@ class WorkHarvester:
                     continue
 
                 href = link["href"]
-                next_url = self._canonicalize_url(urljoin(current_url, href))
+                next_url = canonicalize_url(urljoin(current_url, href))
 
                 if self._is_candidate_work(next_url, title, depth, source_root, source_url):
                     works[next_url] = {
@@ -204,7 +198,7 @@ class WorkHarvester:
             status=status,
             message=message,
             warnings=warnings,
-            source_id="mia",
+            source_id=self.source.id,
         )
 
     @staticmethod
@@ -218,12 +212,6 @@ class WorkHarvester:
             root_path += "/"
         return f"{parsed.scheme}://{parsed.netloc}/{root_path}"
 
-    @staticmethod
-    def _canonicalize_url(url: str) -> str:
-        parsed = urlparse(url)
-        cleaned = parsed._replace(path=parsed.path or "/", query="", fragment="")
-        return urlunparse(cleaned)
-
     @staticmethod
     def _contains_keyword(path: str) -> bool:
         lowered = path.lower()
@@ -320,31 +308,27 @@ class WorkHarvester:
         return False
 
 
+def thinker_match(record: Dict[str, Any]) -> ThinkerMatch:
+    return ThinkerMatch(
+        collection=record["collection"],
+        thinker=record["thinker"],
+        slug=record["slug"],
+        status=record.get("status", ""),
+        matches=record.get("matches", []),
+        notes=record.get("notes", []),
+    )
+
+
 def load_matches(path: Path, limit: Optional[int] = None) -> List[ThinkerMatch]:
     raw_records = json.loads(path.read_text(encoding="utf-8"))
-    matches: List[ThinkerMatch] = []
-    for record in raw_records[: limit or len(raw_records)]:
-        matches.append(
-            ThinkerMatch(
-                collection=record["collection"],
-                thinker=record["thinker"],
-                slug=record["slug"],
-                status=record.get("status", ""),
-                matches=record.get("matches", []),
-                notes=record.get("notes", []),
-            )
-        )
-    return matches
+    return [thinker_match(record) for record in raw_records[: limit or len(raw_records)]]
 
 
-def write_result(output_dir: Path, result: HarvestResult, source_id: str = "mia") -> None:
-    thinker_dir = output_dir / result.collection
-    thinker_dir.mkdir(parents=True, exist_ok=True)
-    output_file = thinker_dir / f"{result.slug}.json"
+def result_payload(result: HarvestResult, source_id: str = "mia") -> Dict[str, Any]:
     works_with_source = [
         {**w, "source_id": source_id} for w in result.works
     ]
-    payload = {
+    return {
         "collection": result.collection,
         "thinker": result.thinker,
         "slug": result.slug,
@@ -356,7 +340,10 @@ def write_result(output_dir: Path, result: HarvestResult, source_id: str = "mia"
         "works": works_with_source,
         "visited_urls": result.visited_urls,
     }
-    output_file.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def write_result(output_dir: Path, result: HarvestResult, source_id: str = "mia") -> None:
+    write_harvest_payload(output_dir, result_payload(result, source_id))
 
 
 def load_register(path: Path) -> Dict[Tuple[str, str], Dict[str, object]]:
@@ -411,12 +398,26 @@ def update_register_entry(
         )
 
 
+def create_harvester(
+    source: SourceConfig,
+    metrics: HttpMetrics,
+    max_depth: int = MAX_CRAWL_DEPTH,
+    **options: Any,
+) -> HarvesterPlugin:
+    harvester = WorkHarvester(metrics, source)
+    return HarvesterPlugin(
+        source,
+        lambda record: result_payload(harvester.harvest(thinker_match(record), max_depth=max_depth), source.id),
+        metrics,
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Harvest works for zero-work thinkers.")
     parser.add_argument(
         "--matches-file",
         type=Path,
-        default=Path("data/zero-works-source-matches.json"),
+        default=SOURCE.matches_file,
         help="Input file generated by map_zero_work_sources.py",
     )
     parser.add_argument(
@@ -449,6 +450,13 @@ def main() -> None:
         default=MAX_CRAWL_DEPTH,
         help=f"Maximum crawl depth from the source page (default: {MAX_CRAWL_DEPTH}).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Thinkers to harvest concurrently (default: {DEFAULT_WORKERS}).",
+    )
+    add_metrics_argument(parser, "harvest_zero_work_thinkers")
     args = parser.parse_args()
 
     matches = load_matches(args.matches_file, limit=args.limit)
@@ -461,20 +469,22 @@ def main() -> None:
     if args.register_file:
         register = load_register(args.register_file)
 
-    for record in matches:
-        result = harvester.harvest(record, max_depth=args.max_depth)
-        write_result(args.output_dir, result, source_id=args.source_id)
-        if result.status == "success":
-            successes += 1
-            if args.register_file:
-                update_register_entry(register, result)
-        print(f"[{result.status:>15}] {record.thinker}: {result.message}")
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        results = executor.map(lambda record: harvester.harvest(record, max_depth=args.max_depth), matches)
+        for record, result in zip(matches, results):
+            write_result(args.output_dir, result, source_id=args.source_id)
+            if result.status == "success":
+                successes += 1
+                if args.register_file:
+                    update_register_entry(register, result)
+            print(f"[{result.status:>15}] {record.thinker}: {result.message}")
 
     if args.register_file:
         save_register(args.register_file, register)
 
     print(f"\nCompleted harvest for {total} thinkers. Successful: {successes}, failures: {total - successes}")
+    finish_run(harvester.metrics, args.metrics_file)
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Map zero-work thinkers against every enabled source in one pass.
+
+Runs the mapper plugin of every source enabled in scripts/config/sources.json
+(util/sources.py) together instead of one mapper script after another:
+
+- the author indexes are fetched concurrently, one thread per source, each through the index
+  cache (util/index_cache.py), so the stage takes as long as the slowest
+  source rather than the sum of all of them
+- data/zero-works-thinkers.json is read once and each thinker is matched
+  against every lookup in a single loop; canonical_key is memoized, so each
+  name is normalized once however many sources it is matched against
+- each source's results are written to the file and in the format its own
+  mapper writes, so the harvesters read them unchanged
+- data/zero-works-candidates.json ranks every source's candidates for each
+  thinker: by status (exact, last-name, fuzzy), then confidence, then the
+  merge priority of the source
+
+A source whose index cannot be fetched (and has no cached copy) is skipped,
+its matches file is left as it was, and the run exits with status 1 after
+writing the others.
+
+Usage:
+    python scripts/python/scrapers/map_all_sources.py
+    python scripts/python/scrapers/map_all_sources.py --sources mia redtexts --limit 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrapers.merge_harvest_sources import DEFAULT_SOURCE_PRIORITY  # noqa: E402
+from util.http_metrics import HttpMetrics, add_metrics_argument, finish_run  # noqa: E402
+from util.index_cache import add_index_cache_arguments, index_cache_from_args  # noqa: E402
+from util.name_matching import TrigramNameIndex, add_fuzzy_arguments, fuzzy_threshold_from_args  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import DEFAULT_SOURCES_FILE, MapperPlugin, create_mapper, select_sources  # noqa: E402
+
+
+DEFAULT_CANDIDATES_FILE = Path("data/zero-works-candidates.json")
+STATUS_RANK = {"matched": 0, "last_name_match": 1, "fuzzy_match": 2}
+
+
+def load_lookups(
+    mappers: List[MapperPlugin],
+    args: argparse.Namespace,
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch every mapper's lookup concurrently; sources that fail are reported and left out."""
+
+    def load(mapper: MapperPlugin) -> Dict[str, Any]:
+        started = time.perf_counter()
+        source = mapper.source
+        cache = index_cache_from_args(args, source.id, mapper.index_url, ttl_hours=source.policy.index_ttl_hours)
+        lookup = mapper.load(cache)
+        outcome = cache.outcome if cache is not None else "parsed"
+        print(f"  {source.id}: {len(lookup)} index keys ({outcome}, {time.perf_counter() - started:.1f}s)")
+        return lookup
+
+    lookups: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(mappers))) as executor:
+        futures = {mapper.source.id: executor.submit(load, mapper) for mapper in mappers}
+        for source_id, future in futures.items():
+            try:
+                lookups[source_id] = future.result()
+            except requests.RequestException as exc:
+                print(f"Error fetching {source_id} index: {exc}", file=sys.stderr)
+    return lookups
+
+
+def rank_candidates(results: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Every matched candidate across sources for one thinker, best first."""
+    candidates = []
+    for source_id, result in results.items():
+        if result["status"] == "unmatched":
+            continue
+        for match in result["matches"]:
+            candidates.append(
+                {
+                    "source_id": source_id,
+                    "status": result["status"],
+                    "confidence": match.get("confidence", 1.0),
+                    "text": match.get("text"),
+                    "url": match.get("url"),
+                }
+            )
+    priority = {source_id: position for position, source_id in enumerate(DEFAULT_SOURCE_PRIORITY)}
+    candidates.sort(
+        key=lambda item: (
+            STATUS_RANK.get(item["status"], len(STATUS_RANK)),
+            -item["confidence"],
+            priority.get(item["source_id"], len(priority)),
+        )
+    )
+    return candidates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Map zero-work thinkers against all enabled sources concurrently.")
+    parser.add_argument(
+        "--zero-file",
+        type=Path,
+        default=Path("data/zero-works-thinkers.json"),
+        help="Input JSON file created by extract_zero_works.py",
+    )
+    parser.add_argument(
+        "--sources-file",
+        type=Path,
+        default=DEFAULT_SOURCES_FILE,
+        help="Source config; sources with \"enabled\": false are skipped.",
+    )
+    parser.add_argument("--sources", nargs="+", default=None, help="Only map these source ids.")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Write the per-source match files here instead of their usual paths under data/.",
+    )
+    parser.add_argument(
+        "--candidates-file",
+        type=Path,
+        default=DEFAULT_CANDIDATES_FILE,
+        help="Combined candidate ranking across sources.",
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Limit number of thinkers (debug).")
+    add_fuzzy_arguments(parser)
+    add_index_cache_arguments(parser)
+    add_metrics_argument(parser, "map_all_sources")
+    args = parser.parse_args()
+
+    try:
+        sources = select_sources("mapper", args.sources, args.sources_file)
+    except KeyError as exc:
+        parser.error(str(exc))
+    if not sources:
+        parser.error("No enabled sources with a mapper")
+
+    metrics = HttpMetrics("map_all_sources")
+    mappers = [create_mapper(source, metrics) for source in sources]
+    print(f"Loading {len(mappers)} source indexes...")
+    lookups = load_lookups(mappers, args)
+    failed = [mapper.source.id for mapper in mappers if mapper.source.id not in lookups]
+    mappers = [mapper for mapper in mappers if mapper.source.id in lookups]
+
+    threshold = fuzzy_threshold_from_args(args)
+    fuzzy_indexes = {
+        mapper.source.id: TrigramNameIndex(lookups[mapper.source.id]) if threshold is not None else None
+        for mapper in mappers
+    }
+
+    zero_records = json.loads(args.zero_file.read_text(encoding="utf-8"))
+    if args.limit is not None:
+        zero_records = zero_records[: args.limit]
+
+    per_source: Dict[str, List[Dict[str, Any]]] = {mapper.source.id: [] for mapper in mappers}
+    ranking = []
+    for record in zero_records:
+        record_results = {}
+        for mapper in mappers:
+            source_id = mapper.source.id
+            result = mapper.match(record, lookups[source_id], fuzzy_indexes[source_id], threshold)
+            per_source[source_id].append(result)
+            record_results[source_id] = result
+        ranking.append(
+            {
+                "collection": record["collection"],
+                "thinker": record["thinker"],
+                "slug": record["slug"],
+                "candidates": rank_candidates(record_results),
+            }
+        )
+
+    for mapper in mappers:
+        source = mapper.source
+        results = per_source[source.id]
+        output_file = source.matches_file or Path(f"data/zero-works-{source.id}-matches.json")
+        if args.output_dir:
+            output_file = args.output_dir / output_file.name
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        matched = sum(1 for result in results if result["status"] != "unmatched")
+        print(f"  {source.id}: mapped {matched} of {len(results)} thinkers. Wrote {output_file}")
+
+    args.candidates_file.parent.mkdir(parents=True, exist_ok=True)
+    args.candidates_file.write_text(json.dumps(ranking, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    with_candidates = sum(1 for entry in ranking if entry["candidates"])
+    print(f"{with_candidates} of {len(ranking)} thinkers have at least one candidate. Wrote {args.candidates_file}")
+    finish_run(metrics, args.metrics_file)
+
+    if failed:
+        print(f"[ERROR] Could not load the index for: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_profiled(main)
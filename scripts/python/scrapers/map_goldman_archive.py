@@ -17,40 +17,31 @@ from __future__ import annotations
 import argparse
 import json
 import sys
-import time
-import unicodedata
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from requests import Response
 
-
-GOLDMAN_ARCHIVE_INDEX = "http://dwardmac.pitzer.edu/goldman/goldmanarchive.html"
-USER_AGENT = "Marxists Explorer Bot/0.1 (+https://github.com/jeremy-marxists-explorer)"
-REQUEST_TIMEOUT = 15
-REQUEST_DELAY_SECONDS = 1.0
-MAX_RETRIES = 3
-BASE_URL = "http://dwardmac.pitzer.edu"
-
-
-def normalize_name(name: str) -> str:
-    normalized = unicodedata.normalize("NFKD", name)
-    ascii_name = normalized.encode("ascii", "ignore").decode("ascii")
-    tokens = [t for t in ascii_name.lower().replace("&", " ").replace(",", " ").split() if t]
-    return " ".join(tokens)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.http_metrics import HttpMetrics, add_metrics_argument, finish_run  # noqa: E402
+from util.index_cache import SourceIndexCache, add_index_cache_arguments, index_cache_from_args  # noqa: E402
+from util.name_matching import TrigramNameIndex, add_fuzzy_arguments, fuzzy_threshold_from_args  # noqa: E402
+from util.names import canonical_key, last_first, normalize_name  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import MapperPlugin, SourceConfig, build_session, fetch, get_source  # noqa: E402
 
 
-def name_tokens(name: str) -> List[str]:
-    return normalize_name(name).split()
+SOURCE = get_source("goldman_archive")
+GOLDMAN_ARCHIVE_INDEX = SOURCE.index_url or "http://dwardmac.pitzer.edu/goldman/goldmanarchive.html"
+BASE_URL = "http://dwardmac.pitzer.edu"
 
 
-def parse_index(html: str) -> Dict[str, str]:
+def parse_index(html: str, parser: str = "html.parser") -> Dict[str, str]:
     """Parse Goldman Archive index for author name -> archive URL (Cynosure section)."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, parser)
     name_to_url: Dict[str, str] = {}
     skip_sections = frozenset({
         "bright but lesser lights", "pamphlets", "periodicals", "anarchist history",
@@ -70,15 +61,80 @@ def parse_index(html: str) -> Dict[str, str]:
             continue
         if normalize_name(text) in skip_sections:
             continue
-        norm = normalize_name(text)
-        name_to_url[norm] = full_url
-        tokens = name_tokens(text)
-        if len(tokens) >= 2:
-            last_first = f"{tokens[-1]} {' '.join(tokens[:-1])}"
-            name_to_url[normalize_name(last_first)] = full_url
+        name_to_url[canonical_key(text)] = full_url
+        reordered = last_first(text)
+        if " " in reordered:
+            name_to_url[canonical_key(reordered)] = full_url
     return name_to_url
 
 
+def fetch_index_page(session: requests.Session, headers: Optional[Dict[str, str]] = None) -> Response:
+    return fetch(session, GOLDMAN_ARCHIVE_INDEX, headers)
+
+
+def load_author_lookup(
+    session: requests.Session,
+    index_cache: Optional[SourceIndexCache] = None,
+    source: SourceConfig = SOURCE,
+) -> Dict[str, str]:
+    """Fetch and parse the archive index, or reuse the parsed lookup from index_cache."""
+    if index_cache is None:
+        return parse_index(fetch_index_page(session).text, source.policy.parser)
+    return index_cache.lookup(
+        fetch=lambda headers: fetch_index_page(session, headers),
+        parse=lambda response: parse_index(response.text, source.policy.parser),
+    )
+
+
+def match_record(
+    record: Dict[str, str],
+    lookup: Dict[str, str],
+    fuzzy_index: Optional[TrigramNameIndex] = None,
+    threshold: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Match one zero-work thinker record against the Goldman Archive lookup."""
+    thinker = record["thinker"]
+    collection = record["collection"]
+    slug = record["slug"]
+    thinker_norm = canonical_key(thinker)
+
+    url = lookup.get(thinker_norm)
+    if not url and thinker_norm:
+        url = lookup.get(canonical_key(last_first(thinker)))
+    status = "matched" if url else "unmatched"
+    confidence = 1.0
+    notes: List[str] = []
+    if not url and fuzzy_index is not None and thinker_norm:
+        fuzzy = fuzzy_index.search(thinker_norm, threshold=threshold, limit=1)
+        if fuzzy:
+            key, confidence = fuzzy[0]
+            url = lookup[key]
+            status = "fuzzy_match"
+            notes.append(f"Fuzzy name match with {key!r} (similarity {confidence:.2f})")
+
+    matches = [{"text": thinker, "url": url, "confidence": confidence}] if url else []
+
+    return {
+        "collection": collection,
+        "thinker": thinker,
+        "slug": slug,
+        "status": status,
+        "source_id": "goldman_archive",
+        "matches": matches,
+        "notes": notes,
+    }
+
+
+def create_mapper(source: SourceConfig, metrics: HttpMetrics) -> MapperPlugin:
+    session = build_session(source.policy, "map_goldman_archive", metrics)
+    return MapperPlugin(
+        source,
+        GOLDMAN_ARCHIVE_INDEX,
+        lambda index_cache: load_author_lookup(session, index_cache, source),
+        match_record,
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Map zero-work thinkers to Goldman Archive (Pitzer) author pages."
@@ -92,67 +148,41 @@ def main() -> None:
     parser.add_argument(
         "--output-file",
         type=Path,
-        default=Path("data/zero-works-goldman-archive-matches.json"),
+        default=SOURCE.matches_file,
         help="Output matches for harvester.",
     )
     parser.add_argument("--limit", type=int, default=None, help="Limit thinkers (debug).")
+    add_fuzzy_arguments(parser)
+    add_index_cache_arguments(parser)
+    add_metrics_argument(parser, "map_goldman_archive")
     args = parser.parse_args()
 
-    session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT})
-    retry = Retry(
-        total=MAX_RETRIES,
-        backoff_factor=0.5,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=("GET",),
-        respect_retry_after_header=True,
-    )
-    session.mount("http://", HTTPAdapter(max_retries=retry))
+    metrics = HttpMetrics("map_goldman_archive")
+    session = build_session(SOURCE.policy, "map_goldman_archive", metrics)
+    index_cache = index_cache_from_args(args, SOURCE.id, GOLDMAN_ARCHIVE_INDEX, ttl_hours=SOURCE.policy.index_ttl_hours)
 
     try:
-        if REQUEST_DELAY_SECONDS > 0:
-            time.sleep(REQUEST_DELAY_SECONDS)
-        resp = session.get(GOLDMAN_ARCHIVE_INDEX, timeout=REQUEST_TIMEOUT)
-        resp.raise_for_status()
-        lookup = parse_index(resp.text)
+        lookup = load_author_lookup(session, index_cache)
     except requests.RequestException as e:
         print(f"Error fetching Goldman Archive index: {e}", file=sys.stderr)
+        finish_run(metrics, args.metrics_file)
         sys.exit(1)
 
+    threshold = fuzzy_threshold_from_args(args)
+    fuzzy_index = TrigramNameIndex(lookup) if threshold is not None else None
+
     zero_records = json.loads(args.zero_file.read_text(encoding="utf-8"))
     if args.limit is not None:
         zero_records = zero_records[: args.limit]
 
-    results: List[Dict[str, Any]] = []
-    for record in zero_records:
-        thinker = record["thinker"]
-        collection = record["collection"]
-        slug = record["slug"]
-        thinker_norm = normalize_name(thinker)
-        thinker_tokens = name_tokens(thinker)
-
-        url = lookup.get(thinker_norm)
-        if not url and thinker_tokens:
-            url = lookup.get(normalize_name(f"{thinker_tokens[-1]} {' '.join(thinker_tokens[:-1])}"))
-
-        status = "matched" if url else "unmatched"
-        matches = [{"text": thinker, "url": url}] if url else []
-
-        results.append({
-            "collection": collection,
-            "thinker": thinker,
-            "slug": slug,
-            "status": status,
-            "source_id": "goldman_archive",
-            "matches": matches,
-            "notes": [],
-        })
+    results = [match_record(record, lookup, fuzzy_index, threshold) for record in zero_records]
 
     args.output_file.parent.mkdir(parents=True, exist_ok=True)
     args.output_file.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
-    matched = sum(1 for r in results if r["status"] == "matched")
+    matched = sum(1 for r in results if r["status"] != "unmatched")
     print(f"Mapped {matched} of {len(results)} thinkers to Goldman Archive. Wrote {args.output_file}")
+    finish_run(metrics, args.metrics_file)
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
@@ -18,45 +18,35 @@ from __future__ import annotations
 import argparse
 import json
 import sys
-import time
-import unicodedata
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
 from bs4 import BeautifulSoup
 from requests import Response
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.http_metrics import HttpMetrics, add_metrics_argument, finish_run  # noqa: E402
+from util.index_cache import SourceIndexCache, add_index_cache_arguments, index_cache_from_args  # noqa: E402
+from util.name_matching import TrigramNameIndex, add_fuzzy_arguments, fuzzy_threshold_from_args  # noqa: E402
+from util.names import canonical_key, last_first  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import MapperPlugin, SourceConfig, build_session, fetch, get_source  # noqa: E402
 
-REDTEXTS_INDEX_URL = "https://www.redtexts.org/"
-USER_AGENT = "Marxists Explorer Bot/0.1 (+https://github.com/jeremy-marxists-explorer)"
-REQUEST_TIMEOUT = 15
-REQUEST_DELAY_SECONDS = 1.0
-MAX_RETRIES = 3
 
+SOURCE = get_source("redtexts")
+REDTEXTS_INDEX_URL = SOURCE.index_url or "https://www.redtexts.org/"
 
-def normalize_name(name: str) -> str:
-    normalized = unicodedata.normalize("NFKD", name)
-    ascii_name = normalized.encode("ascii", "ignore").decode("ascii")
-    tokens = [t for t in ascii_name.lower().replace("&", " ").replace(",", " ").split() if t]
-    return " ".join(tokens)
 
-
-def name_tokens(name: str) -> List[str]:
-    return normalize_name(name).split()
-
-
-def parse_redtexts_index(html: str, base_url: str) -> Dict[str, List[Dict[str, str]]]:
+def parse_redtexts_index(html: str, base_url: str, parser: str = "html.parser") -> Dict[str, List[Dict[str, str]]]:
     """
     Parse redtexts index HTML into author/section name -> list of {title, url}.
     Structure: <tr><th colspan=3>Author or section name</th></tr> then
     <tr><td><a href="./html/...">Title</a></td>...</tr> for each work.
     """
     author_works: Dict[str, List[Dict[str, str]]] = {}
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, parser)
     tables = soup.find_all("table")
     if not tables:
         return author_works
@@ -94,15 +84,99 @@ def build_author_lookup(author_works: Dict[str, List[Dict[str, str]]]) -> Dict[s
     for author_name, works in author_works.items():
         if not works:
             continue
-        norm = normalize_name(author_name)
-        lookup[norm] = (author_name, works)
-        tokens = name_tokens(author_name)
-        if len(tokens) >= 2:
-            last_first = f"{tokens[-1]} {' '.join(tokens[:-1])}"
-            lookup[normalize_name(last_first)] = (author_name, works)
+        lookup[canonical_key(author_name)] = (author_name, works)
+        reordered = last_first(author_name)
+        if " " in reordered:
+            lookup[canonical_key(reordered)] = (author_name, works)
     return lookup
 
 
+def fetch_index_page(session: requests.Session, headers: Optional[Dict[str, str]] = None) -> Response:
+    return fetch(session, REDTEXTS_INDEX_URL, headers)
+
+
+def load_author_lookup(
+    session: requests.Session,
+    index_cache: Optional[SourceIndexCache] = None,
+    source: SourceConfig = SOURCE,
+) -> Dict[str, Tuple[str, List[Dict[str, str]]]]:
+    """Fetch and parse the index, or reuse the parsed lookup from index_cache."""
+
+    def parse(response: Response) -> Dict[str, Tuple[str, List[Dict[str, str]]]]:
+        return build_author_lookup(parse_redtexts_index(response.text, REDTEXTS_INDEX_URL, source.policy.parser))
+
+    if index_cache is None:
+        return parse(fetch_index_page(session))
+    return index_cache.lookup(
+        fetch=lambda headers: fetch_index_page(session, headers),
+        parse=parse,
+        decode=lambda cached: {key: (author, works) for key, (author, works) in cached.items()},
+    )
+
+
+def match_record(
+    record: Dict[str, str],
+    lookup: Dict[str, Tuple[str, List[Dict[str, str]]]],
+    fuzzy_index: Optional[TrigramNameIndex] = None,
+    threshold: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Match one zero-work thinker record against the redtexts lookup."""
+    thinker = record["thinker"]
+    collection = record["collection"]
+    slug = record["slug"]
+    thinker_norm = canonical_key(thinker)
+    thinker_reordered = canonical_key(last_first(thinker))
+
+    match_data = None
+    status = "unmatched"
+    notes: List[str] = []
+
+    if thinker_norm in lookup:
+        author_name, works = lookup[thinker_norm]
+        match_data = {
+            "text": author_name,
+            "url": REDTEXTS_INDEX_URL,
+            "works": works,
+            "confidence": 1.0,
+        }
+        status = "matched"
+    elif thinker_reordered:
+        if thinker_reordered in lookup:
+            author_name, works = lookup[thinker_reordered]
+            match_data = {"text": author_name, "url": REDTEXTS_INDEX_URL, "works": works, "confidence": 1.0}
+            status = "last_name_match"
+            notes.append("Matched on last name only")
+    if match_data is None and fuzzy_index is not None and thinker_norm:
+        fuzzy = fuzzy_index.search(thinker_norm, threshold=threshold, limit=1)
+        if fuzzy:
+            key, confidence = fuzzy[0]
+            author_name, works = lookup[key]
+            match_data = {"text": author_name, "url": REDTEXTS_INDEX_URL, "works": works, "confidence": confidence}
+            status = "fuzzy_match"
+            notes.append(f"Fuzzy name match with {author_name!r} (similarity {confidence:.2f})")
+
+    matches = [match_data] if match_data else []
+    return {
+        "collection": collection,
+        "thinker": thinker,
+        "slug": slug,
+        "status": status,
+        "source_id": "redtexts",
+        "matches": matches,
+        "notes": notes,
+    }
+
+
+def create_mapper(source: SourceConfig, metrics: HttpMetrics) -> MapperPlugin:
+    session = build_session(source.policy, "map_redtexts_sources", metrics)
+    return MapperPlugin(
+        source,
+        REDTEXTS_INDEX_URL,
+        lambda index_cache: load_author_lookup(session, index_cache, source),
+        match_record,
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Map zero-work thinkers to redtexts.org and extract works.")
     parser.add_argument(
@@ -114,85 +188,41 @@ def main() -> None:
     parser.add_argument(
         "--output-file",
         type=Path,
-        default=Path("data/zero-works-redtexts-matches.json"),
+        default=SOURCE.matches_file,
         help="Output matches with embedded works.",
     )
     parser.add_argument("--limit", type=int, default=None, help="Limit number of thinkers (debug).")
+    add_fuzzy_arguments(parser)
+    add_index_cache_arguments(parser)
+    add_metrics_argument(parser, "map_redtexts_sources")
     args = parser.parse_args()
 
-    session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT})
-    retry = Retry(
-        total=MAX_RETRIES,
-        backoff_factor=0.5,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=("GET",),
-        respect_retry_after_header=True,
-    )
-    session.mount("https://", HTTPAdapter(max_retries=retry))
-    session.mount("http://", HTTPAdapter(max_retries=retry))
+    metrics = HttpMetrics("map_redtexts_sources")
+    session = build_session(SOURCE.policy, "map_redtexts_sources", metrics)
+    index_cache = index_cache_from_args(args, SOURCE.id, REDTEXTS_INDEX_URL, ttl_hours=SOURCE.policy.index_ttl_hours)
 
     try:
-        if REQUEST_DELAY_SECONDS > 0:
-            time.sleep(REQUEST_DELAY_SECONDS)
-        resp = session.get(REDTEXTS_INDEX_URL, timeout=REQUEST_TIMEOUT)
-        resp.raise_for_status()
-        html = resp.text
+        lookup = load_author_lookup(session, index_cache)
     except requests.RequestException as e:
         print(f"Error fetching redtexts index: {e}", file=sys.stderr)
+        finish_run(metrics, args.metrics_file)
         sys.exit(1)
 
-    author_works = parse_redtexts_index(html, REDTEXTS_INDEX_URL)
-    lookup = build_author_lookup(author_works)
+    threshold = fuzzy_threshold_from_args(args)
+    fuzzy_index = TrigramNameIndex(lookup) if threshold is not None else None
 
     zero_records = json.loads(args.zero_file.read_text(encoding="utf-8"))
     if args.limit is not None:
         zero_records = zero_records[: args.limit]
 
-    results: List[Dict[str, Any]] = []
-    for record in zero_records:
-        thinker = record["thinker"]
-        collection = record["collection"]
-        slug = record["slug"]
-        thinker_norm = normalize_name(thinker)
-        thinker_tokens = name_tokens(thinker)
-
-        match_data = None
-        status = "unmatched"
-        notes: List[str] = []
-
-        if thinker_norm in lookup:
-            author_name, works = lookup[thinker_norm]
-            match_data = {
-                "text": author_name,
-                "url": REDTEXTS_INDEX_URL,
-                "works": works,
-            }
-            status = "matched"
-        elif thinker_tokens:
-            last_first = f"{thinker_tokens[-1]} {' '.join(thinker_tokens[:-1])}"
-            if last_first in lookup:
-                author_name, works = lookup[last_first]
-                match_data = {"text": author_name, "url": REDTEXTS_INDEX_URL, "works": works}
-                status = "last_name_match"
-                notes.append("Matched on last name only")
-
-        matches = [match_data] if match_data else []
-        results.append({
-            "collection": collection,
-            "thinker": thinker,
-            "slug": slug,
-            "status": status,
-            "source_id": "redtexts",
-            "matches": matches,
-            "notes": notes,
-        })
+    results = [match_record(record, lookup, fuzzy_index, threshold) for record in zero_records]
 
     args.output_file.parent.mkdir(parents=True, exist_ok=True)
     args.output_file.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
     matched = sum(1 for r in results if r["status"] != "unmatched")
     print(f"Mapped {matched} of {len(results)} thinkers to redtexts.org. Wrote {args.output_file}")
+    finish_run(metrics, args.metrics_file)
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
@@ -17,39 +17,33 @@ from __future__ import annotations
 import argparse
 import json
 import sys
-import time
-import unicodedata
 from collections import defaultdict
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from typing import Dict, Iterable, List, Optional, Sequence
 
 import requests
 from bs4 import BeautifulSoup
 from requests import Response
-from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
-from urllib3.util.retry import Retry
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.http_metrics import HttpMetrics, add_metrics_argument, finish_run  # noqa: E402
+from util.index_cache import SourceIndexCache, add_index_cache_arguments, index_cache_from_args  # noqa: E402
+from util.name_matching import (  # noqa: E402
+    DEFAULT_FUZZY_THRESHOLD,
+    TrigramNameIndex,
+    add_fuzzy_arguments,
+    fuzzy_threshold_from_args,
+    name_similarity,
+)
+from util.names import canonical_key, name_tokens  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import MapperPlugin, SourceConfig, build_session, fetch, get_source  # noqa: E402
 
-MIA_INDEX_URL = "https://www.marxists.org/archive/index.htm"
-USER_AGENT = "Marxists Explorer Bot/0.1 (+https://github.com/jeremy-marxists-explorer)"
 
-REQUEST_TIMEOUT = 15
-REQUEST_DELAY_SECONDS = 1.0
-MAX_RETRIES = 3
-
-
-def normalize_name(name: str) -> str:
-    normalized = unicodedata.normalize("NFKD", name)
-    ascii_name = normalized.encode("ascii", "ignore").decode("ascii")
-    tokens = [token for token in ascii_name.lower().replace("&", " ").split() if token]
-    return " ".join(tokens)
-
-
-def name_tokens(name: str) -> List[str]:
-    normalized = normalize_name(name)
-    return [token for token in normalized.split() if token]
+SOURCE = get_source("mia")
+MIA_INDEX_URL = SOURCE.index_url or "https://www.marxists.org/archive/index.htm"
 
 
 @dataclass
@@ -65,39 +59,29 @@ class MatchResult:
     collection: str
     thinker: str
     slug: str
-    matches: List[Dict[str, str]] = field(default_factory=list)
+    matches: List[Dict[str, object]] = field(default_factory=list)
     status: str = "unmatched"
     notes: List[str] = field(default_factory=list)
 
 
 class AuthorIndexMapper:
-    def __init__(self, index_url: str = MIA_INDEX_URL):
+    def __init__(
+        self,
+        index_url: str = MIA_INDEX_URL,
+        metrics: Optional[HttpMetrics] = None,
+        source: SourceConfig = SOURCE,
+    ):
         self.index_url = index_url
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": USER_AGENT})
-        retry = Retry(
-            total=MAX_RETRIES,
-            backoff_factor=0.5,
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=("GET",),
-            respect_retry_after_header=True,
-        )
-        self.session.mount("https://", HTTPAdapter(max_retries=retry))
-        self.session.mount("http://", HTTPAdapter(max_retries=retry))
-        self._last_request_timestamp = 0.0
-
-    def _throttled_get(self, url: str) -> Response:
-        elapsed = time.time() - self._last_request_timestamp
-        if elapsed < REQUEST_DELAY_SECONDS:
-            time.sleep(REQUEST_DELAY_SECONDS - elapsed)
-        response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        self._last_request_timestamp = time.time()
-        return response
+        self.parser = source.policy.parser
+        self.session = build_session(source.policy, "map_zero_work_sources", metrics)
+        self.metrics: HttpMetrics = self.session.http_metrics
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        return fetch(self.session, url, headers)
 
     def fetch_index(self) -> BeautifulSoup:
-        response = self._throttled_get(self.index_url)
-        return BeautifulSoup(response.content, "html.parser")
+        response = self._get(self.index_url)
+        return BeautifulSoup(response.content, self.parser)
 
     def build_author_lookup(self, soup: BeautifulSoup) -> Dict[str, List[AuthorEntry]]:
         lookup: Dict[str, List[AuthorEntry]] = defaultdict(list)
@@ -131,10 +115,15 @@ class AuthorIndexMapper:
             if "/archive/" not in parsed_url.path:
                 continue
 
-            normalized = normalize_name(text)
+            normalized = canonical_key(text)
             entry = AuthorEntry(text=text, href=href, url=url, category=current_category)
             lookup[normalized].append(entry)
 
+            # Index entries listed surname first ("Luxemburg, Rosa") under the given-name order too
+            surname, comma, given = text.partition(",")
+            if comma and given.strip():
+                lookup[canonical_key(f"{given} {surname}")].append(entry)
+
             # Add secondary key for last-name only entries
             tokens = name_tokens(text)
             if len(tokens) > 1:
@@ -142,58 +131,93 @@ class AuthorIndexMapper:
 
         return lookup
 
-    def match_thinkers(self, zero_records: Iterable[Dict[str, str]]) -> List[MatchResult]:
-        soup = self.fetch_index()
-        lookup = self.build_author_lookup(soup)
-
-        results: List[MatchResult] = []
-
-        for record in zero_records:
-            thinker = record["thinker"]
-            thinker_tokens = name_tokens(thinker)
-            normalized = " ".join(thinker_tokens)
-            matches = self._dedupe_entries(lookup.get(normalized, []))
-
-            match_result = MatchResult(
-                collection=record["collection"],
-                thinker=thinker,
-                slug=record["slug"],
-            )
-
-            if matches:
-                match_result.status = "matched"
-                match_result.matches = [
-                    {
-                        "text": entry.text,
-                        "href": entry.href,
-                        "url": entry.url,
-                        "category": entry.category or "",
-                    }
-                    for entry in matches
-                ]
-            else:
-                # Try last name match
-                if thinker_tokens:
-                    fallback_matches = self._dedupe_entries(lookup.get(thinker_tokens[-1], []))
-                    if fallback_matches:
-                        match_result.status = "last_name_match"
-                        match_result.matches = [
-                            {
-                                "text": entry.text,
-                                "href": entry.href,
-                                "url": entry.url,
-                                "category": entry.category or "",
-                            }
-                            for entry in fallback_matches
-                        ]
-                        match_result.notes.append("Matched on last name only")
-                if not match_result.matches:
-                    match_result.status = "unmatched"
-                    match_result.notes.append("No entry located on index page")
-
-            results.append(match_result)
-
-        return results
+    def load_author_lookup(self, index_cache: Optional[SourceIndexCache] = None) -> Dict[str, List[AuthorEntry]]:
+        """Fetch and parse the index, or reuse the parsed lookup from index_cache."""
+        if index_cache is None:
+            return self.build_author_lookup(self.fetch_index())
+        return index_cache.lookup(
+            fetch=lambda headers: self._get(self.index_url, headers=headers),
+            parse=lambda response: self.build_author_lookup(BeautifulSoup(response.content, self.parser)),
+            encode=lambda lookup: {key: [asdict(entry) for entry in entries] for key, entries in lookup.items()},
+            decode=lambda cached: defaultdict(
+                list, {key: [AuthorEntry(**entry) for entry in entries] for key, entries in cached.items()}
+            ),
+        )
+
+    def match_thinkers(
+        self,
+        zero_records: Iterable[Dict[str, str]],
+        fuzzy_threshold: Optional[float] = DEFAULT_FUZZY_THRESHOLD,
+        index_cache: Optional[SourceIndexCache] = None,
+    ) -> List[MatchResult]:
+        lookup = self.load_author_lookup(index_cache)
+        fuzzy_index = TrigramNameIndex(lookup) if fuzzy_threshold is not None else None
+
+        return [self.match_record(record, lookup, fuzzy_index, fuzzy_threshold) for record in zero_records]
+
+    def match_record(
+        self,
+        record: Dict[str, str],
+        lookup: Dict[str, List[AuthorEntry]],
+        fuzzy_index: Optional[TrigramNameIndex] = None,
+        fuzzy_threshold: Optional[float] = DEFAULT_FUZZY_THRESHOLD,
+    ) -> MatchResult:
+        """Match one zero-work thinker record against the author lookup."""
+        thinker = record["thinker"]
+        thinker_tokens = name_tokens(thinker)
+        normalized = canonical_key(thinker)
+        matches = self._dedupe_entries(lookup.get(normalized, []))
+
+        match_result = MatchResult(
+            collection=record["collection"],
+            thinker=thinker,
+            slug=record["slug"],
+        )
+
+        if matches:
+            match_result.status = "matched"
+            match_result.matches = self._match_records(normalized, matches)
+        else:
+            # Try last name match
+            if thinker_tokens:
+                fallback_matches = self._dedupe_entries(lookup.get(thinker_tokens[-1], []))
+                if fallback_matches:
+                    match_result.status = "last_name_match"
+                    match_result.matches = self._match_records(normalized, fallback_matches)
+                    match_result.notes.append("Matched on last name only")
+            if not match_result.matches and fuzzy_index is not None and normalized:
+                fuzzy_matches = fuzzy_index.search(normalized, threshold=fuzzy_threshold)
+                if fuzzy_matches:
+                    entries = self._dedupe_entries(
+                        [entry for key, _ in fuzzy_matches for entry in lookup[key]]
+                    )
+                    match_result.status = "fuzzy_match"
+                    match_result.matches = sorted(
+                        self._match_records(normalized, entries),
+                        key=lambda item: -item["confidence"],
+                    )
+                    match_result.notes.append(
+                        f"Fuzzy name match (best similarity {match_result.matches[0]['confidence']:.2f})"
+                    )
+            if not match_result.matches:
+                match_result.status = "unmatched"
+                match_result.notes.append("No entry located on index page")
+
+        return match_result
+
+    @staticmethod
+    def _match_records(normalized: str, entries: Sequence[AuthorEntry]) -> List[Dict[str, object]]:
+        """Output records for matched entries, with the name similarity as confidence."""
+        return [
+            {
+                "text": entry.text,
+                "href": entry.href,
+                "url": entry.url,
+                "category": entry.category or "",
+                "confidence": round(name_similarity(normalized, canonical_key(entry.text)), 3),
+            }
+            for entry in entries
+        ]
 
     @staticmethod
     def _dedupe_entries(entries: Sequence[AuthorEntry]) -> List[AuthorEntry]:
@@ -203,6 +227,16 @@ class AuthorIndexMapper:
         return sorted(unique.values(), key=lambda item: item.text.lower())
 
 
+def create_mapper(source: SourceConfig, metrics: HttpMetrics) -> MapperPlugin:
+    mapper = AuthorIndexMapper(source.index_url or MIA_INDEX_URL, metrics, source)
+    return MapperPlugin(
+        source,
+        mapper.index_url,
+        mapper.load_author_lookup,
+        lambda *args: mapper.match_record(*args).__dict__,
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Map zero-work thinkers to source URLs.")
     parser.add_argument(
@@ -214,7 +248,7 @@ def main() -> None:
     parser.add_argument(
         "--output-file",
         type=Path,
-        default=Path("data/zero-works-source-matches.json"),
+        default=SOURCE.matches_file,
         help="Destination JSON for match results.",
     )
     parser.add_argument(
@@ -223,6 +257,9 @@ def main() -> None:
         default=None,
         help="Optional limit for debugging or sampling.",
     )
+    add_fuzzy_arguments(parser)
+    add_index_cache_arguments(parser)
+    add_metrics_argument(parser, "map_zero_work_sources")
     args = parser.parse_args()
 
     zero_records = json.loads(args.zero_file.read_text(encoding="utf-8"))
@@ -232,9 +269,14 @@ def main() -> None:
     mapper = AuthorIndexMapper()
 
     try:
-        results = mapper.match_thinkers(zero_records)
+        results = mapper.match_thinkers(
+            zero_records,
+            fuzzy_threshold=fuzzy_threshold_from_args(args),
+            index_cache=index_cache_from_args(args, SOURCE.id, mapper.index_url, ttl_hours=SOURCE.policy.index_ttl_hours),
+        )
     except requests.RequestException as exc:
         print(f"Error fetching Marxists.org index: {exc}", file=sys.stderr)
+        finish_run(mapper.metrics, args.metrics_file)
         sys.exit(1)
 
     payload = [result.__dict__ for result in results]
@@ -242,7 +284,8 @@ def main() -> None:
     args.output_file.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
     matched_count = sum(1 for result in results if result.status != "unmatched")
     print(f"Mapped {matched_count} of {len(results)} thinkers to candidate source URLs")
+    finish_run(mapper.metrics, args.metrics_file)
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
@@ -7,6 +7,18 @@ Reads per-thinker harvest JSON files from one or more harvest directories
 by (collection, slug), merges works and dedupes by canonical URL. Writes
 merged results to --output-dir for consumption by apply_zero_works_harvest.py.
 
+Source directories are walked as sorted streams of <collection>/<slug>.json
+files and merged k-way, so only one thinker's payloads are held in memory at
+a time. With --max-workers > 1 thinker groups are merged in a process pool.
+
+After exact-URL dedupe, works are collapsed across sources: URLs that only
+differ by http/https, www., a trailing index.htm or slash are treated as one,
+and titles are grouped by MinHash/LSH over character shingles so the same
+text harvested from several archives is kept once, from the preferred source.
+Titles are only collapsed when their numbers, roman numerals, number words
+and month names agree, so "Capital Volume I" and "Capital Volume II" or
+letters a day apart stay separate works.
+
 Usage:
     python scripts/python/scrapers/merge_harvest_sources.py \
         --harvest-dirs data/zero-works-harvest/mia data/zero-works-harvest/redtexts \
@@ -16,46 +28,262 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
+import os
+import random
+import re
+import sys
+import unicodedata
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
-from urllib.parse import urlparse, urlunparse
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Sequence, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.profiling import run_profiled, stage  # noqa: E402
+from util.urls import canonicalize_urls, url_equivalence_key  # noqa: E402
+
+
+DEFAULT_SOURCE_PRIORITY = ("mia", "redtexts", "anarchist_library", "goldman_archive")
+DEFAULT_TITLE_THRESHOLD = 0.8
+SHINGLE_SIZE = 3
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+_MINHASH_PRIME = (1 << 61) - 1
+_rng = random.Random(20260312)
+_MINHASH_COEFFICIENTS = [
+    (_rng.randrange(1, _MINHASH_PRIME), _rng.randrange(0, _MINHASH_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+_ROMAN_NUMERAL = re.compile(r"^m{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})$")
+_NUMBER_WORDS = frozenset(
+    "one two three four five six seven eight nine ten eleven twelve "
+    "first second third fourth fifth sixth seventh eighth ninth tenth eleventh twelfth "
+    "january february march april may june july august september october november december".split()
+)
 
 
-def canonicalize_url(url: str) -> str:
-    parsed = urlparse(url)
-    if not parsed.scheme or not parsed.netloc:
-        return ""
-    cleaned = parsed._replace(path=parsed.path or "/", query="", fragment="")
-    return urlunparse(cleaned)
+class MergeKeyError(ValueError):
+    """A harvest file whose payload names a different thinker than its path."""
 
 
-def load_harvest_files(harvest_dirs: List[Path]) -> List[Tuple[Path, dict]]:
-    """Yield (path, payload) for each harvest JSON under the given directories."""
+def iter_source_dir(base: Path) -> Iterator[Tuple[Tuple[str, str], Path]]:
+    """Yield ((collection, slug), path) for one harvest directory in sorted key order.
+
+    Harvesters write <collection>/<slug>.json, so the key is read from the path
+    and no payload is loaded until its thinker group is merged. merge_group()
+    checks that each payload's own (collection, slug) matches it.
+    """
+    if not base.exists():
+        return iter(())
+    entries = [
+        ((file_path.parent.name, file_path.stem), file_path)
+        for file_path in base.rglob("*.json")
+        if file_path.is_file()
+    ]
+    entries.sort()
+    return iter(entries)
+
+
+def iter_thinker_groups(harvest_dirs: List[Path]) -> Iterator[Tuple[Tuple[str, str], List[Path]]]:
+    """K-way merge the per-directory streams and yield each thinker's files in source order."""
+    streams = []
     seen: set = set()
     for base in harvest_dirs:
-        if not base.exists():
+        resolved = base.resolve()
+        if resolved in seen:
             continue
-        for file_path in sorted(base.rglob("*.json")):
-            if not file_path.is_file():
-                continue
-            try:
-                rel = file_path.relative_to(base)
-            except ValueError:
-                continue
-            key = (base.resolve(), rel)
-            if key in seen:
-                continue
-            seen.add(key)
-            try:
-                payload = json.loads(file_path.read_text(encoding="utf-8"))
-            except json.JSONDecodeError:
-                continue
-            yield file_path, payload
+        seen.add(resolved)
+        streams.append(iter_source_dir(base))
+    merged = heapq.merge(*streams, key=lambda item: item[0])
+    for key, items in groupby(merged, key=lambda item: item[0]):
+        yield key, [path for _key, path in items]
+
 
+def merge_group(
+    key: Tuple[str, str],
+    paths: List[Path],
+    output_dir: Path,
+    title_threshold: Optional[float] = DEFAULT_TITLE_THRESHOLD,
+    source_priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY,
+) -> int:
+    """Load, merge and write one thinker group. Returns the number of files written.
 
-def merge_payloads(payloads: List[dict]) -> dict:
-    """Merge multiple harvest payloads for the same thinker. Dedupe works by URL."""
+    Raises MergeKeyError if a payload's (collection, slug) is not the group's
+    key: that payload's output file would belong to another group, and one of
+    the two would overwrite the other.
+    """
+    payloads: List[dict] = []
+    for file_path in paths:
+        try:
+            payload = json.loads(file_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            continue
+        collection = payload.get("collection") or ""
+        slug = payload.get("slug") or ""
+        if not collection or not slug:
+            continue
+        if (collection, slug) != key:
+            raise MergeKeyError(
+                f"{file_path} holds {collection}/{slug} but is stored as {key[0]}/{key[1]}; "
+                "move it to match its payload"
+            )
+        payloads.append(payload)
+    if not payloads:
+        return 0
+
+    merged = merge_payloads(payloads, title_threshold, source_priority)
+    out_dir = output_dir / key[0]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_file = out_dir / f"{key[1]}.json"
+    out_file.write_text(
+        json.dumps(merged, indent=2, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    return 1
+
+
+def _merge_group_task(task: Tuple[Tuple[str, str], List[Path], Path, Optional[float], Sequence[str]]) -> int:
+    return merge_group(*task)
+
+
+def normalize_title(title: str) -> str:
+    normalized = unicodedata.normalize("NFKD", title)
+    ascii_title = normalized.encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", ascii_title).split())
+
+
+def title_shingles(title: str) -> Set[int]:
+    """Hashed character shingles of a normalized title."""
+    text = normalize_title(title)
+    if len(text) <= SHINGLE_SIZE:
+        return {zlib.crc32(text.encode("utf-8"))} if text else set()
+    return {
+        zlib.crc32(text[i : i + SHINGLE_SIZE].encode("utf-8"))
+        for i in range(len(text) - SHINGLE_SIZE + 1)
+    }
+
+
+def title_number_tokens(title: str) -> FrozenSet[str]:
+    """Tokens that tell numbered works apart: digits, roman numerals, number words and months."""
+    return frozenset(
+        token
+        for token in normalize_title(title).split()
+        if token.isdigit() or token in _NUMBER_WORDS or _ROMAN_NUMERAL.match(token)
+    )
+
+
+def minhash_signature(shingles: Set[int]) -> Tuple[int, ...]:
+    return tuple(
+        min((a * value + b) % _MINHASH_PRIME for value in shingles)
+        for a, b in _MINHASH_COEFFICIENTS
+    )
+
+
+def _source_rank(work: Dict[str, Any], source_priority: Sequence[str]) -> int:
+    source_id = work.get("source_id")
+    if source_id in source_priority:
+        return source_priority.index(source_id)
+    return len(source_priority)
+
+
+def _pick_preferred(works: List[Dict[str, Any]], source_priority: Sequence[str]) -> Dict[str, Any]:
+    # min() keeps the first of equally ranked works, i.e. the earliest payload.
+    return min(works, key=lambda work: _source_rank(work, source_priority))
+
+
+def collapse_equivalent_urls(
+    works: List[Dict[str, Any]],
+    source_priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY,
+) -> List[Dict[str, Any]]:
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for work in works:
+        groups.setdefault(url_equivalence_key(work["url"]), []).append(work)
+    return [_pick_preferred(group, source_priority) for group in groups.values()]
+
+
+def collapse_near_duplicate_titles(
+    works: List[Dict[str, Any]],
+    threshold: float = DEFAULT_TITLE_THRESHOLD,
+    source_priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY,
+) -> List[Dict[str, Any]]:
+    """Keep one work per group of similar titles harvested from different sources.
+
+    Candidate pairs come from LSH buckets over MinHash signatures, so the cost
+    stays near-linear in the number of works; each candidate is confirmed with
+    the exact shingle Jaccard similarity and identical title_number_tokens().
+    Works from the same source are never grouped together, since distinct URLs
+    within one archive are distinct texts. (Works whose URLs agree were already
+    collapsed by collapse_equivalent_urls.)
+    """
+    if len(works) < 2:
+        return works
+
+    shingles = [title_shingles(str(work["title"])) for work in works]
+    numbers = [title_number_tokens(str(work["title"])) for work in works]
+    parent = list(range(len(works)))
+    sources: List[Set[Optional[str]]] = [{work.get("source_id")} for work in works]
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    for index, work_shingles in enumerate(shingles):
+        if not work_shingles:
+            continue
+        signature = minhash_signature(work_shingles)
+        for band in range(LSH_BANDS):
+            band_key = (band, signature[band * rows : (band + 1) * rows])
+            buckets.setdefault(band_key, []).append(index)
+
+    def similar(left: int, right: int) -> bool:
+        if numbers[left] != numbers[right]:
+            return False
+        union = len(shingles[left] | shingles[right])
+        return bool(union) and len(shingles[left] & shingles[right]) / union >= threshold
+
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        # Each member is compared with one representative per group found in
+        # this bucket, not with every other member
+        representatives: List[int] = []
+        for index in members:
+            for representative in representatives:
+                index_root, representative_root = find(index), find(representative)
+                if index_root == representative_root:
+                    break
+                if sources[index_root] & sources[representative_root]:
+                    continue
+                if similar(representative, index):
+                    parent[index_root] = representative_root
+                    sources[representative_root] |= sources[index_root]
+                    break
+            else:
+                representatives.append(index)
+
+    groups: Dict[int, List[Dict[str, Any]]] = {}
+    for index, work in enumerate(works):
+        groups.setdefault(find(index), []).append(work)
+    return [_pick_preferred(group, source_priority) for group in groups.values()]
+
+
+def merge_payloads(
+    payloads: List[dict],
+    title_threshold: Optional[float] = DEFAULT_TITLE_THRESHOLD,
+    source_priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY,
+) -> dict:
+    """Merge multiple harvest payloads for the same thinker.
+
+    Works are deduped by canonical URL, then by URL equivalence and, unless
+    title_threshold is None, by cross-source title similarity.
+    """
     if not payloads:
         raise ValueError("Need at least one payload")
     first = payloads[0]
@@ -74,14 +302,10 @@ def merge_payloads(payloads: List[dict]) -> dict:
         all_warnings.extend(p.get("warnings") or [])
         if p.get("status") == "success":
             status = "success"
-        for w in p.get("works") or []:
-            if not isinstance(w, dict):
-                continue
-            url = w.get("url")
-            title = w.get("title")
-            if not url or not title:
-                continue
-            canonical = canonicalize_url(str(url))
+        works = [w for w in p.get("works") or [] if isinstance(w, dict) and w.get("url") and w.get("title")]
+        canonical_urls = canonicalize_urls(str(w["url"]) for w in works)
+        for w, canonical in zip(works, canonical_urls):
+            title = w["title"]
             if not canonical:
                 continue
             if canonical not in unique_by_url:
@@ -93,8 +317,15 @@ def merge_payloads(payloads: List[dict]) -> dict:
                     entry["source_id"] = w["source_id"]
                 unique_by_url[canonical] = entry
 
-    if unique_by_url:
-        message_parts.append(f"Collected {len(unique_by_url)} works from {len(payloads)} source(s).")
+    works = collapse_equivalent_urls(list(unique_by_url.values()), source_priority)
+    if title_threshold is not None:
+        works = collapse_near_duplicate_titles(works, title_threshold, source_priority)
+
+    if works:
+        message_parts.append(f"Collected {len(works)} works from {len(payloads)} source(s).")
+        dropped = len(unique_by_url) - len(works)
+        if dropped:
+            message_parts.append(f"Dropped {dropped} near-duplicate works.")
     else:
         message_parts.append("No works after merge.")
 
@@ -113,7 +344,7 @@ def merge_payloads(payloads: List[dict]) -> dict:
         "status": status,
         "message": " ".join(message_parts),
         "warnings": list(dict.fromkeys(all_warnings)),
-        "works": sorted(unique_by_url.values(), key=lambda w: (str(w.get("title", "")).lower())),
+        "works": sorted(works, key=lambda w: (str(w.get("title", "")).lower())),
         "visited_urls": sorted(all_visited),
     }
 
@@ -135,33 +366,54 @@ def main() -> None:
         default=Path("data/zero-works-harvest/merged"),
         help="Output directory for merged harvest files.",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=1,
+        help="Process pool size for merging thinker groups; 0 uses all cores (default: 1, in-process).",
+    )
+    parser.add_argument(
+        "--title-threshold",
+        type=float,
+        default=DEFAULT_TITLE_THRESHOLD,
+        help=f"Title shingle similarity for cross-source duplicates (default: {DEFAULT_TITLE_THRESHOLD}).",
+    )
+    parser.add_argument(
+        "--no-title-dedupe",
+        action="store_true",
+        help="Only dedupe by URL; keep works whose titles merely look alike.",
+    )
+    parser.add_argument(
+        "--source-priority",
+        nargs="+",
+        default=list(DEFAULT_SOURCE_PRIORITY),
+        help="Source ids in order of preference when picking one work per duplicate group.",
+    )
     args = parser.parse_args()
 
-    # Group by (collection, slug)
-    by_thinker: Dict[Tuple[str, str], List[dict]] = {}
-    for _path, payload in load_harvest_files(args.harvest_dirs):
-        collection = payload.get("collection") or ""
-        slug = payload.get("slug") or ""
-        if not collection or not slug:
-            continue
-        key = (collection, slug)
-        by_thinker.setdefault(key, []).append(payload)
-
+    title_threshold = None if args.no_title_dedupe else args.title_threshold
+    source_priority = tuple(args.source_priority)
     args.output_dir.mkdir(parents=True, exist_ok=True)
+    groups = iter_thinker_groups(args.harvest_dirs)
+    max_workers = args.max_workers or os.cpu_count() or 1
+
     written = 0
-    for (collection, slug), payloads in sorted(by_thinker.items()):
-        merged = merge_payloads(payloads)
-        out_dir = args.output_dir / collection
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_file = out_dir / f"{slug}.json"
-        out_file.write_text(
-            json.dumps(merged, indent=2, ensure_ascii=False) + "\n",
-            encoding="utf-8",
-        )
-        written += 1
+    try:
+        with stage("merge thinker groups"):
+            if max_workers <= 1:
+                for key, paths in groups:
+                    written += merge_group(key, paths, args.output_dir, title_threshold, source_priority)
+            else:
+                tasks = ((key, paths, args.output_dir, title_threshold, source_priority) for key, paths in groups)
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    for count in executor.map(_merge_group_task, tasks, chunksize=16):
+                        written += count
+    except MergeKeyError as exc:
+        print(f"[ERROR] {exc}", file=sys.stderr)
+        sys.exit(1)
 
-    print(f"Merged {len(by_thinker)} thinkers into {args.output_dir}. Wrote {written} files.")
+    print(f"Merged {written} thinkers into {args.output_dir}. Wrote {written} files.")
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
@@ -6,16 +6,23 @@ Uses parallel processing for 4-8x faster execution
 
 import json
 import re
+import sys
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse, urlunparse
+from pathlib import Path
+from urllib.parse import urljoin
 import logging
 from typing import Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
 import argparse
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.http_metrics import add_metrics_argument, finish_run  # noqa: E402
+from util.names import canonical_key, name_tokens  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+from util.sources import build_session, fetch, get_source  # noqa: E402
+from util.urls import canonicalize_url  # noqa: E402
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,24 +30,16 @@ logger = logging.getLogger(__name__)
 
 # Base URL for Marxists Internet Archive
 MIA_BASE_URL = "https://www.marxists.org"
-REQUEST_TIMEOUT = 15
-MAX_RETRIES = 3
 
 class ComprehensiveMIAWorksScraper:
     def __init__(self, base_url: str = MIA_BASE_URL):
         self.base_url = base_url
         self.print_lock = Lock()
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'Marxists Explorer Bot 1.0'})
-        retry = Retry(
-            total=MAX_RETRIES,
-            backoff_factor=0.5,
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=("GET",),
-            respect_retry_after_header=True,
-        )
-        self.session.mount("https://", HTTPAdapter(max_retries=retry))
-        self.session.mount("http://", HTTPAdapter(max_retries=retry))
+        # Same MIA policy as the other marxists.org scrapers; every request goes
+        # through the shared crawl scheduler, so --max-workers cannot push
+        # marxists.org past the policy's rate
+        self.session = build_session(get_source("mia").policy, "populate-thinker-works")
+        self.metrics = self.session.http_metrics
         
     def extract_author_links_from_index(self, index_file: str) -> List[Tuple[str, str, str]]:
         """Extract author links and their categories from ref/index"""
@@ -80,8 +79,7 @@ class ComprehensiveMIAWorksScraper:
         try:
             full_url = self._normalize_author_url(author_url)
 
-            response = self.session.get(full_url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
+            response = fetch(self.session, full_url)
             
             soup = BeautifulSoup(response.content, 'html.parser')
             
@@ -106,7 +104,7 @@ class ComprehensiveMIAWorksScraper:
                     # Clean up the title
                     title = re.sub(r'\s+', ' ', title).strip()
                     if len(title) > 3:  # Filter out very short titles
-                        absolute_url = self._canonicalize_url(urljoin(full_url, href))
+                        absolute_url = canonicalize_url(urljoin(full_url, href))
                         works.append({'title': title, 'url': absolute_url})
             
             # Remove duplicates
@@ -139,12 +137,6 @@ class ComprehensiveMIAWorksScraper:
                 author_url = f'/archive/{author_url}'
         return urljoin(self.base_url, author_url)
 
-    @staticmethod
-    def _canonicalize_url(url: str) -> str:
-        parsed = urlparse(url)
-        cleaned = parsed._replace(query="", fragment="")
-        return urlunparse(cleaned)
-    
     def populate_thinkers_bundle(self, index_file: str, bundle_file: str, max_authors: Optional[int] = None, max_workers: int = 8):
         """Populate the thinkers bundle with works data using parallel processing"""
         logger.info("Starting comprehensive thinkers bundle population...")
@@ -160,6 +152,7 @@ class ComprehensiveMIAWorksScraper:
         # Load the bundle
         with open(bundle_file, 'r', encoding='utf-8') as f:
             bundle_data = json.load(f)
+        name_index = self._build_name_index(bundle_data)
         
         successful_matches = 0
         processed_count = 0
@@ -201,7 +194,7 @@ class ComprehensiveMIAWorksScraper:
             
             # Update bundle with results from this batch
             for author_name, works, category in results:
-                thinker = self._find_thinker_in_bundle(bundle_data, author_name, category)
+                thinker = self._find_thinker_in_bundle(bundle_data, author_name, category, name_index)
                 if thinker:
                     thinker['works'] = works
                     successful_matches += 1
@@ -212,8 +205,32 @@ class ComprehensiveMIAWorksScraper:
         
         logger.info(f"Thinkers bundle population completed! Successfully matched {successful_matches} authors")
     
-    def _find_thinker_in_bundle(self, bundle_data: dict, author_name: str, category: str) -> Optional[dict]:
+    @staticmethod
+    def _build_name_index(bundle_data: dict) -> Dict[str, Dict[str, dict]]:
+        """Map category -> canonical name key -> thinker for exact lookups"""
+        index: Dict[str, Dict[str, dict]] = {}
+        for cat_name, thinkers in bundle_data.items():
+            for thinker in thinkers:
+                index.setdefault(cat_name, {}).setdefault(canonical_key(thinker['name']), thinker)
+        return index
+
+    def _find_thinker_in_bundle(
+        self,
+        bundle_data: dict,
+        author_name: str,
+        category: str,
+        name_index: Optional[Dict[str, Dict[str, dict]]] = None,
+    ) -> Optional[dict]:
         """Find a thinker in the bundle by name and category"""
+        # Canonical key lookup, in the author's category first
+        if name_index is not None:
+            key = canonical_key(author_name)
+            thinker = name_index.get(category, {}).get(key)
+            if thinker is None:
+                thinker = next((names[key] for names in name_index.values() if key in names), None)
+            if thinker is not None:
+                return thinker
+
         # Try exact category match first
         if category in bundle_data:
             for thinker in bundle_data[category]:
@@ -231,8 +248,8 @@ class ComprehensiveMIAWorksScraper:
     def _names_match(self, name1: str, name2: str) -> bool:
         """Check if two names match (case-insensitive, handles variations)"""
         # Normalize both names
-        n1 = name1.lower().strip()
-        n2 = name2.lower().strip()
+        n1 = canonical_key(name1)
+        n2 = canonical_key(name2)
         
         # Exact match
         if n1 == n2:
@@ -243,8 +260,8 @@ class ComprehensiveMIAWorksScraper:
             return True
         
         # Split and check if all parts match (handles "Karl Marx" vs "Karl Heinrich Marx")
-        n1_parts = set(n1.split())
-        n2_parts = set(n2.split())
+        n1_parts = set(name_tokens(n1))
+        n2_parts = set(name_tokens(n2))
         
         # If significant overlap, consider it a match
         if len(n1_parts.intersection(n2_parts)) >= 2:
@@ -258,6 +275,7 @@ def main():
     parser.add_argument("--bundle-file", default="data/thinkers-bundle.json", help="Path to thinkers bundle JSON.")
     parser.add_argument("--max-authors", type=int, default=None, help="Optional cap for debugging.")
     parser.add_argument("--max-workers", type=int, default=8, help="Thread pool size (default: 8).")
+    add_metrics_argument(parser, "populate-thinker-works")
     args = parser.parse_args()
 
     scraper = ComprehensiveMIAWorksScraper()
@@ -267,6 +285,7 @@ def main():
         max_authors=args.max_authors,
         max_workers=args.max_workers,
     )
+    finish_run(scraper.metrics, args.metrics_file)
 
 if __name__ == '__main__':
-    main()
+    run_profiled(main)
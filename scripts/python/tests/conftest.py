@@ -0,0 +1,13 @@
+"""
+Tests for the data pipeline scripts.
+
+Run from the repository root:
+
+    python -m pytest -q scripts/python/tests
+"""
+
+import sys
+from pathlib import Path
+
+# The scripts import each other as util.* and scrapers.*, relative to scripts/python
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
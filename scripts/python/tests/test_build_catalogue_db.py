@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+
+import pytest
+
+from util import build_catalogue_db
+from util.build_catalogue_db import SCHEMA, search_titles
+
+TITLES = ["Marx's Capital", 'The "Unbalanced" Economy', "Wage Labour and Capital"]
+
+
+def _database(path) -> None:
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    for position, title in enumerate(TITLES):
+        connection.execute(
+            "INSERT INTO works(collection_id, thinker, subject, position, title, url) VALUES (?, ?, ?, ?, ?, ?)",
+            ("first-international", "Karl Marx", "Works", position, title, f"https://example.org/{position}"),
+        )
+    connection.execute("INSERT INTO works_fts(works_fts) VALUES ('rebuild')")
+    connection.commit()
+    connection.close()
+
+
+@pytest.mark.parametrize("query", ["Marx's", '"unbalanced'])
+def test_literal_search_matches_titles_with_quotes(tmp_path, query):
+    _database(tmp_path / "catalogue.sqlite")
+    connection = sqlite3.connect(tmp_path / "catalogue.sqlite")
+    with pytest.raises(sqlite3.OperationalError):
+        search_titles(connection, query, 10)
+    assert len(search_titles(connection, query, 10, literal=True)) == 1
+    connection.close()
+
+
+def test_search_cli_reports_bad_syntax_without_a_traceback(tmp_path, monkeypatch, capsys):
+    db_file = tmp_path / "catalogue.sqlite"
+    _database(db_file)
+    monkeypatch.setattr(sys, "argv", ["build_catalogue_db.py", "--db-file", str(db_file), "search", "Marx's"])
+
+    with pytest.raises(SystemExit) as exit_info:
+        build_catalogue_db.main()
+
+    assert exit_info.value.code == 2
+    assert "use --literal" in capsys.readouterr().err
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from util.build_source_register import augment_with_dataset, scan_inputs
+from util.works_pages import write_subject_works
+
+
+def _write_dataset(data_dir: Path) -> Path:
+    collection_dir = data_dir / "anarchists"
+    thinker_dir = collection_dir / "Emma Goldman"
+    thinker_dir.mkdir(parents=True)
+    (collection_dir / "metadata.json").write_text(json.dumps([{"n": "Emma Goldman"}]), encoding="utf-8")
+    works = [
+        {"title": "Anarchism", "url": "https://www.marxists.org/archive/goldman/works/1910/anarchism.htm"},
+        {"title": "Minorities", "url": "https://www.marxists.org/archive/goldman/works/1910/minorities.htm"},
+        {"title": "The ABC", "url": "https://www.marxists.org/archive/berkman/works/1929/abc/ch01.htm"},
+    ]
+    write_subject_works(thinker_dir, "Essays", works, page_size=2)
+    return thinker_dir
+
+
+def test_paginated_subjects_reach_the_register(tmp_path):
+    _write_dataset(tmp_path)
+    register = {}
+
+    augment_with_dataset(register, tmp_path)
+
+    urls = {source["url"] for entry in register.values() for source in entry["sources"]}
+    # The berkman work is only on page 2
+    assert urls == {"https://www.marxists.org/archive/goldman/", "https://www.marxists.org/archive/berkman/"}
+
+
+def test_paginated_pages_are_fingerprinted(tmp_path):
+    harvest_dir = tmp_path / "harvest"
+    harvest_dir.mkdir()
+    thinker_dir = _write_dataset(tmp_path / "data")
+
+    files, inputs = scan_inputs(harvest_dir, tmp_path / "data", {})
+    assert str(thinker_dir / "Essays" / "2.json") in files
+
+    (thinker_dir / "Essays" / "2.json").write_text("[]", encoding="utf-8")
+    _, changed_inputs = scan_inputs(harvest_dir, tmp_path / "data", files)
+    input_id = "dataset:anarchists/Emma Goldman"
+    assert changed_inputs[input_id]["digest"] != inputs[input_id]["digest"]
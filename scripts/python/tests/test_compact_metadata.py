@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from util.compact_metadata import decode_metadata, encode_metadata, verify_round_trip
+
+WIKIMEDIA = "https://upload.wikimedia.org/wikipedia/commons/"
+
+
+def _round_trip(entries):
+    return decode_metadata(json.loads(json.dumps(encode_metadata(entries))))
+
+
+@pytest.mark.parametrize(
+    "entries",
+    [
+        [{"n": "a", "x": None}],
+        [{"n": "a", "i": None}, {"n": "b", "i": WIKIMEDIA + "b.jpg"}],
+        [{"n": "a", "i": WIKIMEDIA + "a.jpg"}, {"n": "b"}, {"n": "c", "i": None}],
+        [{"n": "a", "d": None, "b": "1870"}, {"n": "b", "b": None}],
+        [{"n": "a", "subjects": None}, {"n": "b", "subjects": [{"name": "Letters", "count": 3}]}],
+        [{"n": "a", "j": None}, {"n": "b", "j": [{"title": "Capital", "url": None}]}],
+    ],
+)
+def test_explicit_nulls_survive(entries):
+    assert _round_trip(entries) == entries
+    assert verify_round_trip(entries) is None
+
+
+def test_missing_keys_stay_missing():
+    entries = [{"n": "a", "c": "Early Comintern"}, {"n": "b"}, {"c": "Early Comintern"}]
+    decoded = _round_trip(entries)
+    assert decoded == entries
+    assert "c" not in decoded[1]
+    assert "n" not in decoded[2]
+
+
+def test_repeated_strings_and_prefixes_round_trip():
+    entries = [
+        {
+            "n": f"Thinker {n}",
+            "c": "Early Comintern",
+            "i": f"{WIKIMEDIA}{n}/{n}.jpg",
+            "subjects": [{"name": "Letters", "count": n}],
+            "j": [{"title": f"Work {n}", "url": f"https://www.marxists.org/archive/t{n}/w.htm"}, {"title": "x", "y": 1}],
+        }
+        for n in range(5)
+    ]
+    payload = encode_metadata(entries)
+    assert "Early Comintern" in payload["s"]
+    assert WIKIMEDIA in payload["p"]
+    assert "z" not in payload
+    assert _round_trip(entries) == entries
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import importlib.util
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import pytest
+from requests import Response
+
+from util.crawl_scheduler import CrawlScheduler, HostFrontier, retry_after_seconds
+from util.http_metrics import HttpMetrics
+from util.sources import FetchPolicy, _policy
+
+
+def _response(url: str, status: int, headers: Optional[Dict[str, str]] = None) -> Response:
+    response = Response()
+    response.url = url
+    response.status_code = status
+    response.headers.update(headers or {})
+    response.elapsed = timedelta(milliseconds=1)
+    response._content = b""
+    return response
+
+
+class StubSession:
+    """Stands in for a build_session() session: a policy, metrics and a scripted get()."""
+
+    def __init__(self, policy: FetchPolicy, log: List[Tuple[str, float]], statuses: Optional[List[int]] = None):
+        self.fetch_policy = policy
+        self.http_metrics = HttpMetrics("test")
+        self.log = log
+        self.statuses = list(statuses or [])
+        self._lock = threading.Lock()
+
+    def get(self, url: str, **kwargs) -> Response:
+        with self._lock:
+            self.log.append((urlparse(url).hostname or "", time.monotonic()))
+            status = self.statuses.pop(0) if self.statuses else 200
+        headers = {"Retry-After": "1"} if status == 429 else None
+        return _response(url, status, headers)
+
+
+def test_requests_to_different_hosts_interleave():
+    log: List[Tuple[str, float]] = []
+    policy = FetchPolicy(requests_per_second=10.0, adaptive=False)
+    session = StubSession(policy, log)
+    scheduler = CrawlScheduler(max_workers=4)
+
+    started = time.monotonic()
+    futures = [scheduler.submit(session, f"https://{host}.example/{n}") for host in ("a", "b") for n in range(4)]
+    assert all(future.result(timeout=5).status_code == 200 for future in futures)
+    elapsed = time.monotonic() - started
+
+    hosts = [host for host, _ in log]
+    assert all(first != second for first, second in zip(hosts, hosts[1:]))
+    # Four requests per host at 10 req/s take ~0.3 s when the hosts overlap, ~0.7 s in sequence
+    assert elapsed < 0.6
+    for host in ("a.example", "b.example"):
+        times = [at for name, at in log if name == host]
+        assert all(later - earlier >= 0.09 for earlier, later in zip(times, times[1:]))
+
+
+def test_throttled_host_waits_for_retry_after_and_retries():
+    log: List[Tuple[str, float]] = []
+    throttled = StubSession(FetchPolicy(requests_per_second=20.0, adaptive=False, max_retries=2), log, [429])
+    other = StubSession(FetchPolicy(requests_per_second=20.0, adaptive=False), log)
+    scheduler = CrawlScheduler(max_workers=4)
+
+    throttled_future = scheduler.submit(throttled, "https://slow.example/page")
+    time.sleep(0.05)
+    other_futures = [scheduler.submit(other, f"https://fast.example/{n}") for n in range(3)]
+
+    assert all(future.result(timeout=5).status_code == 200 for future in other_futures)
+    assert throttled_future.result(timeout=5).status_code == 200
+
+    slow_times = [at for host, at in log if host == "slow.example"]
+    fast_times = [at for host, at in log if host == "fast.example"]
+    assert len(slow_times) == 2
+    assert slow_times[1] - slow_times[0] >= 0.95
+    # The other host is not held up by the Retry-After
+    assert max(fast_times) < slow_times[1]
+    assert throttled.http_metrics.report()["hosts"]["slow.example"]["retries"] == {"429": 1}
+
+
+def test_retry_after_accepts_seconds_and_caps_them():
+    assert retry_after_seconds(_response("https://x.example/", 429, {"Retry-After": "7"})) == 7.0
+    assert retry_after_seconds(_response("https://x.example/", 429, {"Retry-After": "86400"})) == 600.0
+    assert retry_after_seconds(_response("https://x.example/", 429, {"Retry-After": "soon"})) is None
+    assert retry_after_seconds(_response("https://x.example/", 429)) is None
+
+
+def test_adaptive_ceiling_defaults_to_the_starting_rate():
+    policy = _policy(FetchPolicy(), {"requests_per_second": 0.67}, "test")
+    assert policy.rate_ceiling == 0.67
+
+    frontier = HostFrontier("example.org", policy)
+    for n in range(100):
+        frontier.observe(200, 0.1, float(n), float(n))
+    assert frontier.requests_per_second == pytest.approx(0.67)
+
+    frontier.observe(429, 0.1, 100.0, 100.0)
+    assert frontier.requests_per_second == pytest.approx(0.335)
+
+
+def test_explicit_maximum_lets_a_host_speed_up():
+    policy = _policy(FetchPolicy(), {"requests_per_second": 10, "max_requests_per_second": 20}, "test")
+    frontier = HostFrontier("commons.wikimedia.org", policy)
+    for n in range(400):
+        frontier.observe(200, 0.1, float(n), float(n))
+    assert frontier.requests_per_second == pytest.approx(20)
+
+
+def test_mia_scraper_leaves_throttling_to_the_scheduler():
+    path = Path(__file__).resolve().parents[1] / "scrapers" / "populate-thinker-works-final-parallel.py"
+    spec = importlib.util.spec_from_file_location("populate_thinker_works", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    session = module.ComprehensiveMIAWorksScraper().session
+    retry = session.get_adapter("https://www.marxists.org/").max_retries
+    # 429 and 503 must reach HostFrontier.observe rather than urllib3's own retry loop
+    assert set(retry.status_forcelist) == {500, 502, 504}
+    assert not retry.respect_retry_after_header
+    assert session.fetch_policy.rate_ceiling > 0
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from scrapers.merge_harvest_sources import (
+    MergeKeyError,
+    collapse_near_duplicate_titles,
+    iter_thinker_groups,
+    merge_group,
+)
+
+
+def _write_payload(path: Path, collection: str, slug: str, url: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "collection": collection,
+        "thinker": slug,
+        "slug": slug,
+        "status": "success",
+        "works": [{"title": url, "url": url}],
+    }
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def test_same_thinker_from_two_sources_merges_into_one_file(tmp_path):
+    _write_payload(tmp_path / "mia" / "anarchists" / "goldman.json", "anarchists", "goldman", "https://a.org/1")
+    _write_payload(tmp_path / "tal" / "anarchists" / "goldman.json", "anarchists", "goldman", "https://b.org/2")
+    output = tmp_path / "merged"
+
+    for key, paths in iter_thinker_groups([tmp_path / "mia", tmp_path / "tal"]):
+        assert merge_group(key, paths, output) == 1
+
+    merged = json.loads((output / "anarchists" / "goldman.json").read_text(encoding="utf-8"))
+    assert sorted(work["url"] for work in merged["works"]) == ["https://a.org/1", "https://b.org/2"]
+
+
+def test_payload_stored_under_another_key_fails(tmp_path):
+    _write_payload(tmp_path / "mia" / "anarchists" / "goldman.json", "anarchists", "goldman", "https://a.org/1")
+    _write_payload(tmp_path / "tal" / "anarchists" / "emma-goldman.json", "anarchists", "goldman", "https://b.org/2")
+
+    with pytest.raises(MergeKeyError):
+        for key, paths in iter_thinker_groups([tmp_path / "mia", tmp_path / "tal"]):
+            merge_group(key, paths, tmp_path / "merged")
+
+
+def _works(left: str, right: str):
+    return [
+        {"title": left, "url": "https://www.marxists.org/archive/a.htm", "source_id": "mia"},
+        {"title": right, "url": "https://www.redtexts.org/b.html", "source_id": "redtexts"},
+    ]
+
+
+@pytest.mark.parametrize(
+    "left, right",
+    [
+        ("Capital Volume I", "Capital Volume II"),
+        ("The Conquest of Bread, Chapter 1", "The Conquest of Bread, Chapter 2"),
+        ("Letter to Engels, 12 March 1868", "Letter to Engels, 13 March 1868"),
+    ],
+)
+def test_numbered_titles_stay_separate(left, right):
+    assert len(collapse_near_duplicate_titles(_works(left, right))) == 2
+
+
+@pytest.mark.parametrize(
+    "left, right",
+    [
+        ("Capital, Volume I", "Capital Volume I"),
+        ("Letter to Engels, 12 March 1868", "Letter to Engels 12 March 1868"),
+    ],
+)
+def test_same_title_from_two_sources_collapses_to_preferred(left, right):
+    collapsed = collapse_near_duplicate_titles(_works(left, right))
+    assert [work["source_id"] for work in collapsed] == ["mia"]
+
+
+def test_same_source_titles_are_never_collapsed():
+    works = _works("Capital, Volume I", "Capital Volume I")
+    works[1]["source_id"] = "mia"
+    assert len(collapse_near_duplicate_titles(works)) == 2
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import pstats
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from util import profiling
+from util.profiling import run_profiled
+
+
+def _worker_only_function(n: int) -> int:
+    return sum(range(n))
+
+
+def _main() -> None:
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(_worker_only_function, [10_000] * 4))
+
+
+def test_cpu_profile_includes_worker_threads(tmp_path, monkeypatch):
+    prefix = tmp_path / "run"
+    monkeypatch.setattr(sys, "argv", ["script.py", "--profile", "cpu", "--profile-out", str(prefix)])
+    monkeypatch.setattr(profiling, "_stages", type(profiling._stages)())
+
+    run_profiled(_main)
+
+    stats = pstats.Stats(str(prefix) + ".pstats")
+    functions = {name for _, _, name in stats.stats}
+    assert "_worker_only_function" in functions
+    report = (tmp_path / "run-cpu.txt").read_text(encoding="utf-8")
+    assert "started during the run" in report
+    assert "Stages: none recorded" in report
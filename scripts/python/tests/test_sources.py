@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import pytest
+
+from util.sources import FetchPolicy, _policy, load_sources
+
+
+def test_configured_sources_do_not_exceed_their_rate():
+    for source in load_sources().values():
+        assert source.policy.rate_ceiling == source.policy.requests_per_second
+
+
+def test_unlimited_rate_is_allowed_with_adaptive_on():
+    policy = _policy(FetchPolicy(adaptive=True), {"requests_per_second": 0}, "test")
+    assert policy.requests_per_second == 0
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"requests_per_second": -1},
+        {"requests_per_second": 2, "max_requests_per_second": 1},
+        {"requests_per_second": 1, "min_requests_per_second": 2},
+    ],
+)
+def test_inconsistent_rates_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        _policy(FetchPolicy(), overrides, "test")
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from util.works_index import WorksIndex, build_index
+
+
+def _write_tree(data_dir: Path, collections: Dict[str, List[str]]) -> None:
+    categories = []
+    for collection, titles in collections.items():
+        subject_file = data_dir / collection / "Some Thinker" / "Works.json"
+        subject_file.parent.mkdir(parents=True)
+        works = [{"title": title, "url": f"https://example.org/{collection}/{n}.htm"} for n, title in enumerate(titles)]
+        subject_file.write_text(json.dumps(works), encoding="utf-8")
+        categories.append({"id": collection, "name": collection, "path": collection})
+    (data_dir / "index.json").write_text(json.dumps({"categories": categories}), encoding="utf-8")
+
+
+def test_scores_are_comparable_across_shards(tmp_path):
+    # "imperialism" is rare in the large collection and common in the small
+    # one; with per-shard IDF the small collection's hit would score lower
+    _write_tree(
+        tmp_path / "data",
+        {
+            "large": ["imperialism"] + [f"pamphlet number {n}" for n in range(20)],
+            "small": ["imperialism", "imperialism today"],
+        },
+    )
+    build_index(tmp_path / "data", tmp_path / "index")
+
+    with WorksIndex(tmp_path / "index") as index:
+        hits = index.search("imperialism", limit=10)
+        scores = {(hit.collection, hit.title): hit.score for hit in hits}
+
+        assert scores[("large", "imperialism")] == scores[("small", "imperialism")]
+        assert scores[("small", "imperialism today")] < scores[("small", "imperialism")]
+        assert index.search("imperialism", collections=["small"])[0].score == scores[("small", "imperialism")]
+
+
+def test_unknown_terms_return_no_hits(tmp_path):
+    _write_tree(tmp_path / "data", {"only": ["capital"]})
+    build_index(tmp_path / "data", tmp_path / "index")
+
+    with WorksIndex(tmp_path / "index") as index:
+        assert index.search("zzqx") == []
@@ -0,0 +1,496 @@
+"""
+Build a SQLite catalogue from data-v2, the harvest payloads and the source
+register, and export data-v2 back out of it.
+
+Answering questions like "which thinkers have a works_root on redtexts but
+no works in data-v2" or "where else does this URL appear" otherwise means
+walking thousands of JSON files. This loads everything into one indexed
+SQLite file:
+
+  collections, thinkers, thinker_subjects, works  - public/data-v2
+  harvest_payloads, harvest_works                 - <harvest-dir>/<collection>/<slug>.json
+  register_sources                                - data/thinker-source-register.json
+  works_fts                                       - FTS5 index over work titles
+
+All rows are inserted with executemany inside a single transaction into a
+temporary file that replaces the output only once the build succeeds.
+
+Usage:
+    python scripts/python/util/build_catalogue_db.py build
+    python scripts/python/util/build_catalogue_db.py search "theses on feuerbach"
+    python scripts/python/util/build_catalogue_db.py search --literal "Marx's letters"
+    python scripts/python/util/build_catalogue_db.py export --output-dir /tmp/data-v2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.profiling import run_profiled  # noqa: E402
+from util.works_pages import PAGE_INDEX_FILE, iter_subject_works, write_subject_works  # noqa: E402
+
+
+DEFAULT_DATA_DIR = Path("public/data-v2")
+DEFAULT_HARVEST_ROOT = Path("data/zero-works-harvest")
+DEFAULT_HARVEST_SOURCES = ("mia", "redtexts", "anarchist_library", "goldman_archive", "merged")
+DEFAULT_REGISTER_FILE = Path("data/thinker-source-register.json")
+DEFAULT_DB_FILE = Path("data/catalogue.sqlite")
+
+# Metadata keys with their own columns, in the order they are written back out
+THINKER_FIELDS = {
+    "n": "name",
+    "c": "category_label",
+    "d": "description",
+    "b": "bio_url",
+    "i": "image_url",
+    "t": "thumbnail_url",
+    "w": "work_count",
+}
+METADATA_KEY_ORDER = ("n", "c", "d", "b", "i", "t", "w", "subjects", "j")
+
+SCHEMA = """
+CREATE TABLE collections (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    count INTEGER,
+    position INTEGER NOT NULL
+);
+
+CREATE TABLE thinkers (
+    id INTEGER PRIMARY KEY,
+    collection_id TEXT NOT NULL REFERENCES collections(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    category_label TEXT,
+    description TEXT,
+    bio_url TEXT,
+    image_url TEXT,
+    thumbnail_url TEXT,
+    work_count INTEGER,
+    major_works TEXT,
+    extra TEXT
+);
+
+CREATE TABLE thinker_subjects (
+    thinker_id INTEGER NOT NULL REFERENCES thinkers(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER,
+    pages INTEGER,
+    page_size INTEGER
+);
+
+CREATE TABLE works (
+    id INTEGER PRIMARY KEY,
+    collection_id TEXT NOT NULL REFERENCES collections(id),
+    thinker TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT,
+    url TEXT,
+    description TEXT,
+    source_id TEXT
+);
+
+CREATE TABLE harvest_payloads (
+    id INTEGER PRIMARY KEY,
+    harvest_source TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    thinker TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    source_id TEXT,
+    source_url TEXT,
+    status TEXT,
+    message TEXT,
+    warnings TEXT,
+    visited_count INTEGER
+);
+
+CREATE TABLE harvest_works (
+    payload_id INTEGER NOT NULL REFERENCES harvest_payloads(id),
+    position INTEGER NOT NULL,
+    title TEXT,
+    url TEXT,
+    source_id TEXT
+);
+
+CREATE TABLE register_sources (
+    collection TEXT NOT NULL,
+    thinker TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    label TEXT,
+    type TEXT,
+    url TEXT,
+    works_root TEXT,
+    source_id TEXT,
+    notes TEXT
+);
+
+CREATE VIRTUAL TABLE works_fts USING fts5(
+    title,
+    content='works',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+INDEXES = """
+CREATE INDEX thinkers_collection ON thinkers(collection_id, position);
+CREATE INDEX thinkers_name ON thinkers(name);
+CREATE INDEX thinker_subjects_thinker ON thinker_subjects(thinker_id, position);
+CREATE INDEX works_slice ON works(collection_id, thinker, subject, position);
+CREATE INDEX works_url ON works(url);
+CREATE INDEX harvest_payloads_thinker ON harvest_payloads(collection, slug);
+CREATE INDEX harvest_payloads_status ON harvest_payloads(harvest_source, status);
+CREATE INDEX harvest_works_payload ON harvest_works(payload_id, position);
+CREATE INDEX harvest_works_url ON harvest_works(url);
+CREATE INDEX register_sources_thinker ON register_sources(collection, slug);
+CREATE INDEX register_sources_works_root ON register_sources(works_root);
+"""
+
+
+def read_json(path: Path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_json(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Ingest
+
+
+def ingest_data_v2(connection: sqlite3.Connection, data_dir: Path) -> Dict[str, int]:
+    categories = read_json(data_dir / "index.json")["categories"]
+    connection.executemany(
+        "INSERT INTO collections (id, name, path, count, position) VALUES (?, ?, ?, ?, ?)",
+        [(c["id"], c["name"], c["path"], c.get("count"), position) for position, c in enumerate(categories)],
+    )
+
+    thinker_rows: List[Tuple] = []
+    subject_rows: List[Tuple] = []
+    work_rows: List[Tuple] = []
+    for category in categories:
+        collection_dir = data_dir / category["path"]
+        metadata_file = collection_dir / "metadata.json"
+        metadata = read_json(metadata_file) if metadata_file.exists() else []
+        for position, entry in enumerate(metadata):
+            thinker_id = len(thinker_rows) + 1
+            extra = {k: v for k, v in entry.items() if k not in THINKER_FIELDS and k not in ("subjects", "j")}
+            thinker_rows.append(
+                (
+                    thinker_id,
+                    category["id"],
+                    position,
+                    *(entry.get(key) for key in THINKER_FIELDS),
+                    json.dumps(entry["j"], ensure_ascii=False) if "j" in entry else None,
+                    json.dumps(extra, ensure_ascii=False) if extra else None,
+                )
+            )
+            for subject_position, subject in enumerate(entry.get("subjects") or []):
+                page_size = None
+                if subject.get("pages"):
+                    page_index = collection_dir / entry["n"] / subject["name"] / PAGE_INDEX_FILE
+                    page_size = read_json(page_index)["pageSize"] if page_index.exists() else None
+                subject_rows.append(
+                    (
+                        thinker_id,
+                        subject_position,
+                        subject.get("name"),
+                        subject.get("count"),
+                        subject.get("pages"),
+                        page_size,
+                    )
+                )
+
+        if not collection_dir.is_dir():
+            continue
+        for thinker_dir in sorted(path for path in collection_dir.iterdir() if path.is_dir()):
+            for subject, works in iter_subject_works(thinker_dir):
+                for position, work in enumerate(works):
+                    work_rows.append(
+                        (
+                            category["id"],
+                            thinker_dir.name,
+                            subject,
+                            position,
+                            work.get("title"),
+                            work.get("url"),
+                            work.get("description"),
+                            work.get("source_id"),
+                        )
+                    )
+
+    connection.executemany(f"INSERT INTO thinkers VALUES ({', '.join('?' * 12)})", thinker_rows)
+    connection.executemany("INSERT INTO thinker_subjects VALUES (?, ?, ?, ?, ?, ?)", subject_rows)
+    connection.executemany(
+        "INSERT INTO works (collection_id, thinker, subject, position, title, url, description, source_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        work_rows,
+    )
+    connection.execute("INSERT INTO works_fts(works_fts) VALUES ('rebuild')")
+    return {"collections": len(categories), "thinkers": len(thinker_rows), "works": len(work_rows)}
+
+
+def iter_harvest_payloads(harvest_dir: Path) -> Iterator[Dict[str, object]]:
+    for payload_file in sorted(harvest_dir.glob("*/*.json")):
+        try:
+            payload = read_json(payload_file)
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"[WARN] Skipping {payload_file}: {exc}")
+            continue
+        if isinstance(payload, dict) and payload.get("slug"):
+            yield payload
+
+
+def ingest_harvest(connection: sqlite3.Connection, harvest_dirs: Iterable[Path]) -> Dict[str, int]:
+    payload_rows: List[Tuple] = []
+    work_rows: List[Tuple] = []
+    for harvest_dir in harvest_dirs:
+        if not harvest_dir.is_dir():
+            print(f"[WARN] Harvest directory not found: {harvest_dir}")
+            continue
+        for payload in iter_harvest_payloads(harvest_dir):
+            payload_id = len(payload_rows) + 1
+            payload_rows.append(
+                (
+                    payload_id,
+                    harvest_dir.name,
+                    payload.get("collection"),
+                    payload.get("thinker"),
+                    payload.get("slug"),
+                    payload.get("source_id"),
+                    payload.get("source_url"),
+                    payload.get("status"),
+                    payload.get("message"),
+                    json.dumps(payload.get("warnings") or [], ensure_ascii=False),
+                    len(payload.get("visited_urls") or []),
+                )
+            )
+            for position, work in enumerate(payload.get("works") or []):
+                work_rows.append((payload_id, position, work.get("title"), work.get("url"), work.get("source_id")))
+
+    connection.executemany(f"INSERT INTO harvest_payloads VALUES ({', '.join('?' * 11)})", payload_rows)
+    connection.executemany("INSERT INTO harvest_works VALUES (?, ?, ?, ?, ?)", work_rows)
+    return {"payloads": len(payload_rows), "harvest_works": len(work_rows)}
+
+
+def ingest_register(connection: sqlite3.Connection, register_file: Path) -> Dict[str, int]:
+    if not register_file.exists():
+        print(f"[WARN] Register not found: {register_file}")
+        return {"register_sources": 0}
+    rows = []
+    for entry in read_json(register_file):
+        for position, source in enumerate(entry.get("sources") or []):
+            rows.append(
+                (
+                    entry.get("collection"),
+                    entry.get("thinker"),
+                    entry.get("slug"),
+                    position,
+                    source.get("label"),
+                    source.get("type"),
+                    source.get("url"),
+                    source.get("works_root"),
+                    source.get("source_id"),
+                    json.dumps(source.get("notes") or [], ensure_ascii=False),
+                )
+            )
+    connection.executemany(f"INSERT INTO register_sources VALUES ({', '.join('?' * 10)})", rows)
+    return {"register_sources": len(rows)}
+
+
+def build_database(
+    db_file: Path,
+    data_dir: Path,
+    harvest_dirs: List[Path],
+    register_file: Path,
+) -> Dict[str, int]:
+    db_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = db_file.with_name(db_file.name + ".tmp")
+    tmp_file.unlink(missing_ok=True)
+
+    connection = sqlite3.connect(tmp_file, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.executescript(SCHEMA)
+        connection.execute("BEGIN")
+        counts = ingest_data_v2(connection, data_dir)
+        counts.update(ingest_harvest(connection, harvest_dirs))
+        counts.update(ingest_register(connection, register_file))
+        for statement in filter(str.strip, INDEXES.split(";")):
+            connection.execute(statement)
+        connection.execute("COMMIT")
+        connection.execute("ANALYZE")
+    except Exception:
+        connection.close()
+        tmp_file.unlink(missing_ok=True)
+        raise
+    connection.close()
+
+    tmp_file.replace(db_file)
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Export
+
+
+def export_data_v2(connection: sqlite3.Connection, output_dir: Path) -> Dict[str, int]:
+    """Write index.json, metadata.json and the works files back out from the database."""
+    connection.row_factory = sqlite3.Row
+    collections = connection.execute("SELECT * FROM collections ORDER BY position").fetchall()
+    write_json(
+        output_dir / "index.json",
+        {"categories": [{"id": c["id"], "name": c["name"], "path": c["path"], "count": c["count"]} for c in collections]},
+    )
+
+    subjects: Dict[int, List[Dict[str, object]]] = {}
+    page_sizes: Dict[Tuple[str, str, str], int] = {}
+    for row in connection.execute(
+        "SELECT s.*, t.collection_id, t.name AS thinker FROM thinker_subjects s "
+        "JOIN thinkers t ON t.id = s.thinker_id ORDER BY s.thinker_id, s.position"
+    ):
+        subject = {"name": row["name"], "count": row["count"]}
+        if row["pages"]:
+            subject["pages"] = row["pages"]
+        if row["page_size"]:
+            page_sizes[(row["collection_id"], row["thinker"], row["name"])] = row["page_size"]
+        subjects.setdefault(row["thinker_id"], []).append(subject)
+
+    files = 0
+    for collection in collections:
+        metadata = []
+        for row in connection.execute(
+            "SELECT * FROM thinkers WHERE collection_id = ? ORDER BY position", (collection["id"],)
+        ):
+            values = {key: row[column] for key, column in THINKER_FIELDS.items() if row[column] is not None}
+            if row["id"] in subjects:
+                values["subjects"] = subjects[row["id"]]
+            if row["major_works"] is not None:
+                values["j"] = json.loads(row["major_works"])
+            extra = json.loads(row["extra"]) if row["extra"] else {}
+            entry = {key: values[key] for key in METADATA_KEY_ORDER if key in values}
+            entry.update(extra)
+            metadata.append(entry)
+        collection_dir = output_dir / collection["path"]
+        write_json(collection_dir / "metadata.json", metadata)
+
+        def flush(thinker: str, subject: str, works: List[Dict[str, str]]) -> None:
+            thinker_dir = collection_dir / thinker
+            thinker_dir.mkdir(parents=True, exist_ok=True)
+            write_subject_works(
+                thinker_dir, subject, works, page_size=page_sizes.get((collection["id"], thinker, subject))
+            )
+
+        current: Optional[Tuple[str, str]] = None
+        works: List[Dict[str, str]] = []
+        rows = connection.execute(
+            "SELECT thinker, subject, title, url, description, source_id FROM works "
+            "WHERE collection_id = ? ORDER BY thinker, subject, position",
+            (collection["id"],),
+        )
+        for row in rows:
+            key = (row["thinker"], row["subject"])
+            if key != current:
+                if current is not None:
+                    flush(*current, works)
+                    files += 1
+                current, works = key, []
+            works.append(
+                {field: row[field] for field in ("title", "url", "description", "source_id") if row[field] is not None}
+            )
+        if current is not None:
+            flush(*current, works)
+            files += 1
+
+    return {"collections": len(collections), "subjects": files}
+
+
+def fts_phrase(text: str) -> str:
+    """Quote text as a single FTS5 phrase, so quotes and operators in it match literally."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def search_titles(connection: sqlite3.Connection, query: str, limit: int, literal: bool = False) -> List[Tuple]:
+    """Works whose titles match query (FTS5 syntax unless literal); raises sqlite3.OperationalError on bad syntax."""
+    if literal:
+        query = fts_phrase(query)
+    return connection.execute(
+        "SELECT w.collection_id, w.thinker, w.subject, w.title, w.url FROM works_fts "
+        "JOIN works w ON w.id = works_fts.rowid WHERE works_fts MATCH ? ORDER BY rank LIMIT ?",
+        (query, limit),
+    ).fetchall()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build, query and export the SQLite catalogue.")
+    parser.add_argument("--db-file", type=Path, default=DEFAULT_DB_FILE, help="SQLite database path.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Build the database from data-v2, harvests and the register.")
+    build_parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="Root of the data-v2 tree.")
+    build_parser.add_argument(
+        "--harvest-dir",
+        type=Path,
+        action="append",
+        help="Harvest output directory (repeatable). Defaults to the per-source and merged dirs.",
+    )
+    build_parser.add_argument(
+        "--register-file", type=Path, default=DEFAULT_REGISTER_FILE, help="thinker-source-register.json path."
+    )
+
+    search_parser = subparsers.add_parser("search", help="Full-text search over work titles (FTS5 syntax).")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=20)
+    search_parser.add_argument(
+        "--literal", action="store_true", help="Match the query as one phrase instead of FTS5 syntax."
+    )
+
+    export_parser = subparsers.add_parser("export", help="Write a data-v2 tree from the database.")
+    export_parser.add_argument("--output-dir", type=Path, required=True, help="Destination data-v2 directory.")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if not args.data_dir.exists():
+            raise FileNotFoundError(f"Data directory not found: {args.data_dir}")
+        harvest_dirs = args.harvest_dir or [DEFAULT_HARVEST_ROOT / name for name in DEFAULT_HARVEST_SOURCES]
+        start = time.perf_counter()
+        counts = build_database(args.db_file, args.data_dir, harvest_dirs, args.register_file)
+        summary = ", ".join(f"{value} {key}" for key, value in counts.items())
+        print(f"Built {args.db_file} in {time.perf_counter() - start:.1f}s: {summary}")
+        return
+
+    if not args.db_file.exists():
+        raise FileNotFoundError(f"Database not found: {args.db_file}")
+    connection = sqlite3.connect(args.db_file)
+    try:
+        if args.command == "search":
+            try:
+                rows = search_titles(connection, args.query, args.limit, literal=args.literal)
+            except sqlite3.OperationalError as exc:
+                parser.error(f"invalid search query {args.query!r} ({exc}); use --literal to match it as typed")
+            for collection, thinker, subject, title, url in rows:
+                print(f"{collection}/{thinker}/{subject}  {title}  {url}")
+        else:
+            counts = export_data_v2(connection, args.output_dir)
+            print(f"Exported {counts['collections']} collections, {counts['subjects']} subjects to {args.output_dir}")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    run_profiled(main)
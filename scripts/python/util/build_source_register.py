@@ -11,18 +11,30 @@ Usage:
     python scripts/python/util/build_source_register.py \
         --harvest-dir data/zero-works-harvest \
         --output-file data/thinker-source-register.json
+
+With --incremental, per-input fingerprints (mtime, size, sha256) are kept in
+a sidecar state file next to the register. Later runs only re-read harvest
+files and data-v2 thinker directories whose fingerprints changed and patch
+the affected register entries in place.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
-import re
-import unicodedata
+import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.names import slugify  # noqa: E402
+from util.profiling import run_profiled, stage  # noqa: E402
+from util.urls import canonicalize_url  # noqa: E402
+from util.works_pages import list_subjects, read_subject_works, subject_files  # noqa: E402
+
 
 def iter_harvest_files(harvest_dir: Path) -> Iterable[Path]:
     """Yield all harvest JSON files."""
@@ -55,22 +67,33 @@ PRUNE_SEGMENTS: Set[str] = {
 }
 
 
-def slugify(name: str) -> str:
-    normalized = unicodedata.normalize("NFKD", name)
-    ascii_name = normalized.encode("ascii", "ignore").decode("ascii")
-    cleaned = re.sub(r"[’'`]", "", ascii_name)
-    cleaned = re.sub(r"[^a-zA-Z0-9]+", "-", cleaned).strip("-")
-    return cleaned.lower()
+DOCUMENT_EXTENSIONS = (".htm", ".html", ".pdf", ".txt")
 
 
 def normalize_works_root(url: str) -> Optional[str]:
+    """Return the works root for a URL, memoized on its directory prefix.
+
+    Work URLs under one author tree mostly differ only in the final document
+    name, which is discarded anyway, so they share a single cache entry.
+    """
+    if "?" not in url and "#" not in url:
+        head, _, tail = url.rpartition("/")
+        if tail.endswith(DOCUMENT_EXTENSIONS) and "://" in head:
+            url = f"{head}/"
+    return _normalize_works_root(canonicalize_url(url))
+
+
+@lru_cache(maxsize=None)
+def _normalize_works_root(url: str) -> Optional[str]:
+    if not url:
+        return None
     parsed = urlparse(url)
     if not parsed.scheme or not parsed.netloc:
         return None
 
     segments = [segment for segment in parsed.path.split("/") if segment]
 
-    if segments and segments[-1].endswith((".htm", ".html", ".pdf", ".txt")):
+    if segments and segments[-1].endswith(DOCUMENT_EXTENSIONS):
         segments.pop()
 
     def should_prune(segment: str) -> bool:
@@ -137,11 +160,9 @@ def add_source(
     source_id: Optional[str] = None,
 ) -> None:
     sources: List[Dict[str, object]] = entry.setdefault("sources", [])
-    for source in sources:
-        existing_root = source.get("works_root")
-        existing_url = source.get("url")
-        if existing_root == works_root or existing_url == url:
-            return
+    seen_roots, seen_urls = _source_index(entry)
+    if works_root in seen_roots or url in seen_urls:
+        return
     rec: Dict[str, object] = {
         "label": label,
         "type": source_type,
@@ -152,6 +173,25 @@ def add_source(
     if source_id:
         rec["source_id"] = source_id
     sources.append(rec)
+    seen_roots.add(works_root)
+    seen_urls.add(url)
+
+
+def _source_index(entry: Dict[str, object]) -> Tuple[Set[object], Set[object]]:
+    """Return the (works_root, url) sets used to dedupe an entry's sources.
+
+    The sets live on the entry under a private key while the register is being
+    built and are dropped by register_to_list before serialisation.
+    """
+    index = entry.get("_source_index")
+    if index is None:
+        sources = entry.get("sources") or []
+        index = (
+            {source.get("works_root") for source in sources},
+            {source.get("url") for source in sources},
+        )
+        entry["_source_index"] = index
+    return index  # type: ignore[return-value]
 
 
 def classify_label(url: str, source_id: Optional[str] = None) -> Tuple[str, str]:
@@ -176,38 +216,56 @@ def classify_label(url: str, source_id: Optional[str] = None) -> Tuple[str, str]
     return f"{host} Works Root", "external_works_root"
 
 
+def harvest_payload_key(payload: Dict[str, object]) -> Optional[Tuple[str, str]]:
+    """Return the register key a harvest payload contributes to, if any."""
+    status = payload.get("status")
+    source_url = payload.get("source_url")
+    collection = payload.get("collection")
+    thinker = payload.get("thinker")
+    slug = payload.get("slug")
+    if status != "success" or not source_url or not collection or not thinker or not slug:
+        return None
+    return collection, slug  # type: ignore[return-value]
+
+
+def add_harvest_payload(records: Dict[Tuple[str, str], Dict[str, object]], payload: Dict[str, object]) -> None:
+    if harvest_payload_key(payload) is None:
+        return
+
+    source_url = payload.get("source_url")
+    collection = payload.get("collection")
+    thinker = payload.get("thinker")
+    slug = payload.get("slug")
+    source_id = payload.get("source_id", "mia")
+
+    works_root = normalize_works_root(source_url) if "marxists.org" in (source_url or "") else (source_url or "")
+    if not works_root:
+        works_root = source_url or ""
+
+    entry = ensure_entry(records, collection, thinker, slug)
+    label, source_type = classify_label(source_url or "", source_id)
+    add_source(entry, source_url, works_root, label, source_type, source_id=source_id)
+
+
 def build_register(harvest_dir: Path) -> Dict[Tuple[str, str], Dict[str, object]]:
     records: Dict[tuple, Dict[str, object]] = {}
     for file_path in iter_harvest_files(harvest_dir):
         payload = json.loads(file_path.read_text(encoding="utf-8"))
-        status = payload.get("status")
-        source_url = payload.get("source_url")
-        collection = payload.get("collection")
-        thinker = payload.get("thinker")
-        slug = payload.get("slug")
-        source_id = payload.get("source_id", "mia")
-
-        if status != "success" or not source_url or not collection or not thinker or not slug:
-            continue
+        add_harvest_payload(records, payload)
 
-        works_root = normalize_works_root(source_url) if "marxists.org" in (source_url or "") else (source_url or "")
-        if not works_root:
-            works_root = source_url or ""
+    return records
 
-        entry = ensure_entry(records, collection, thinker, slug)
-        label, source_type = classify_label(source_url or "", source_id)
-        add_source(entry, source_url, works_root, label, source_type, source_id=source_id)
 
-    return records
+def dataset_subjects(thinker_dir: Path) -> List[str]:
+    """Subjects of a data-v2 thinker directory, single-file or paginated."""
+    return [subject for subject in list_subjects(thinker_dir) if subject.lower() != "metadata"]
 
 
 def collect_work_urls(thinker_dir: Path) -> Iterable[str]:
-    for json_file in sorted(thinker_dir.glob("*.json")):
-        if json_file.name.lower() == "metadata.json":
-            continue
+    for subject in dataset_subjects(thinker_dir):
         try:
-            works = json.loads(json_file.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
+            works = read_subject_works(thinker_dir, subject)
+        except (OSError, json.JSONDecodeError):
             continue
         if not isinstance(works, list):
             continue
@@ -218,16 +276,13 @@ def collect_work_urls(thinker_dir: Path) -> Iterable[str]:
                     yield url
 
 
-def augment_with_dataset(register: Dict[Tuple[str, str], Dict[str, object]], data_dir: Path) -> None:
-    if not data_dir.exists():
-        return
-
+def iter_dataset_thinkers(data_dir: Path) -> Iterable[Tuple[str, str, Path]]:
+    """Yield (collection folder, thinker name, thinker dir) for each metadata entry."""
     for collection_dir in sorted(p for p in data_dir.iterdir() if p.is_dir()):
         metadata_file = collection_dir / "metadata.json"
         if not metadata_file.exists():
             continue
 
-        collection_key = collection_dir.name
         try:
             metadata = json.loads(metadata_file.read_text(encoding="utf-8"))
         except json.JSONDecodeError:
@@ -237,25 +292,197 @@ def augment_with_dataset(register: Dict[Tuple[str, str], Dict[str, object]], dat
             thinker_name = entry.get("n")
             if not thinker_name:
                 continue
+            yield collection_dir.name, thinker_name, collection_dir / thinker_name
 
-            slug_value = slugify(thinker_name)
-            register_entry = ensure_entry(register, collection_key, thinker_name, slug_value)
-            register_entry["thinker"] = thinker_name  # ensure latest casing
 
-            thinker_dir = collection_dir / thinker_name
-            if not thinker_dir.exists():
-                continue
+def add_dataset_thinker(
+    register: Dict[Tuple[str, str], Dict[str, object]],
+    collection_key: str,
+    thinker_name: str,
+    thinker_dir: Path,
+) -> None:
+    slug_value = slugify(thinker_name)
+    register_entry = ensure_entry(register, collection_key, thinker_name, slug_value)
+    register_entry["thinker"] = thinker_name  # ensure latest casing
 
-            for url in collect_work_urls(thinker_dir):
-                works_root = normalize_works_root(url)
-                if not works_root:
-                    continue
-                label, source_type = classify_label(works_root)
-                add_source(register_entry, works_root, works_root, label, source_type)
+    if not thinker_dir.exists():
+        return
+
+    for url in collect_work_urls(thinker_dir):
+        works_root = normalize_works_root(url)
+        if not works_root:
+            continue
+        label, source_type = classify_label(works_root)
+        add_source(register_entry, works_root, works_root, label, source_type)
+
+
+def augment_with_dataset(register: Dict[Tuple[str, str], Dict[str, object]], data_dir: Path) -> None:
+    if not data_dir.exists():
+        return
+
+    for collection_key, thinker_name, thinker_dir in iter_dataset_thinkers(data_dir):
+        add_dataset_thinker(register, collection_key, thinker_name, thinker_dir)
+
+
+STATE_VERSION = 1
+
+
+def file_fingerprint(path: Path, previous: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+    """Return {mtime_ns, size, sha256} for a file, reusing the hash when stat is unchanged."""
+    stat = path.stat()
+    if previous and previous.get("mtime_ns") == stat.st_mtime_ns and previous.get("size") == stat.st_size:
+        return previous
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": hashlib.sha256(path.read_bytes()).hexdigest(),
+    }
+
+
+def load_state(state_file: Path, harvest_dir: Path, data_dir: Optional[Path]) -> Dict[str, object]:
+    """Load the sidecar state, discarding it if it was built from different inputs."""
+    empty: Dict[str, object] = {"files": {}, "inputs": {}}
+    if not state_file.exists():
+        return empty
+    try:
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return empty
+    if (
+        state.get("version") != STATE_VERSION
+        or state.get("harvest_dir") != str(harvest_dir.resolve())
+        or state.get("data_dir") != (str(data_dir.resolve()) if data_dir else None)
+    ):
+        return empty
+    return state
+
+
+def load_register(output_file: Path) -> Dict[Tuple[str, str], Dict[str, object]]:
+    register: Dict[Tuple[str, str], Dict[str, object]] = {}
+    for record in json.loads(output_file.read_text(encoding="utf-8")):
+        collection = record.get("collection")
+        slug = record.get("slug")
+        if collection and slug:
+            register[(collection, slug)] = record
+    return register
+
+
+def scan_inputs(
+    harvest_dir: Path,
+    data_dir: Optional[Path],
+    previous_files: Dict[str, Dict[str, object]],
+) -> Tuple[Dict[str, Dict[str, object]], Dict[str, Dict[str, object]]]:
+    """Fingerprint every input, in the order a full build would process them.
+
+    Returns (files, inputs): per-file fingerprints keyed by path, and per-input
+    records keyed by input id ("harvest:<path>" or "dataset:<collection>/<thinker>")
+    carrying a combined digest plus what is needed to replay the input.
+    """
+    files: Dict[str, Dict[str, object]] = {}
+    inputs: Dict[str, Dict[str, object]] = {}
+
+    for file_path in iter_harvest_files(harvest_dir):
+        path_key = str(file_path)
+        files[path_key] = file_fingerprint(file_path, previous_files.get(path_key))
+        inputs[f"harvest:{path_key}"] = {"digest": files[path_key]["sha256"], "path": file_path}
+
+    if data_dir and data_dir.exists():
+        for collection_key, thinker_name, thinker_dir in iter_dataset_thinkers(data_dir):
+            digest = hashlib.sha256()
+            if thinker_dir.exists():
+                for subject in dataset_subjects(thinker_dir):
+                    for json_file in subject_files(thinker_dir, subject):
+                        path_key = str(json_file)
+                        files[path_key] = file_fingerprint(json_file, previous_files.get(path_key))
+                        name = json_file.relative_to(thinker_dir).as_posix()
+                        digest.update(f"{name}\0{files[path_key]['sha256']}\0".encode("utf-8"))
+            inputs[f"dataset:{collection_key}/{thinker_name}"] = {
+                "digest": digest.hexdigest(),
+                "key": [collection_key, slugify(thinker_name)],
+                "collection": collection_key,
+                "thinker": thinker_name,
+                "path": thinker_dir,
+            }
+
+    return files, inputs
+
+
+def build_register_incremental(
+    harvest_dir: Path,
+    data_dir: Optional[Path],
+    output_file: Path,
+    state_file: Path,
+) -> Tuple[Dict[Tuple[str, str], Dict[str, object]], Dict[str, object], Dict[str, int]]:
+    """Patch an existing register using only the inputs that changed since the last run.
+
+    Every register entry touched by a changed, new or removed input is dropped
+    and rebuilt by replaying all current inputs for that key in full-build
+    order, so the result matches a from-scratch build.
+    """
+    state = load_state(state_file, harvest_dir, data_dir)
+    previous_inputs: Dict[str, Dict[str, object]] = state.get("inputs") or {}  # type: ignore[assignment]
+    register = load_register(output_file) if previous_inputs and output_file.exists() else {}
+    if not register:
+        previous_inputs = {}
+
+    files, inputs = scan_inputs(harvest_dir, data_dir, state.get("files") or {})  # type: ignore[arg-type]
+
+    payloads: Dict[str, Dict[str, object]] = {}
+    dirty_keys: Set[Tuple[str, str]] = set()
+    changed = 0
+    for input_id, record in inputs.items():
+        previous = previous_inputs.get(input_id)
+        if previous and previous.get("digest") == record["digest"]:
+            record["key"] = previous.get("key")
+            continue
+        changed += 1
+        if previous and previous.get("key"):
+            dirty_keys.add(tuple(previous["key"]))  # type: ignore[arg-type]
+        if input_id.startswith("harvest:"):
+            payload = json.loads(Path(record["path"]).read_text(encoding="utf-8"))  # type: ignore[arg-type]
+            payloads[input_id] = payload
+            key = harvest_payload_key(payload)
+            record["key"] = list(key) if key else None
+        if record.get("key"):
+            dirty_keys.add(tuple(record["key"]))  # type: ignore[arg-type]
+
+    removed = 0
+    for input_id, previous in previous_inputs.items():
+        if input_id not in inputs:
+            removed += 1
+            if previous.get("key"):
+                dirty_keys.add(tuple(previous["key"]))  # type: ignore[arg-type]
+
+    for key in dirty_keys:
+        register.pop(key, None)
+
+    for input_id, record in inputs.items():
+        if not record.get("key") or tuple(record["key"]) not in dirty_keys:  # type: ignore[arg-type]
+            continue
+        if input_id.startswith("harvest:"):
+            payload = payloads.get(input_id)
+            if payload is None:
+                payload = json.loads(Path(record["path"]).read_text(encoding="utf-8"))  # type: ignore[arg-type]
+            add_harvest_payload(register, payload)
+        else:
+            add_dataset_thinker(register, record["collection"], record["thinker"], record["path"])  # type: ignore[arg-type]
+
+    new_state: Dict[str, object] = {
+        "version": STATE_VERSION,
+        "harvest_dir": str(harvest_dir.resolve()),
+        "data_dir": str(data_dir.resolve()) if data_dir else None,
+        "files": files,
+        "inputs": {input_id: {"digest": record["digest"], "key": record.get("key")} for input_id, record in inputs.items()},
+    }
+    stats = {"changed": changed, "removed": removed, "rebuilt": len(dirty_keys)}
+    return register, new_state, stats
 
 
 def register_to_list(register: Dict[Tuple[str, str], Dict[str, object]]) -> List[Dict[str, object]]:
-    return [register[key] for key in sorted(register)]
+    return [
+        {field: value for field, value in register[key].items() if not field.startswith("_")}
+        for key in sorted(register)
+    ]
 
 
 def main() -> None:
@@ -278,23 +505,50 @@ def main() -> None:
         default=Path("data/thinker-source-register.json"),
         help="Destination JSON file for the register.",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only reprocess inputs whose fingerprints changed since the last incremental run.",
+    )
+    parser.add_argument(
+        "--state-file",
+        type=Path,
+        default=None,
+        help="Fingerprint state for --incremental (default: <output-file>.state.json).",
+    )
     args = parser.parse_args()
 
     if not args.harvest_dir.exists():
         raise FileNotFoundError(f"Harvest directory not found: {args.harvest_dir}")
 
-    register = build_register(args.harvest_dir)
-
-    if args.data_dir:
-        augment_with_dataset(register, args.data_dir)
+    state_file = args.state_file or args.output_file.with_suffix(".state.json")
+    summary = ""
+    if args.incremental:
+        with stage("incremental build"):
+            register, state, stats = build_register_incremental(
+                args.harvest_dir, args.data_dir, args.output_file, state_file
+            )
+        summary = (
+            f" ({stats['changed']} changed and {stats['removed']} removed inputs, "
+            f"{stats['rebuilt']} entries rebuilt)"
+        )
+    else:
+        with stage("build register"):
+            register = build_register(args.harvest_dir)
+
+        if args.data_dir:
+            with stage("augment with dataset"):
+                augment_with_dataset(register, args.data_dir)
 
     args.output_file.parent.mkdir(parents=True, exist_ok=True)
-    payload = register_to_list(register)
-    args.output_file.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
-    print(f"Wrote {len(payload)} register entries to {args.output_file}")
+    with stage("write register"):
+        payload = register_to_list(register)
+        args.output_file.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    if args.incremental:
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        state_file.write_text(json.dumps(state, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"Wrote {len(payload)} register entries to {args.output_file}{summary}")
 
 
 if __name__ == "__main__":
-    main()
-
-
+    run_profiled(main)
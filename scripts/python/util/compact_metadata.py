@@ -0,0 +1,278 @@
+"""
+Compact encoding for thinker metadata lists (the n/c/d/b/i/t/w entries
+written by convert-bundle-to-efficient-formats.py and data-v2 metadata.json).
+
+Short keys still leave every category name, boilerplate description and
+URL prefix repeated once per thinker. The compact form stores each entry
+as a row of columns and replaces repeated text with references:
+
+    {
+      "v": 1,
+      "k": [["n", "s"], ["c", "s"], ..., ["w", "r"], ["subjects", "subjects"], ["j", "works"]],
+      "s": ["Early Comintern", ...],                                 # shared strings
+      "p": ["https://upload.wikimedia.org/wikipedia/commons/", ...],  # URL prefixes
+      "r": [[0, 3, ...], ...],                                       # one row per entry
+      "z": [[12, 4], ...]                                            # explicit nulls
+    }
+
+In a string column a value is an int (index into "s"), a [prefix index,
+suffix] pair, or a literal string; null means the key was absent and
+trailing nulls are dropped. Keys present with a null value are listed in
+"z" as [row, column] pairs (omitted when there are none). "r" columns hold
+raw JSON values, "subjects" columns hold [name, count] pairs and "works"
+columns [title, url] pairs (or the raw object when a work has other fields
+or non-string values).
+
+decode_metadata(encode_metadata(entries)) == entries for any list of
+metadata dicts; run this module with --verify to check that over a tree.
+
+Usage:
+    python scripts/python/util/compact_metadata.py --verify public/data-v2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.profiling import run_profiled  # noqa: E402
+
+
+COMPACT_VERSION = 1
+DEFAULT_URL_PREFIXES = (
+    "https://upload.wikimedia.org/wikipedia/commons/",
+    "https://www.marxists.org/reference/archive/",
+    "https://www.marxists.org/archive/",
+)
+MIN_INTERN_LENGTH = 4
+MIN_PREFIX_USES = 3
+
+
+def _column_types(entries: List[Dict[str, object]]) -> List[Tuple[str, str]]:
+    keys: Dict[str, None] = {}
+    for entry in entries:
+        keys.update(dict.fromkeys(entry))
+
+    columns = []
+    for key in keys:
+        values = [entry[key] for entry in entries if entry.get(key) is not None]
+        if key == "subjects" and all(
+            isinstance(value, list) and all(isinstance(item, dict) and set(item) == {"name", "count"} for item in value)
+            for value in values
+        ):
+            columns.append((key, "subjects"))
+        elif key == "j" and all(isinstance(value, list) for value in values):
+            columns.append((key, "works"))
+        elif all(isinstance(value, str) for value in values):
+            columns.append((key, "s"))
+        else:
+            columns.append((key, "r"))
+    return columns
+
+
+def _is_work_pair(work) -> bool:
+    return (
+        isinstance(work, dict)
+        and set(work) == {"title", "url"}
+        and isinstance(work["title"], str)
+        and isinstance(work["url"], str)
+    )
+
+
+def _iter_strings(entries: List[Dict[str, object]], columns: List[Tuple[str, str]]) -> Iterable[str]:
+    for entry in entries:
+        for key, kind in columns:
+            value = entry.get(key)
+            if value is None:
+                continue
+            if kind == "s":
+                yield value
+            elif kind == "subjects":
+                yield from (item["name"] for item in value)
+            elif kind == "works":
+                for work in value:
+                    if _is_work_pair(work):
+                        yield from (work["title"], work["url"])
+
+
+def _select_prefixes(strings: Counter, interned: Dict[str, int]) -> List[str]:
+    """Known archive prefixes plus any host/first-directory prefix used often enough."""
+    uses: Counter = Counter()
+    for value, count in strings.items():
+        if value in interned or "://" not in value:
+            continue
+        scheme_end = value.index("://") + 3
+        slash = value.find("/", scheme_end)
+        while slash != -1:
+            uses[value[:slash + 1]] += count
+            slash = value.find("/", slash + 1)
+
+    prefixes = [prefix for prefix in DEFAULT_URL_PREFIXES if uses[prefix]]
+    for prefix, count in uses.most_common():
+        if count < MIN_PREFIX_USES:
+            break
+        if prefix not in prefixes and prefix.count("/") <= 4:
+            prefixes.append(prefix)
+    # Longest first, so encoding can take the first match
+    return sorted(prefixes, key=len, reverse=True)
+
+
+class _StringEncoder:
+    def __init__(self, entries: List[Dict[str, object]], columns: List[Tuple[str, str]]):
+        counts = Counter(_iter_strings(entries, columns))
+        shared = [value for value, count in counts.most_common() if count > 1 and len(value) >= MIN_INTERN_LENGTH]
+        self.table = shared
+        self.index = {value: position for position, value in enumerate(shared)}
+        self.prefixes = _select_prefixes(counts, self.index)
+
+    def encode(self, value: str):
+        position = self.index.get(value)
+        if position is not None:
+            return position
+        for prefix_index, prefix in enumerate(self.prefixes):
+            if value.startswith(prefix):
+                return [prefix_index, value[len(prefix):]]
+        return value
+
+
+def encode_metadata(entries: List[Dict[str, object]]) -> Dict[str, object]:
+    columns = _column_types(entries)
+    strings = _StringEncoder(entries, columns)
+
+    rows = []
+    nulls = []
+    for row_index, entry in enumerate(entries):
+        row = []
+        explicit = 0
+        for column_index, (key, kind) in enumerate(columns):
+            value = entry.get(key)
+            if value is None:
+                row.append(None)
+                if key in entry:
+                    nulls.append([row_index, column_index])
+                    explicit = len(row)
+            elif kind == "s":
+                row.append(strings.encode(value))
+            elif kind == "subjects":
+                row.append([[strings.encode(item["name"]), item["count"]] for item in value])
+            elif kind == "works":
+                row.append(
+                    [
+                        [strings.encode(work["title"]), strings.encode(work["url"])]
+                        if _is_work_pair(work)
+                        else work
+                        for work in value
+                    ]
+                )
+            else:
+                row.append(value)
+        while len(row) > explicit and row[-1] is None:
+            row.pop()
+        rows.append(row)
+
+    payload = {
+        "v": COMPACT_VERSION,
+        "k": [list(column) for column in columns],
+        "s": strings.table,
+        "p": strings.prefixes,
+        "r": rows,
+    }
+    if nulls:
+        payload["z"] = nulls
+    return payload
+
+
+def decode_metadata(payload: Dict[str, object]) -> List[Dict[str, object]]:
+    if payload.get("v") != COMPACT_VERSION:
+        raise ValueError(f"Unsupported compact metadata version: {payload.get('v')}")
+    table: List[str] = payload["s"]
+    prefixes: List[str] = payload["p"]
+    nulls = {(row_index, column_index) for row_index, column_index in payload.get("z", [])}
+
+    def decode_string(value):
+        if isinstance(value, int):
+            return table[value]
+        if isinstance(value, list):
+            return prefixes[value[0]] + value[1]
+        return value
+
+    entries = []
+    for row_index, row in enumerate(payload["r"]):
+        entry: Dict[str, object] = {}
+        for column_index, ((key, kind), value) in enumerate(zip(payload["k"], row)):
+            if value is None:
+                if (row_index, column_index) in nulls:
+                    entry[key] = None
+                continue
+            if kind == "s":
+                entry[key] = decode_string(value)
+            elif kind == "subjects":
+                entry[key] = [{"name": decode_string(name), "count": count} for name, count in value]
+            elif kind == "works":
+                entry[key] = [
+                    {"title": decode_string(work[0]), "url": decode_string(work[1])} if isinstance(work, list) else work
+                    for work in value
+                ]
+            else:
+                entry[key] = value
+        entries.append(entry)
+    return entries
+
+
+def verify_round_trip(entries: List[Dict[str, object]]) -> Optional[int]:
+    """Return the index of the first entry that does not survive encode/decode, or None."""
+    decoded = decode_metadata(json.loads(json.dumps(encode_metadata(entries))))
+    if len(decoded) != len(entries):
+        return min(len(decoded), len(entries))
+    for position, (before, after) in enumerate(zip(entries, decoded)):
+        if before != after:
+            return position
+    return None
+
+
+def minified_size(data) -> int:
+    return len(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Round-trip check the compact metadata encoding.")
+    parser.add_argument(
+        "--verify",
+        type=Path,
+        nargs="+",
+        required=True,
+        help="metadata JSON files or directories to search for metadata.json.",
+    )
+    args = parser.parse_args()
+
+    files: List[Path] = []
+    for path in args.verify:
+        files.extend(sorted(path.rglob("metadata.json")) if path.is_dir() else [path])
+
+    failures = 0
+    plain_total = compact_total = 0
+    for path in files:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+        mismatch = verify_round_trip(entries)
+        if mismatch is not None:
+            failures += 1
+            print(f"[ERROR] {path}: entry {mismatch} does not round-trip")
+        plain_total += minified_size(entries)
+        compact_total += minified_size(encode_metadata(entries))
+
+    print(
+        f"Checked {len(files)} files, {failures} failures. "
+        f"Minified {plain_total:,} bytes -> compact {compact_total:,} bytes "
+        f"({compact_total / max(plain_total, 1) * 100:.1f}%)"
+    )
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run_profiled(main)
@@ -0,0 +1,270 @@
+"""
+Process-wide crawl scheduler with one frontier per host.
+
+The scrapers used to pace themselves with a sleep before each request, so
+a thread waiting out one host's delay could send nothing else, and a run
+went source by source, thinker by thinker. Here every request goes through
+one scheduler instead:
+
+    response = default_scheduler().fetch(session, url)
+
+fetch() queues the request on its host's frontier and blocks the calling
+thread until a worker has sent it. A dispatcher thread hands requests to
+the worker pool from whichever host is eligible: its frontier is not
+empty, fewer than policy.concurrency of its requests are in flight, and
+1 / policy.requests_per_second has passed since its last dispatch. Among
+eligible hosts the one that has waited longest goes first. A throttled
+host never holds up requests to other hosts, so as long as callers keep
+requests queued for several hosts (harvest_all_sources.py runs every
+source at once; harvest_zero_work_thinkers.py keeps several thinkers in
+progress) the aggregate rate approaches the sum of the per-host limits.
+
+A host's limits come from the fetch_policy of the sessions that use it
+(util/sources.py); when sessions with different policies share a host the
+stricter rate and concurrency apply. Time a request spends queued is
+recorded as throttle time in the session's HttpMetrics.
+
+With policy.adaptive the rate follows the host's responses (AIMD):
+
+- each response without trouble adds RATE_INCREASE req/s, up to
+  max_requests_per_second (by default the starting rate, so a host only
+  recovers from cuts unless its policy allows more)
+- a 429 or 503, or a smoothed time to first byte more than LATENCY_FACTOR
+  times the fastest seen (and over MIN_SLOW_SECONDS), halves the rate, down
+  to min_requests_per_second; responses to requests sent before the last
+  cut do not cut it again, so one burst of 429s counts once
+- a 429/503 also holds the whole host until its Retry-After (or one
+  interval, without the header), and the request is queued again at the
+  front, up to policy.max_retries times
+
+The current rate is reported to HttpMetrics.record_rate() after each response.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests import Response
+
+
+DEFAULT_WORKERS = 32
+THROTTLE_STATUSES = (429, 503)
+RATE_INCREASE = 0.05
+RATE_DECREASE = 0.5
+LATENCY_FACTOR = 3.0
+MIN_SLOW_SECONDS = 0.5
+# Weight of the newest sample in the smoothed time to first byte
+LATENCY_SMOOTHING = 0.3
+# Longest Retry-After honoured; beyond this the host is retried anyway
+MAX_RETRY_AFTER_SECONDS = 600.0
+
+
+@dataclass
+class _Request:
+    session: requests.Session
+    url: str
+    kwargs: Dict[str, Any]
+    queued_at: float
+    future: Future = field(default_factory=Future)
+    attempts: int = 0
+
+
+class HostFrontier:
+    """Queued requests and rate/concurrency budget for one host."""
+
+    def __init__(self, host: str, policy: Any):
+        self.host = host
+        self.requests_per_second = 0.0
+        self.min_requests_per_second = 0.0
+        self.max_requests_per_second = 0.0
+        self.concurrency = max(1, int(getattr(policy, "concurrency", 1)))
+        self.queue: Deque[_Request] = deque()
+        self.in_flight = 0
+        self.next_slot = 0.0
+        self.dispatched = 0
+        self.latency: Optional[float] = None
+        self.fastest: Optional[float] = None
+        self.last_decrease = 0.0
+        self.tighten(policy)
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.requests_per_second if self.requests_per_second > 0 else 0.0
+
+    def tighten(self, policy: Any) -> None:
+        """Apply a session's policy; where policies differ the stricter bound wins."""
+        start = float(getattr(policy, "requests_per_second", 0.0))
+        if start <= 0:
+            low = high = 0.0
+        elif getattr(policy, "adaptive", False):
+            low = float(policy.min_requests_per_second)
+            high = float(policy.rate_ceiling)
+        else:
+            low = high = start
+        if high > 0 and (self.max_requests_per_second <= 0 or high < self.max_requests_per_second):
+            self.max_requests_per_second = high
+            self.min_requests_per_second = min(self.min_requests_per_second or low, high)
+            self.requests_per_second = min(self.requests_per_second or start, high)
+        self.concurrency = max(1, min(self.concurrency, int(getattr(policy, "concurrency", 1))))
+
+    def observe(self, status: int, latency: float, dispatched_at: float, now: float) -> None:
+        """Adjust the rate after a response to a request dispatched at dispatched_at."""
+        if self.min_requests_per_second >= self.max_requests_per_second:
+            return
+        if latency > 0:
+            self.fastest = latency if self.fastest is None else min(self.fastest, latency)
+            self.latency = (
+                latency if self.latency is None else LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self.latency
+            )
+        slow = (
+            self.latency is not None
+            and self.fastest is not None
+            and self.latency > max(MIN_SLOW_SECONDS, LATENCY_FACTOR * self.fastest)
+        )
+        if status in THROTTLE_STATUSES or slow:
+            if dispatched_at >= self.last_decrease:
+                self.requests_per_second = max(self.min_requests_per_second, self.requests_per_second * RATE_DECREASE)
+                self.last_decrease = now
+        elif status < 400:
+            self.requests_per_second = min(self.max_requests_per_second, self.requests_per_second + RATE_INCREASE)
+
+    def ready_at(self) -> Optional[float]:
+        """When the next queued request may go out, or None if none can."""
+        if not self.queue or self.in_flight >= self.concurrency:
+            return None
+        return self.next_slot
+
+
+class CrawlScheduler:
+    """Dispatches queued GETs across hosts, each within its own rate and concurrency."""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS):
+        self.frontiers: Dict[str, HostFrontier] = {}
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl")
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def submit(self, session: requests.Session, url: str, **kwargs: Any) -> "Future[Response]":
+        """Queue a GET of url through session; the future resolves to the response."""
+        policy = getattr(session, "fetch_policy", None)
+        host = urlparse(url).hostname or ""
+        request = _Request(session, url, kwargs, time.monotonic())
+        with self._condition:
+            frontier = self.frontiers.get(host)
+            if frontier is None:
+                frontier = self.frontiers[host] = HostFrontier(host, policy)
+            else:
+                frontier.tighten(policy)
+            frontier.queue.append(request)
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="crawl-dispatcher", daemon=True)
+                self._dispatcher.start()
+            self._condition.notify()
+        return request.future
+
+    def fetch(self, session: requests.Session, url: str, **kwargs: Any) -> Response:
+        """GET url once its host has budget; raises for HTTP errors."""
+        response = self.submit(session, url, **kwargs).result()
+        response.raise_for_status()
+        return response
+
+    def _dispatch_loop(self) -> None:
+        with self._condition:
+            while True:
+                eligible = [(frontier.ready_at(), frontier) for frontier in self.frontiers.values()]
+                eligible = [(ready_at, frontier) for ready_at, frontier in eligible if ready_at is not None]
+                if not eligible:
+                    self._condition.wait()
+                    continue
+                ready_at, frontier = min(eligible, key=lambda item: (item[0], item[1].queue[0].queued_at))
+                now = time.monotonic()
+                if ready_at > now:
+                    self._condition.wait(ready_at - now)
+                    continue
+                request = frontier.queue.popleft()
+                frontier.in_flight += 1
+                frontier.dispatched += 1
+                frontier.next_slot = now + frontier.interval
+                self._executor.submit(self._send, frontier, request, now)
+
+    def _send(self, frontier: HostFrontier, request: _Request, dispatched_at: float) -> None:
+        session = request.session
+        policy = getattr(session, "fetch_policy", None)
+        metrics = getattr(session, "http_metrics", None)
+        if metrics is not None and dispatched_at > request.queued_at:
+            # After a 429/503 the wait is the host's Retry-After, so it counts as retry backoff
+            metrics.record_sleep(frontier.host, dispatched_at - request.queued_at, retry=request.attempts > 0)
+        response: Optional[Response] = None
+        try:
+            if request.attempts or request.future.set_running_or_notify_cancel():
+                request.kwargs.setdefault("timeout", getattr(policy, "timeout_seconds", None))
+                response = session.get(request.url, **request.kwargs)
+        except BaseException as exc:
+            request.future.set_exception(exc)
+        retry = False
+        with self._condition:
+            frontier.in_flight -= 1
+            if response is not None:
+                now = time.monotonic()
+                frontier.observe(response.status_code, response.elapsed.total_seconds(), dispatched_at, now)
+                if response.status_code in THROTTLE_STATUSES:
+                    wait = retry_after_seconds(response)
+                    frontier.next_slot = max(frontier.next_slot, now + (frontier.interval if wait is None else wait))
+                    if request.attempts < int(getattr(policy, "max_retries", 0)):
+                        retry = True
+                        request.attempts += 1
+                        request.queued_at = now
+                        frontier.queue.appendleft(request)
+            rate = frontier.requests_per_second
+            self._condition.notify()
+        if response is None:
+            return
+        if metrics is not None and rate > 0:
+            metrics.record_rate(frontier.host, rate)
+        if retry:
+            if metrics is not None:
+                metrics.record_retry(frontier.host, str(response.status_code))
+            response.close()
+        else:
+            request.future.set_result(response)
+
+
+def retry_after_seconds(response: Response) -> Optional[float]:
+    """The response's Retry-After (seconds or HTTP date) as a delay, capped; None if absent or invalid."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(0.0, seconds), MAX_RETRY_AFTER_SECONDS)
+
+
+_default_scheduler: Optional[CrawlScheduler] = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler() -> CrawlScheduler:
+    """The scheduler shared by every fetch path in this process."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = CrawlScheduler()
+        return _default_scheduler
@@ -0,0 +1,328 @@
+"""
+Diff two data-v2 releases into per-collection JSON patches.
+
+A data refresh rewrites whole JSON files, so without a diff every client
+and cache has to refetch the full tree. This compares two releases and
+writes what actually changed:
+
+    <output-dir>/release-manifest.json      release ids, per-collection summary
+    <output-dir>/patches/<collection>.json  thinkers added/removed, metadata
+                                            field changes, works added/removed/
+                                            changed per thinker and subject, and
+                                            changed file hashes
+
+Each side is either a data-v2 tree or a content-hash snapshot written by the
+`snapshot` command. Snapshots hold hashes only, so patches computed against a
+snapshot carry work keys and hashes where a tree diff carries the values; the
+new side should normally be a tree. Works are keyed by URL (title if a work
+has no URL), so a retitled work shows up as changed rather than removed and
+re-added.
+
+Usage:
+    python scripts/python/util/diff_data_releases.py snapshot \
+        --data-dir public/data-v2 --output-file data/releases/snapshot.json
+    python scripts/python/util/diff_data_releases.py diff \
+        --old data/releases/snapshot.json --new public/data-v2 \
+        --output-dir data/releases/next
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.profiling import run_profiled  # noqa: E402
+from util.works_pages import iter_subject_works  # noqa: E402
+
+
+SNAPSHOT_VERSION = 1
+HASH_LENGTH = 16
+
+
+def content_hash(value) -> str:
+    encoded = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:HASH_LENGTH]
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:HASH_LENGTH]
+
+
+def work_key(work: Dict[str, object]) -> str:
+    return str(work.get("url") or work.get("title") or "")
+
+
+def keyed_works(works: List[Dict[str, object]]) -> Dict[str, Dict[str, object]]:
+    """Map works by key, suffixing repeats so duplicate URLs within a subject are kept apart."""
+    keyed: Dict[str, Dict[str, object]] = {}
+    for work in works:
+        key = base = work_key(work)
+        repeat = 1
+        while key in keyed:
+            repeat += 1
+            key = f"{base} [{repeat}]"
+        keyed[key] = work
+    return keyed
+
+
+class Release:
+    """One side of a diff: hashes always, values only when loaded from a tree."""
+
+    def __init__(self, snapshot: Dict[str, object], values: Optional[Dict[str, object]] = None):
+        self.snapshot = snapshot
+        self.values = values or {}
+
+    @property
+    def release_id(self) -> str:
+        return self.snapshot["release"]
+
+    def collections(self) -> Dict[str, Dict[str, object]]:
+        return self.snapshot["collections"]
+
+
+def load_tree(data_dir: Path) -> Release:
+    index = json.loads((data_dir / "index.json").read_text(encoding="utf-8"))
+    collections: Dict[str, object] = {}
+    values: Dict[str, object] = {}
+
+    for category in index["categories"]:
+        collection = category["path"]
+        collection_dir = data_dir / collection
+        metadata_file = collection_dir / "metadata.json"
+        metadata = json.loads(metadata_file.read_text(encoding="utf-8")) if metadata_file.exists() else []
+
+        metadata_hashes: Dict[str, Dict[str, str]] = {}
+        metadata_values: Dict[str, Dict[str, object]] = {}
+        for entry in metadata:
+            if not entry.get("n"):
+                continue
+            metadata_hashes[entry["n"]] = {field: content_hash(value) for field, value in entry.items()}
+            metadata_values[entry["n"]] = entry
+
+        works_hashes: Dict[str, Dict[str, Dict[str, str]]] = {}
+        works_values: Dict[str, Dict[str, Dict[str, object]]] = {}
+        files: Dict[str, str] = {}
+        if collection_dir.is_dir():
+            for path in sorted(collection_dir.rglob("*.json")):
+                files[path.relative_to(data_dir).as_posix()] = file_hash(path)
+            for thinker_dir in sorted(path for path in collection_dir.iterdir() if path.is_dir()):
+                for subject, works in iter_subject_works(thinker_dir):
+                    keyed = keyed_works(works)
+                    works_hashes.setdefault(thinker_dir.name, {})[subject] = {
+                        key: content_hash(work) for key, work in keyed.items()
+                    }
+                    works_values.setdefault(thinker_dir.name, {})[subject] = keyed
+
+        collections[collection] = {"metadata": metadata_hashes, "works": works_hashes, "files": files}
+        values[collection] = {"metadata": metadata_values, "works": works_values}
+
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "release": content_hash(collections),
+        "generatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "index": file_hash(data_dir / "index.json"),
+        "collections": collections,
+    }
+    return Release(snapshot, values)
+
+
+def load_release(path: Path) -> Release:
+    if path.is_dir():
+        return load_tree(path)
+    snapshot = json.loads(path.read_text(encoding="utf-8"))
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version in {path}: {snapshot.get('version')}")
+    return Release(snapshot)
+
+
+def diff_metadata(old: Release, new: Release, collection: str) -> Dict[str, object]:
+    old_hashes = old.collections().get(collection, {}).get("metadata", {})
+    new_hashes = new.collections().get(collection, {}).get("metadata", {})
+    new_values = new.values.get(collection, {}).get("metadata", {})
+
+    changes: Dict[str, Dict[str, object]] = {}
+    for thinker in sorted(set(old_hashes) & set(new_hashes)):
+        before, after = old_hashes[thinker], new_hashes[thinker]
+        fields: Dict[str, object] = {}
+        for field in sorted(set(before) | set(after)):
+            if field not in after:
+                fields[field] = {"op": "remove"}
+            elif before.get(field) != after[field]:
+                change = {"op": "set", "hash": after[field]}
+                if thinker in new_values:
+                    change["value"] = new_values[thinker][field]
+                fields[field] = change
+        if fields:
+            changes[thinker] = fields
+
+    added = sorted(set(new_hashes) - set(old_hashes))
+    return {
+        "thinkersAdded": [new_values.get(name, {"n": name}) for name in added],
+        "thinkersRemoved": sorted(set(old_hashes) - set(new_hashes)),
+        "metadata": changes,
+    }
+
+
+def diff_works(old: Release, new: Release, collection: str) -> Dict[str, Dict[str, Dict[str, list]]]:
+    old_works = old.collections().get(collection, {}).get("works", {})
+    new_works = new.collections().get(collection, {}).get("works", {})
+    new_values = new.values.get(collection, {}).get("works", {})
+
+    changes: Dict[str, Dict[str, Dict[str, list]]] = {}
+    for thinker in sorted(set(old_works) | set(new_works)):
+        old_subjects = old_works.get(thinker, {})
+        new_subjects = new_works.get(thinker, {})
+        for subject in sorted(set(old_subjects) | set(new_subjects)):
+            before = old_subjects.get(subject, {})
+            after = new_subjects.get(subject, {})
+            values = new_values.get(thinker, {}).get(subject, {})
+
+            def resolve(key: str):
+                return values.get(key, key)
+
+            added = [resolve(key) for key in after if key not in before]
+            removed = [key for key in before if key not in after]
+            changed = [resolve(key) for key in after if key in before and before[key] != after[key]]
+            if added or removed or changed:
+                subject_changes = {}
+                if added:
+                    subject_changes["added"] = added
+                if removed:
+                    subject_changes["removed"] = removed
+                if changed:
+                    subject_changes["changed"] = changed
+                changes.setdefault(thinker, {})[subject] = subject_changes
+    return changes
+
+
+def diff_files(old: Release, new: Release, collection: str) -> Dict[str, Dict[str, str]]:
+    old_files = old.collections().get(collection, {}).get("files", {})
+    new_files = new.collections().get(collection, {}).get("files", {})
+    changes: Dict[str, Dict[str, str]] = {}
+    for path in sorted(set(old_files) | set(new_files)):
+        if path not in new_files:
+            changes[path] = {"op": "remove"}
+        elif path not in old_files:
+            changes[path] = {"op": "add", "hash": new_files[path]}
+        elif old_files[path] != new_files[path]:
+            changes[path] = {"op": "change", "hash": new_files[path]}
+    return changes
+
+
+def count_works(works_changes: Dict[str, Dict[str, Dict[str, list]]], kind: str) -> int:
+    return sum(len(subject.get(kind, [])) for subjects in works_changes.values() for subject in subjects.values())
+
+
+def write_json(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def diff_releases(old: Release, new: Release, output_dir: Path) -> Dict[str, object]:
+    old_collections = set(old.collections())
+    new_collections = set(new.collections())
+    summary: Dict[str, object] = {}
+
+    for collection in sorted(old_collections | new_collections):
+        metadata = diff_metadata(old, new, collection)
+        works = diff_works(old, new, collection)
+        files = diff_files(old, new, collection)
+        if not (metadata["thinkersAdded"] or metadata["thinkersRemoved"] or metadata["metadata"] or works or files):
+            continue
+
+        status = "added" if collection not in old_collections else "removed" if collection not in new_collections else "changed"
+        patch_path = f"patches/{collection}.json"
+        write_json(
+            output_dir / patch_path,
+            {
+                "collection": collection,
+                "status": status,
+                "from": old.release_id,
+                "to": new.release_id,
+                **metadata,
+                "works": works,
+                "files": files,
+            },
+        )
+        summary[collection] = {
+            "status": status,
+            "patch": patch_path,
+            "thinkersAdded": len(metadata["thinkersAdded"]),
+            "thinkersRemoved": len(metadata["thinkersRemoved"]),
+            "metadataChanges": len(metadata["metadata"]),
+            "worksAdded": count_works(works, "added"),
+            "worksRemoved": count_works(works, "removed"),
+            "worksChanged": count_works(works, "changed"),
+            "filesChanged": len(files),
+        }
+
+    totals = {
+        key: sum(entry[key] for entry in summary.values())
+        for key in ("thinkersAdded", "thinkersRemoved", "metadataChanges", "worksAdded", "worksRemoved", "worksChanged", "filesChanged")
+    }
+    manifest = {
+        "from": old.release_id,
+        "to": new.release_id,
+        "generatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "indexChanged": old.snapshot.get("index") != new.snapshot.get("index"),
+        "totals": totals,
+        "collections": summary,
+    }
+    write_json(output_dir / "release-manifest.json", manifest)
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Snapshot data-v2 releases and diff them into patches.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="Write a content-hash snapshot of a data-v2 tree.")
+    snapshot_parser.add_argument("--data-dir", type=Path, default=Path("public/data-v2"), help="Root of the data-v2 tree.")
+    snapshot_parser.add_argument("--output-file", type=Path, required=True, help="Destination snapshot JSON.")
+
+    diff_parser = subparsers.add_parser("diff", help="Diff two releases (trees or snapshots).")
+    diff_parser.add_argument("--old", type=Path, required=True, help="Previous release: data-v2 tree or snapshot JSON.")
+    diff_parser.add_argument("--new", type=Path, required=True, help="New release: data-v2 tree or snapshot JSON.")
+    diff_parser.add_argument("--output-dir", type=Path, required=True, help="Where to write patches and the release manifest.")
+    diff_parser.add_argument(
+        "--snapshot-file",
+        type=Path,
+        help="Also write the new release's snapshot here, to diff the next release against.",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        if not args.data_dir.exists():
+            raise FileNotFoundError(f"Data directory not found: {args.data_dir}")
+        release = load_tree(args.data_dir)
+        write_json(args.output_file, release.snapshot)
+        print(f"Wrote snapshot {release.release_id} of {args.data_dir} to {args.output_file}")
+        return
+
+    for path in (args.old, args.new):
+        if not path.exists():
+            raise FileNotFoundError(f"Release not found: {path}")
+    old = load_release(args.old)
+    new = load_release(args.new)
+    manifest = diff_releases(old, new, args.output_dir)
+    if args.snapshot_file:
+        write_json(args.snapshot_file, new.snapshot)
+
+    totals = manifest["totals"]
+    print(
+        f"{old.release_id} -> {new.release_id}: {len(manifest['collections'])} collections changed, "
+        f"{totals['worksAdded']} works added, {totals['worksRemoved']} removed, {totals['worksChanged']} changed, "
+        f"{totals['metadataChanges']} thinkers with metadata changes"
+    )
+    print(f"Patches and release manifest written to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    run_profiled(main)
@@ -14,10 +14,14 @@ from __future__ import annotations
 import argparse
 import json
 import re
-import unicodedata
+import sys
 from pathlib import Path
 from typing import Dict, List
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.names import slugify  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+
 
 SECTION_HEADING = "## Thinkers with 0 works"
 CATEGORY_PREFIX = "### "
@@ -29,15 +33,6 @@ def normalize_collection_name(collection: str) -> str:
     return re.sub(r"\s+\(\d+\)\s*$", "", collection).strip()
 
 
-def slugify_name(name: str) -> str:
-    """Create a lightweight slug used for logging and checklisting."""
-    normalized = unicodedata.normalize("NFKD", name)
-    ascii_name = normalized.encode("ascii", "ignore").decode("ascii")
-    cleaned = re.sub(r"[’'`]", "", ascii_name)
-    cleaned = re.sub(r"[^a-zA-Z0-9]+", "-", cleaned).strip("-")
-    return cleaned.lower()
-
-
 def is_valid_thinker_name(name: str) -> bool:
     normalized = normalize_collection_name(name).lower()
     if normalized in EXCLUDED_THINKER_NAMES:
@@ -94,7 +89,7 @@ def build_output_structure(collection_map: Dict[str, List[str]]) -> List[Dict[st
                 {
                     "collection": collection,
                     "thinker": thinker,
-                    "slug": slugify_name(thinker),
+                    "slug": slugify(thinker),
                 }
             )
     return records
@@ -127,4 +122,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
@@ -13,10 +13,14 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.profiling import run_profiled  # noqa: E402
+
 
 WORK_AUDIT_HEADER = """# Work Coverage Audit
 
@@ -133,6 +137,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
 
 
@@ -0,0 +1,386 @@
+"""
+Per-host HTTP instrumentation for the scrapers' requests sessions.
+
+instrument_session() attaches an HttpMetrics collector to a session after
+its retrying adapters are mounted. From then on every request records, per
+host:
+
+- request count, transport errors and bytes received (on the wire, before
+  decompression)
+- latency histograms: dns and connect (once per new connection; connect
+  includes the TLS handshake), ttfb (until response headers) and total
+  (including the body)
+- status counts, including 429/5xx responses that urllib3's Retry consumed
+  before requests ever saw them
+- retries triggered by the Retry adapter, by status or error, and the time
+  Retry spent backing off
+- time requests spent queued in the crawl scheduler (util/crawl_scheduler.py)
+  waiting for the host's rate budget or Retry-After, via record_sleep()
+- the request rate the crawl scheduler allows the host, with the lowest and
+  highest it reached, via record_rate()
+
+At the end of a run, finish_run() writes the JSON report and prints a
+one-line-per-host summary:
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(max_retries=retry))
+    metrics = instrument_session(session, "map_anarchist_library")
+    ...
+    response = default_scheduler().fetch(session, url)
+    ...
+    finish_run(metrics, args.metrics_file)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+
+METRICS_VERSION = 1
+METRICS_DIR = Path("data/http-metrics")
+# Upper bounds in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+LATENCY_PHASES = ("dns", "connect", "ttfb", "total")
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        value = seconds * 1000
+        position = 0
+        while position < len(LATENCY_BUCKETS_MS) and value > LATENCY_BUCKETS_MS[position]:
+            position += 1
+        self.buckets[position] += 1
+        self.count += 1
+        self.total_ms += value
+        self.max_ms = max(self.max_ms, value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction, capped at the observed max."""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for position, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                bound = LATENCY_BUCKETS_MS[position] if position < len(LATENCY_BUCKETS_MS) else self.max_ms
+                return round(min(float(bound), self.max_ms), 1)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "meanMs": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50Ms": self.percentile(0.5),
+            "p95Ms": self.percentile(0.95),
+            "maxMs": round(self.max_ms, 1),
+            "bucketsMs": list(LATENCY_BUCKETS_MS),
+            "counts": list(self.buckets),
+        }
+
+
+class HostStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors: Counter = Counter()
+        self.bytes = 0
+        self.statuses: Counter = Counter()
+        self.retries: Counter = Counter()
+        self.retry_sleep = 0.0
+        self.throttle_sleep = 0.0
+        self.latency = {phase: LatencyHistogram() for phase in LATENCY_PHASES}
+        self.rate: Optional[float] = None
+        self.rate_min: Optional[float] = None
+        self.rate_max: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "bytes": self.bytes,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "notModified": self.statuses[304],
+            "tooManyRequests": self.statuses[429],
+            "serverErrors": sum(count for status, count in self.statuses.items() if status >= 500),
+            "retries": dict(self.retries),
+            "retrySleepSeconds": round(self.retry_sleep, 3),
+            "throttleSleepSeconds": round(self.throttle_sleep, 3),
+            "requestRate": None
+            if self.rate is None
+            else {"current": round(self.rate, 3), "min": round(self.rate_min, 3), "max": round(self.rate_max, 3)},
+            "latency": {phase: histogram.to_dict() for phase, histogram in self.latency.items()},
+        }
+
+
+class HttpMetrics:
+    """Thread-safe per-host counters for one run."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.hosts: Dict[str, HostStats] = {}
+
+    def _host(self, host: str) -> HostStats:
+        stats = self.hosts.get(host)
+        if stats is None:
+            stats = self.hosts[host] = HostStats()
+        return stats
+
+    def record_response(self, host: str, status: int, ttfb: float, total: float, size: int) -> None:
+        with self._lock:
+            stats = self._host(host)
+            stats.requests += 1
+            stats.statuses[status] += 1
+            stats.bytes += size
+            stats.latency["ttfb"].observe(ttfb)
+            stats.latency["total"].observe(total)
+
+    def record_error(self, host: str, error: BaseException, total: float) -> None:
+        with self._lock:
+            stats = self._host(host)
+            stats.requests += 1
+            stats.errors[type(error).__name__] += 1
+            stats.latency["total"].observe(total)
+
+    def record_connection(self, host: str, dns: float, connect: float) -> None:
+        with self._lock:
+            stats = self._host(host)
+            stats.latency["dns"].observe(dns)
+            stats.latency["connect"].observe(connect)
+
+    def record_retry(self, host: str, reason: str, status: Optional[int] = None) -> None:
+        with self._lock:
+            stats = self._host(host)
+            stats.retries[reason] += 1
+            if status is not None:
+                stats.statuses[status] += 1
+
+    def record_sleep(self, host: str, seconds: float, retry: bool = False) -> None:
+        with self._lock:
+            stats = self._host(host)
+            if retry:
+                stats.retry_sleep += seconds
+            else:
+                stats.throttle_sleep += seconds
+
+    def record_rate(self, host: str, requests_per_second: float) -> None:
+        with self._lock:
+            stats = self._host(host)
+            stats.rate = requests_per_second
+            stats.rate_min = requests_per_second if stats.rate_min is None else min(stats.rate_min, requests_per_second)
+            stats.rate_max = requests_per_second if stats.rate_max is None else max(stats.rate_max, requests_per_second)
+
+    def report(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "version": METRICS_VERSION,
+                "run": self.name,
+                "startedAt": self.started_at.isoformat(timespec="seconds"),
+                "elapsedSeconds": round(time.perf_counter() - self._started, 3),
+                "hosts": {host: stats.to_dict() for host, stats in sorted(self.hosts.items())},
+            }
+
+    def summary(self) -> str:
+        report = self.report()
+        lines = [f"HTTP metrics for {self.name} ({report['elapsedSeconds']:.1f}s):"]
+        if not report["hosts"]:
+            lines.append("  no requests")
+        for host, stats in report["hosts"].items():
+            total = stats["latency"]["total"]
+            ttfb = stats["latency"]["ttfb"]
+            lines.append(
+                f"  {host}: {stats['requests']} requests, {sum(stats['errors'].values())} errors, "
+                f"{stats['bytes'] / 1024:.0f} KiB, total p50/p95 {_ms(total['p50Ms'])}/{_ms(total['p95Ms'])}, "
+                f"ttfb p50 {_ms(ttfb['p50Ms'])}, 304/429/5xx {stats['notModified']}/{stats['tooManyRequests']}/"
+                f"{stats['serverErrors']}, {sum(stats['retries'].values())} retries "
+                f"({stats['retrySleepSeconds']:.1f}s backoff), throttled {stats['throttleSleepSeconds']:.1f}s"
+                + _rate(stats["requestRate"])
+            )
+        return "\n".join(lines)
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2) + "\n", encoding="utf-8")
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.0f}ms"
+
+
+def _rate(rate: Optional[Dict[str, float]]) -> str:
+    if rate is None:
+        return ""
+    return f", rate {rate['current']:.2f} req/s ({rate['min']:.2f}-{rate['max']:.2f})"
+
+
+# DNS time is measured by timing getaddrinfo on the connecting thread; urllib3
+# resolves through socket.getaddrinfo inside connect(), so the wrapper below
+# sees exactly the lookups made for a new connection.
+_dns_timing = threading.local()
+_original_getaddrinfo = socket.getaddrinfo
+
+
+def _timed_getaddrinfo(*args, **kwargs):
+    started = time.perf_counter()
+    try:
+        return _original_getaddrinfo(*args, **kwargs)
+    finally:
+        _dns_timing.seconds = getattr(_dns_timing, "seconds", 0.0) + time.perf_counter() - started
+
+
+def _timed_connection_class(base, metrics: HttpMetrics):
+    class TimedConnection(base):
+        def connect(self):
+            _dns_timing.seconds = 0.0
+            started = time.perf_counter()
+            super().connect()
+            elapsed = time.perf_counter() - started
+            dns = getattr(_dns_timing, "seconds", 0.0)
+            metrics.record_connection(self.host, dns, max(0.0, elapsed - dns))
+
+    # Keep urllib3's class names so error messages read as before
+    TimedConnection.__name__ = TimedConnection.__qualname__ = base.__name__
+    return TimedConnection
+
+
+def _timed_pool_classes(metrics: HttpMetrics) -> Dict[str, type]:
+    classes = {}
+    for scheme, pool_class in (("http", HTTPConnectionPool), ("https", HTTPSConnectionPool)):
+        classes[scheme] = type(
+            pool_class.__name__,
+            (pool_class,),
+            {"ConnectionCls": _timed_connection_class(pool_class.ConnectionCls, metrics)},
+        )
+    return classes
+
+
+class CountingRetry(Retry):
+    """Retry that reports each retry, and its backoff, to an HttpMetrics."""
+
+    metrics: Optional[HttpMetrics] = None
+
+    @classmethod
+    def from_retry(cls, retry: Retry, metrics: HttpMetrics) -> "CountingRetry":
+        counting = cls.__new__(cls)
+        counting.__dict__.update(vars(retry))
+        counting.metrics = metrics
+        return counting
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.metrics = self.metrics
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        host = _pool.host if _pool is not None else urlparse(url or "").hostname or ""
+        if self.metrics is not None:
+            if response is not None and response.status:
+                self.metrics.record_retry(host, str(response.status), response.status)
+            else:
+                self.metrics.record_retry(host, type(error).__name__ if error else "unknown")
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        # urllib3 calls sleep() on the returned object, so that is where the host is needed
+        retry.host = host
+        return retry
+
+    def sleep(self, response=None):
+        started = time.perf_counter()
+        super().sleep(response)
+        if self.metrics is not None:
+            self.metrics.record_sleep(getattr(self, "host", ""), time.perf_counter() - started, retry=True)
+
+
+def _response_size(response: requests.Response) -> int:
+    raw = response.raw
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            return raw.tell()
+        except (OSError, ValueError):
+            pass
+    return len(response.content) if response._content_consumed else 0
+
+
+def instrument_session(session: requests.Session, name: str, metrics: Optional[HttpMetrics] = None) -> HttpMetrics:
+    """Record per-host metrics for every request made through session.
+
+    Call after mounting the session's adapters; their Retry configuration
+    is kept and wrapped. Returns the collector, also stored on the session
+    as ``session.http_metrics`` so helpers only need the session.
+    """
+    metrics = metrics or HttpMetrics(name)
+    if socket.getaddrinfo is not _timed_getaddrinfo:
+        socket.getaddrinfo = _timed_getaddrinfo
+
+    for adapter in session.adapters.values():
+        if not isinstance(adapter, HTTPAdapter):
+            continue
+        adapter.max_retries = CountingRetry.from_retry(adapter.max_retries, metrics)
+        adapter.poolmanager.pool_classes_by_scheme = _timed_pool_classes(metrics)
+
+    send = session.send
+
+    def timed_send(request, **kwargs):
+        host = urlparse(request.url).hostname or ""
+        started = time.perf_counter()
+        try:
+            response = send(request, **kwargs)
+        except requests.RequestException as error:
+            metrics.record_error(host, error, time.perf_counter() - started)
+            raise
+        total = time.perf_counter() - started
+        if response.history:
+            # Later hops went through timed_send themselves; this call only
+            # owns the first (redirect) response
+            first = response.history[0]
+            first_seconds = first.elapsed.total_seconds()
+            metrics.record_response(host, first.status_code, first_seconds, first_seconds, _response_size(first))
+        else:
+            metrics.record_response(
+                host, response.status_code, response.elapsed.total_seconds(), total, _response_size(response)
+            )
+        return response
+
+    session.send = timed_send
+    session.http_metrics = metrics
+    return metrics
+
+
+def add_metrics_argument(parser: argparse.ArgumentParser, name: str) -> None:
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=METRICS_DIR / f"{name}.json",
+        help="Where to write the HTTP metrics report for this run.",
+    )
+
+
+def finish_run(metrics: HttpMetrics, path: Optional[Path]) -> None:
+    """Write the JSON report (if path is set) and print the human summary."""
+    if path is not None:
+        metrics.write(path)
+    print(metrics.summary())
+    if path is not None:
+        print(f"HTTP metrics written to {path}")
+
@@ -0,0 +1,215 @@
+"""
+On-disk cache for the parsed author indexes the source mappers match against.
+
+Each mapper fetches one listing page (the MIA archive index, the redtexts
+front page, the Anarchist Library author list, the Goldman Archive index)
+and parses it into a lookup of canonical name key -> entries. The cache
+keeps that lookup in data/source-index-cache/<source_id>.json:
+
+    {
+      "version": 1,
+      "source_id": "mia",
+      "url": "https://www.marxists.org/archive/index.htm",
+      "fetched_at": 1760000000.0,
+      "fingerprint": {"sha256": "...", "etag": "...", "last_modified": "...", "keys": "..."},
+      "lookup": {...}
+    }
+
+SourceIndexCache.lookup() decides what to do with it:
+
+- younger than the TTL: use the lookup without touching the network
+- older: send a conditional GET (If-None-Match / If-Modified-Since); on
+  304, or when the body hashes to the same sha256, keep the lookup and
+  reset its age without parsing
+- otherwise parse the new body and store it
+
+fingerprint["keys"] records the lookup format version and the name alias
+digest (util/names.py); a cache written under different keys is ignored.
+Files are replaced atomically, so concurrent mapper processes can share a
+cache directory. If the fetch fails and a stale lookup exists, it is used
+with a warning.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.names import alias_digest  # noqa: E402
+
+
+INDEX_CACHE_VERSION = 1
+DEFAULT_INDEX_CACHE_DIR = Path("data/source-index-cache")
+DEFAULT_INDEX_TTL_HOURS = 24.0
+
+Lookup = Dict[str, object]
+
+
+def _identity(value):
+    return value
+
+
+class SourceIndexCache:
+    """Persisted parsed lookup for one source's author index page."""
+
+    def __init__(
+        self,
+        source_id: str,
+        url: str,
+        cache_dir: Path = DEFAULT_INDEX_CACHE_DIR,
+        ttl_seconds: float = DEFAULT_INDEX_TTL_HOURS * 3600,
+        refresh: bool = False,
+        lookup_version: int = 1,
+    ):
+        self.source_id = source_id
+        self.url = url
+        self.path = cache_dir / f"{source_id}.json"
+        self.ttl_seconds = ttl_seconds
+        self.refresh = refresh
+        self.keys = f"{lookup_version}:{alias_digest()}"
+        # How the last lookup() was satisfied: fresh, not_modified, unchanged, parsed or stale
+        self.outcome: Optional[str] = None
+
+    def read(self) -> Optional[Dict[str, object]]:
+        """The cached payload, or None if missing, unreadable or written for other keys/URL."""
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        fingerprint = payload.get("fingerprint") or {}
+        if (
+            payload.get("version") != INDEX_CACHE_VERSION
+            or payload.get("url") != self.url
+            or fingerprint.get("keys") != self.keys
+        ):
+            return None
+        return payload
+
+    def write(self, lookup: Lookup, fingerprint: Dict[str, Optional[str]]) -> None:
+        payload = {
+            "version": INDEX_CACHE_VERSION,
+            "source_id": self.source_id,
+            "url": self.url,
+            "fetched_at": time.time(),
+            "fingerprint": {**fingerprint, "keys": self.keys},
+            "lookup": lookup,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as temp_file:
+                json.dump(payload, temp_file, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_name, self.path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    def lookup(
+        self,
+        fetch: Callable[[Dict[str, str]], requests.Response],
+        parse: Callable[[requests.Response], Lookup],
+        encode: Callable[[Lookup], Lookup] = _identity,
+        decode: Callable[[Lookup], Lookup] = _identity,
+    ) -> Lookup:
+        """Return the parsed lookup, fetching with fetch(extra_headers) and parse() only when needed.
+
+        encode/decode convert the lookup to and from JSON-friendly values.
+        """
+        cached = None if self.refresh else self.read()
+        if cached is not None and time.time() - float(cached.get("fetched_at") or 0) < self.ttl_seconds:
+            self.outcome = "fresh"
+            return decode(cached["lookup"])
+
+        previous = (cached or {}).get("fingerprint") or {}
+        headers: Dict[str, str] = {}
+        if cached is not None and previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if cached is not None and previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+        try:
+            response = fetch(headers)
+        except requests.RequestException as exc:
+            if cached is None:
+                raise
+            age_hours = (time.time() - float(cached.get("fetched_at") or 0)) / 3600
+            print(
+                f"[WARN] {self.source_id}: fetching {self.url} failed ({exc}); using the cached index from {age_hours:.1f}h ago",
+                file=sys.stderr,
+            )
+            self.outcome = "stale"
+            return decode(cached["lookup"])
+
+        fingerprint = {
+            "sha256": previous.get("sha256"),
+            "etag": response.headers.get("ETag") or previous.get("etag"),
+            "last_modified": response.headers.get("Last-Modified") or previous.get("last_modified"),
+        }
+        if cached is not None and response.status_code == 304:
+            self.outcome = "not_modified"
+            self.write(cached["lookup"], fingerprint)
+            return decode(cached["lookup"])
+
+        fingerprint["sha256"] = hashlib.sha256(response.content).hexdigest()
+        if cached is not None and fingerprint["sha256"] == previous.get("sha256"):
+            self.outcome = "unchanged"
+            self.write(cached["lookup"], fingerprint)
+            return decode(cached["lookup"])
+
+        lookup = parse(response)
+        self.outcome = "parsed"
+        self.write(encode(lookup), fingerprint)
+        return lookup
+
+
+def add_index_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the --index-cache-* options shared by the mappers."""
+    parser.add_argument(
+        "--index-cache-dir",
+        type=Path,
+        default=DEFAULT_INDEX_CACHE_DIR,
+        help=f"Where parsed source indexes are cached between runs (default: {DEFAULT_INDEX_CACHE_DIR}).",
+    )
+    parser.add_argument(
+        "--index-ttl-hours",
+        type=float,
+        default=None,
+        help="Reuse a cached index without revalidating it for this long (default: the source's index_ttl_hours).",
+    )
+    parser.add_argument("--refresh-index", action="store_true", help="Ignore the cached index and re-parse.")
+    parser.add_argument("--no-index-cache", action="store_true", help="Neither read nor write the index cache.")
+
+
+def index_cache_from_args(
+    args: argparse.Namespace,
+    source_id: str,
+    url: str,
+    lookup_version: int = 1,
+    ttl_hours: float = DEFAULT_INDEX_TTL_HOURS,
+) -> Optional[SourceIndexCache]:
+    """The cache selected by add_index_cache_arguments options, or None with --no-index-cache.
+
+    ttl_hours (the source's configured TTL) applies unless --index-ttl-hours is given.
+    """
+    if args.no_index_cache:
+        return None
+    if args.index_ttl_hours is not None:
+        ttl_hours = args.index_ttl_hours
+    return SourceIndexCache(
+        source_id,
+        url,
+        cache_dir=args.index_cache_dir,
+        ttl_seconds=ttl_hours * 3600,
+        refresh=args.refresh_index,
+        lookup_version=lookup_version,
+    )
@@ -0,0 +1,133 @@
+"""
+Fuzzy author-name matching shared by the source mappers.
+
+The mappers look thinkers up by exact normalized name and last-name/
+last-first keys. Names that differ by a middle initial, a transliteration
+(Zinoviev/Zinovyev) or a particle miss those keys, so TrigramNameIndex
+falls back to character-trigram similarity:
+
+    index = TrigramNameIndex(lookup)          # the mapper's normalized keys
+    for key, score in index.search(normalize_name(thinker), threshold=0.8):
+        ...
+
+Each token is padded and cut into trigrams separately, so the score does
+not depend on word order ("zinoviev grigory" == "grigory zinoviev"). The
+score is the Dice coefficient of the two trigram sets. An inverted index
+from trigram to name positions means a query only scores names that share
+at least one trigram with it; with NumPy installed the shared-trigram
+counts and scores for that candidate set are computed as arrays.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+DEFAULT_FUZZY_THRESHOLD = 0.8
+DEFAULT_FUZZY_LIMIT = 3
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def name_trigrams(name: str) -> FrozenSet[str]:
+    """Character trigrams of each token of an already-normalized name, padded at both ends."""
+    grams = set()
+    for token in _TOKEN_PATTERN.findall(name.lower()):
+        padded = f"  {token} "
+        grams.update(padded[position:position + 3] for position in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def name_similarity(left: str, right: str) -> float:
+    """Dice coefficient of the trigram sets of two normalized names (1.0 for the same tokens)."""
+    left_grams, right_grams = name_trigrams(left), name_trigrams(right)
+    if not left_grams or not right_grams:
+        return 0.0
+    return 2 * len(left_grams & right_grams) / (len(left_grams) + len(right_grams))
+
+
+class TrigramNameIndex:
+    """Inverted trigram index over normalized names for thresholded similarity search."""
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(dict.fromkeys(names))
+        postings: Dict[str, List[int]] = defaultdict(list)
+        sizes: List[int] = []
+        for position, name in enumerate(self.names):
+            grams = name_trigrams(name)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings[gram].append(position)
+
+        if np is not None:
+            self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+            self._sizes = np.asarray(sizes, dtype=np.float64)
+        else:
+            self._postings = dict(postings)
+            self._sizes = sizes
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(
+        self,
+        name: str,
+        threshold: float = DEFAULT_FUZZY_THRESHOLD,
+        limit: Optional[int] = DEFAULT_FUZZY_LIMIT,
+    ) -> List[Tuple[str, float]]:
+        """Indexed names scoring at least threshold against name, best first, as (name, score)."""
+        query = name_trigrams(name)
+        postings = [self._postings[gram] for gram in query if gram in self._postings]
+        if not postings:
+            return []
+
+        if np is not None:
+            candidates, shared = np.unique(np.concatenate(postings), return_counts=True)
+            scores = 2.0 * shared / (len(query) + self._sizes[candidates])
+            keep = scores >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+            order = np.lexsort((candidates, -scores))
+            ranked = [(int(candidates[position]), float(scores[position])) for position in order]
+        else:
+            shared_counts: Counter = Counter()
+            for ids in postings:
+                shared_counts.update(ids)
+            ranked = sorted(
+                (
+                    (candidate, 2.0 * shared / (len(query) + self._sizes[candidate]))
+                    for candidate, shared in shared_counts.items()
+                ),
+                key=lambda item: (-item[1], item[0]),
+            )
+            ranked = [item for item in ranked if item[1] >= threshold]
+
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(self.names[candidate], round(score, 3)) for candidate, score in ranked]
+
+
+def add_fuzzy_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --fuzzy-threshold and --no-fuzzy to a mapper's parser."""
+    parser.add_argument(
+        "--fuzzy-threshold",
+        type=float,
+        default=DEFAULT_FUZZY_THRESHOLD,
+        help=f"Minimum trigram similarity for fuzzy name matches (default: {DEFAULT_FUZZY_THRESHOLD}).",
+    )
+    parser.add_argument(
+        "--no-fuzzy",
+        action="store_true",
+        help="Only accept exact and last-name matches.",
+    )
+
+
+def fuzzy_threshold_from_args(args: argparse.Namespace) -> Optional[float]:
+    """The threshold chosen on the command line, or None with --no-fuzzy."""
+    return None if args.no_fuzzy else args.fuzzy_threshold
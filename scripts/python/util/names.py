@@ -0,0 +1,177 @@
+"""
+Thinker-name normalization shared by every pipeline stage.
+
+    normalize_name("Pierre-Joseph Proudhon")  -> "pierre joseph proudhon"
+    name_tokens("Luxemburg, Rosa")            -> ["luxemburg", "rosa"]
+    slugify("Pierre-Joseph Proudhon")         -> "pierre-joseph-proudhon"
+    canonical_key("V. I. Lenin")              -> "vladimir lenin"
+
+normalize_name folds accents to ASCII, drops apostrophes, lowercases and
+turns every other run of punctuation or whitespace into one space.
+slugify is the same string joined with hyphens (the slugs used for harvest
+file names and register keys). canonical_key also resolves known variants
+through the alias table in scripts/config/name-aliases.json, so two stages
+that meet the same thinker under different spellings join on the same key.
+
+The alias file maps each canonical name, spelled as in data-v2, to its
+variants:
+
+    {"aliases": {"Vladimir Lenin": ["V. I. Lenin", "Vladimir Ilyich Lenin"]}}
+
+Edit it by hand or with this module's CLI:
+
+    python scripts/python/util/names.py add "Lev Trotsky" "Leon Trotsky"
+    python scripts/python/util/names.py key "V. I. Lenin"
+    python scripts/python/util/names.py check
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.profiling import run_profiled  # noqa: E402
+
+
+DEFAULT_ALIAS_FILE = Path(__file__).resolve().parents[2] / "config" / "name-aliases.json"
+_APOSTROPHES = re.compile(r"[’'`]")
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+_alias_file = DEFAULT_ALIAS_FILE
+_aliases: Optional[Dict[str, str]] = None
+
+
+@lru_cache(maxsize=None)
+def normalize_name(name: str) -> str:
+    """ASCII-folded, lowercased name with punctuation collapsed to single spaces."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return _SEPARATORS.sub(" ", _APOSTROPHES.sub("", ascii_name).lower()).strip()
+
+
+def name_tokens(name: str) -> List[str]:
+    return normalize_name(name).split()
+
+
+def slugify(name: str) -> str:
+    return normalize_name(name).replace(" ", "-")
+
+
+def last_first(name: str) -> str:
+    """Normalized "last first middle" form, for indexes that list authors surname first."""
+    tokens = name_tokens(name)
+    if len(tokens) < 2:
+        return " ".join(tokens)
+    return f"{tokens[-1]} {' '.join(tokens[:-1])}"
+
+
+def read_alias_file(path: Path) -> Dict[str, List[str]]:
+    """Canonical name -> variants as stored in an alias file (empty if it does not exist)."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("aliases") or {}
+
+
+def load_aliases(path: Optional[Path] = None) -> Dict[str, str]:
+    """Use the alias file at path (default scripts/config/name-aliases.json) from now on.
+
+    Returns the normalized variant -> normalized canonical name table.
+    """
+    global _alias_file, _aliases
+    _alias_file = path or DEFAULT_ALIAS_FILE
+    table: Dict[str, str] = {}
+    for canonical, variants in read_alias_file(_alias_file).items():
+        target = normalize_name(canonical)
+        for variant in variants:
+            key = normalize_name(variant)
+            if key and key != target:
+                table[key] = target
+    _aliases = table
+    canonical_key.cache_clear()
+    return table
+
+
+@lru_cache(maxsize=None)
+def canonical_key(name: str) -> str:
+    """Normalized name with known variants mapped to their canonical spelling."""
+    if _aliases is None:
+        load_aliases(_alias_file)
+    key = normalize_name(name)
+    return _aliases.get(key, key)  # type: ignore[union-attr]
+
+
+def alias_digest() -> str:
+    """Short hash of the loaded alias table; keys cached under a different digest are stale."""
+    if _aliases is None:
+        load_aliases(_alias_file)
+    encoded = json.dumps(sorted(_aliases.items()), separators=(",", ":"))  # type: ignore[union-attr]
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def add_alias(variant: str, canonical: str, path: Optional[Path] = None) -> None:
+    """Record variant as a spelling of canonical in the alias file and reload it."""
+    path = path or _alias_file
+    aliases = read_alias_file(path)
+    target = next((name for name in aliases if normalize_name(name) == normalize_name(canonical)), canonical)
+    variants = aliases.setdefault(target, [])
+    if normalize_name(variant) not in {normalize_name(existing) for existing in variants}:
+        variants.append(variant)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"aliases": aliases}, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    load_aliases(path)
+
+
+def alias_conflicts(path: Optional[Path] = None) -> List[str]:
+    """Variants listed under more than one canonical name, or that are themselves canonical."""
+    aliases = read_alias_file(path or _alias_file)
+    canonical = {normalize_name(name) for name in aliases}
+    owners: Dict[str, List[str]] = {}
+    for name, variants in aliases.items():
+        for variant in variants:
+            owners.setdefault(normalize_name(variant), []).append(name)
+    problems = []
+    for variant, names in sorted(owners.items()):
+        if len(set(names)) > 1:
+            problems.append(f"{variant!r} is listed under {', '.join(sorted(set(names)))}")
+        if variant in canonical:
+            problems.append(f"{variant!r} is both a variant and a canonical name")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and edit the thinker name alias table.")
+    parser.add_argument("--alias-file", type=Path, default=DEFAULT_ALIAS_FILE, help="Alias table JSON.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    key_parser = subparsers.add_parser("key", help="Print the canonical key (and slug) for names.")
+    key_parser.add_argument("names", nargs="+")
+    add_parser = subparsers.add_parser("add", help="Record VARIANT as a spelling of CANONICAL.")
+    add_parser.add_argument("variant")
+    add_parser.add_argument("canonical")
+    subparsers.add_parser("check", help="Report variants claimed by more than one canonical name.")
+    args = parser.parse_args()
+
+    load_aliases(args.alias_file)
+    if args.command == "key":
+        for name in args.names:
+            print(f"{name}\t{canonical_key(name)}\t{slugify(name)}")
+    elif args.command == "add":
+        add_alias(args.variant, args.canonical, args.alias_file)
+        print(f"{args.variant!r} -> {canonical_key(args.variant)!r} in {args.alias_file}")
+    else:
+        problems = alias_conflicts(args.alias_file)
+        for problem in problems:
+            print(f"[ERROR] {problem}")
+        print(f"{len(read_alias_file(args.alias_file))} canonical names, {len(problems)} problem(s)")
+        if problems:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run_profiled(main)
@@ -0,0 +1,254 @@
+"""
+Opt-in profiling for any script's main().
+
+Scripts end with ``run_profiled(main)`` instead of ``main()``. That strips
+two options from the command line before main() parses it:
+
+    --profile cpu|mem     run main() under cProfile or tracemalloc
+    --profile-out PREFIX  where to write reports (default data/profiles/<script>)
+
+With ``--profile cpu`` the run writes PREFIX.pstats (load it with
+``python -m pstats``) and PREFIX-cpu.txt: the top functions by cumulative
+time plus a breakdown of wall time into network (requests/urllib3/socket/
+ssl), parse (BeautifulSoup/html.parser/lxml), json and sleep, counted at the
+point each category is entered from outside it. Threads started while
+main() runs (ThreadPoolExecutor workers, the crawl scheduler) get their
+own profiler via threading.setprofile and are merged into the same
+report; the report says how many threads it covers. Only the stage()
+timings and the --profile mem report are process-wide by construction
+(tracemalloc traces every thread).
+
+With ``--profile mem`` it writes PREFIX.tracemalloc (a Snapshot.dump) and
+PREFIX-mem.txt: peak traced memory and the top allocation sites by line
+and by file.
+
+Both reports include any stage() timings the script recorded:
+
+    with stage("load harvest"):
+        ...
+
+Scripts that do not mark stages get a note saying so instead.
+
+Without --profile, run_profiled(main) is just main() and stage() only
+reads the clock.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+PROFILE_DIR = Path("data/profiles")
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 10
+
+# (category, path fragments or built-in names that belong to it)
+TIME_CATEGORIES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("network", ("/requests/", "/urllib3/", "/socket.py", "/ssl.py", "/http/client.py", "<method 'recv", "<method 'connect")),
+    ("parse", ("/bs4/", "/html/parser.py", "/_markupbase.py", "/lxml/", "/soupsieve/")),
+    ("json", ("/json/",)),
+    ("sleep", ("<built-in method time.sleep>",)),
+)
+
+_stages: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a named stage of a run (and its traced memory growth under --profile mem)."""
+    tracing = tracemalloc.is_tracing()
+    memory_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record = _stages.setdefault(name, {"calls": 0, "seconds": 0.0, "memory": 0.0})
+        record["calls"] += 1
+        record["seconds"] += time.perf_counter() - started
+        if tracing:
+            record["memory"] += tracemalloc.get_traced_memory()[0] - memory_before
+
+
+def _stage_lines(include_memory: bool) -> List[str]:
+    if not _stages:
+        return ["", "Stages: none recorded (this script does not mark stage() blocks)"]
+    lines = ["", "Stages:"]
+    for name, record in _stages.items():
+        line = f"  {name}: {record['seconds']:.3f}s over {int(record['calls'])} call(s)"
+        if include_memory:
+            line += f", {record['memory'] / 1024 / 1024:+.1f} MiB traced"
+        lines.append(line)
+    return lines
+
+
+def _with_suffix(prefix: Path, suffix: str) -> Path:
+    return prefix.parent / f"{prefix.name}{suffix}"
+
+
+def _function_label(function: Tuple[str, int, str]) -> str:
+    filename, _, name = function
+    return name if filename == "~" else filename
+
+
+def _category(function: Tuple[str, int, str]) -> Optional[str]:
+    label = _function_label(function).replace("\\", "/")
+    for category, fragments in TIME_CATEGORIES:
+        if any(fragment in label for fragment in fragments):
+            return category
+    return None
+
+
+def time_breakdown(stats: pstats.Stats) -> Dict[str, float]:
+    """Seconds spent in each TIME_CATEGORIES category.
+
+    Sums the cumulative time of call edges that enter a category from
+    outside it, so nested calls inside (say) urllib3 are not counted twice.
+    """
+    totals = {category: 0.0 for category, _ in TIME_CATEGORIES}
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        category = _category(function)
+        if category is None:
+            continue
+        for caller, edge in callers.items():
+            if _category(caller) != category:
+                totals[category] += edge[3]
+    return totals
+
+
+class _ThreadProfiles:
+    """One cProfile.Profile per thread started while installed.
+
+    cProfile only sees the thread that enabled it, so threading.setprofile
+    hands each new thread a hook that swaps itself for a fresh profiler on
+    the thread's first call. On interpreters where cProfile already covers
+    every thread (sys.monitoring, 3.12+) enabling a second profiler raises
+    ValueError and the main profiler's data is used as is.
+    """
+
+    def __init__(self) -> None:
+        self.profiles: List[cProfile.Profile] = []
+        self.threads = 0
+        self._lock = threading.Lock()
+
+    def _bootstrap(self, frame, event, arg) -> None:
+        sys.setprofile(None)
+        with self._lock:
+            self.threads += 1
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return
+        with self._lock:
+            self.profiles.append(profile)
+
+    def install(self) -> None:
+        threading.setprofile(self._bootstrap)
+
+    def uninstall(self) -> None:
+        threading.setprofile(None)
+
+
+def _write_cpu_report(
+    profile: cProfile.Profile, prefix: Path, elapsed: float, threads: Optional[_ThreadProfiles] = None
+) -> Path:
+    buffer = io.StringIO()
+    stats = pstats.Stats(profile, stream=buffer)
+    for thread_profile in threads.profiles if threads else ():
+        stats.add(thread_profile)
+    stats.dump_stats(str(_with_suffix(prefix, ".pstats")))
+    breakdown = time_breakdown(stats)
+
+    lines = [f"Wall time: {elapsed:.3f}s"]
+    if threads and threads.threads:
+        lines.append(
+            f"Threads: main + {threads.threads} started during the run "
+            f"({len(threads.profiles)} with their own profiler, merged below); "
+            "category times are summed over threads and can exceed wall time"
+        )
+    else:
+        lines.append("Threads: main only")
+    lines.extend(["", "Time by category (entered from outside the category):"])
+    for category, seconds in breakdown.items():
+        share = seconds / elapsed * 100 if elapsed else 0.0
+        lines.append(f"  {category:<8} {seconds:9.3f}s  {share:5.1f}%")
+    other = max(0.0, elapsed - sum(breakdown.values()))
+    lines.append(f"  {'other':<8} {other:9.3f}s  {other / elapsed * 100 if elapsed else 0.0:5.1f}%")
+    lines.extend(_stage_lines(include_memory=False))
+
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    lines.extend(["", buffer.getvalue()])
+    report_path = _with_suffix(prefix, "-cpu.txt")
+    report_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return report_path
+
+
+def _write_memory_report(snapshot: tracemalloc.Snapshot, peak: int, prefix: Path, elapsed: float) -> Path:
+    snapshot.dump(str(_with_suffix(prefix, ".tracemalloc")))
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+    )
+    lines = [
+        f"Wall time: {elapsed:.3f}s (tracemalloc slows runs down)",
+        f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB",
+    ]
+    lines.extend(_stage_lines(include_memory=True))
+    for key_type, title in (("lineno", "line"), ("filename", "file")):
+        lines.extend(["", f"Top {TOP_ALLOCATIONS} allocation sites by {title} (live at exit):"])
+        for statistic in snapshot.statistics(key_type)[:TOP_ALLOCATIONS]:
+            lines.append(f"  {statistic}")
+    report_path = _with_suffix(prefix, "-mem.txt")
+    report_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return report_path
+
+
+def run_profiled(main: Callable[[], object]) -> object:
+    """Run main(), under cProfile or tracemalloc if --profile is on the command line."""
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--profile", choices=("cpu", "mem"))
+    parser.add_argument("--profile-out", type=Path)
+    options, remaining = parser.parse_known_args(sys.argv[1:])
+    sys.argv[1:] = remaining
+    if not options.profile:
+        return main()
+
+    prefix = options.profile_out or PROFILE_DIR / Path(sys.argv[0]).stem
+    prefix.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+
+    if options.profile == "cpu":
+        profile = cProfile.Profile()
+        threads = _ThreadProfiles()
+        threads.install()
+        try:
+            return profile.runcall(main)
+        finally:
+            threads.uninstall()
+            report_path = _write_cpu_report(profile, prefix, time.perf_counter() - started, threads)
+            print(f"CPU profile written to {_with_suffix(prefix, '.pstats')} and {report_path}", file=sys.stderr)
+
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    try:
+        return main()
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report_path = _write_memory_report(snapshot, peak, prefix, time.perf_counter() - started)
+        print(f"Memory profile written to {_with_suffix(prefix, '.tracemalloc')} and {report_path}", file=sys.stderr)
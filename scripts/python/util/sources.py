@@ -0,0 +1,297 @@
+"""
+Source registry and per-source fetch policy, loaded from scripts/config/sources.json.
+
+Each source in the config names the plugin modules that map thinkers to it
+and harvest works from it, and may override the fetch policy defaults:
+
+    {
+      "defaults": {"user_agent": "...", "requests_per_second": 1.0, "concurrency": 1,
+                   "adaptive": true, "min_requests_per_second": 0.1,
+                   "timeout_seconds": 15,
+                   "max_retries": 3, "backoff_factor": 0.5,
+                   "parser": "html.parser", "index_ttl_hours": 24},
+      "sources": [
+        {"id": "anarchist_library", "enabled": true, "index_url": "...",
+         "mapper": "scrapers.map_anarchist_library",
+         "harvester": "scrapers.harvest_anarchist_library",
+         "matches_file": "data/zero-works-anarchist-library-matches.json",
+         "fetch": {"requests_per_second": 0.67}}
+      ]
+    }
+
+A mapper module exposes create_mapper(source, metrics) -> MapperPlugin and a
+harvester module create_harvester(source, metrics) -> HarvesterPlugin; the
+combined runners (scrapers/map_all_sources.py, scrapers/harvest_all_sources.py)
+load them for every enabled source. Plugins fetch through build_session()
+and fetch(), which apply the source's user agent, timeout, retries and
+request rate, so tuning a source is a config change. fetch() sends every
+request through the process-wide crawl scheduler (util/crawl_scheduler.py),
+which keeps each host within its policy while other hosts proceed. With
+"adaptive" on, requests_per_second is only the starting rate: the scheduler
+moves it between min_ and max_requests_per_second as the host responds
+(429/503, Retry-After, latency). max_requests_per_second defaults to
+requests_per_second, so a host only backs off and recovers unless its
+config explicitly allows it to go faster:
+
+    source = get_source("anarchist_library")
+    session = build_session(source.policy, "harvest_anarchist_library")
+    response = fetch(session, url)
+    soup = BeautifulSoup(response.text, source.policy.parser)
+
+Sources without plugin modules (sinistra, libcom) are listed for reference
+and skipped by the runners. Hosts fetched outside any source (Wikimedia
+Commons for portraits) get their policy from the config's "hosts" map via
+host_policy(). `python util/sources.py` prints the registry.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import importlib
+import json
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.crawl_scheduler import default_scheduler  # noqa: E402
+from util.http_metrics import HttpMetrics, instrument_session  # noqa: E402
+from util.profiling import run_profiled  # noqa: E402
+
+
+DEFAULT_SOURCES_FILE = Path(__file__).resolve().parents[2] / "config" / "sources.json"
+DEFAULT_HARVEST_ROOT = Path("data/zero-works-harvest")
+PARSER_BACKENDS = ("html.parser", "lxml", "html5lib")
+
+
+@dataclass(frozen=True)
+class FetchPolicy:
+    """How politely and how fast one source may be fetched."""
+
+    user_agent: str = "Marxists Explorer Bot/0.1 (+https://github.com/jeremy-marxists-explorer)"
+    # Starting rate; fixed unless adaptive
+    requests_per_second: float = 1.0
+    concurrency: int = 1
+    # Let the crawl scheduler tune the rate from the host's responses, within these bounds;
+    # without a max the starting rate is also the ceiling
+    adaptive: bool = True
+    min_requests_per_second: float = 0.1
+    max_requests_per_second: Optional[float] = None
+    timeout_seconds: float = 15
+    # Retries of 429/503 (by the scheduler, after Retry-After) and of transport errors
+    # and 500/502/504 (by urllib3, with backoff_factor)
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    # BeautifulSoup tree builder for this source's pages
+    parser: str = "html.parser"
+    index_ttl_hours: float = 24.0
+
+    @property
+    def rate_ceiling(self) -> float:
+        """Highest rate the adaptive scheduler may reach (0 when unlimited)."""
+        if self.max_requests_per_second is None:
+            return self.requests_per_second
+        return self.max_requests_per_second
+
+
+@dataclass(frozen=True)
+class SourceConfig:
+    id: str
+    name: str
+    base_url: str
+    index_url: Optional[str]
+    enabled: bool
+    policy: FetchPolicy
+    mapper: Optional[str] = None
+    harvester: Optional[str] = None
+    matches_file: Optional[Path] = None
+
+    @property
+    def harvest_dir(self) -> Path:
+        return DEFAULT_HARVEST_ROOT / self.id
+
+
+@dataclass
+class MapperPlugin:
+    """A source's mapper, reduced to what the combined mapping loop needs."""
+
+    source: SourceConfig
+    index_url: str
+    # load(index_cache) -> lookup
+    load: Callable[..., Dict[str, Any]]
+    # match(record, lookup, fuzzy_index, threshold) -> match dict in the mapper's output format
+    match: Callable[..., Dict[str, Any]]
+
+
+@dataclass
+class HarvesterPlugin:
+    """A source's harvester: one match record in, one harvest payload out."""
+
+    source: SourceConfig
+    harvest: Callable[[Dict[str, Any]], Dict[str, Any]]
+    metrics: Optional[HttpMetrics] = None
+
+
+def _policy(defaults: FetchPolicy, overrides: Dict[str, Any], where: str) -> FetchPolicy:
+    try:
+        policy = dataclasses.replace(defaults, **overrides)
+    except TypeError as exc:
+        raise ValueError(f"{where}: unknown fetch setting ({exc})") from exc
+    if policy.parser not in PARSER_BACKENDS:
+        raise ValueError(f"{where}: parser must be one of {', '.join(PARSER_BACKENDS)}, not {policy.parser!r}")
+    if policy.concurrency < 1:
+        raise ValueError(f"{where}: concurrency must be at least 1")
+    if policy.requests_per_second < 0:
+        raise ValueError(f"{where}: requests_per_second must be 0 (unlimited) or more")
+    # An unlimited host (requests_per_second 0) has nothing to adapt
+    if policy.adaptive and policy.requests_per_second > 0 and not (
+        0 < policy.min_requests_per_second <= policy.requests_per_second <= policy.rate_ceiling
+    ):
+        raise ValueError(
+            f"{where}: adaptive rate needs 0 < min_requests_per_second <= requests_per_second "
+            "<= max_requests_per_second"
+        )
+    return policy
+
+
+@lru_cache(maxsize=None)
+def load_sources(path: Path = DEFAULT_SOURCES_FILE) -> Dict[str, SourceConfig]:
+    """Every source in the config file, in file order, keyed by id."""
+    config = json.loads(path.read_text(encoding="utf-8"))
+    defaults = _policy(FetchPolicy(), config.get("defaults") or {}, f"{path} defaults")
+    sources: Dict[str, SourceConfig] = {}
+    for entry in config.get("sources", []):
+        source_id = entry["id"]
+        matches_file = entry.get("matches_file")
+        sources[source_id] = SourceConfig(
+            id=source_id,
+            name=entry.get("name") or source_id,
+            base_url=entry.get("base_url") or "",
+            index_url=entry.get("index_url"),
+            enabled=bool(entry.get("enabled")),
+            policy=_policy(defaults, entry.get("fetch") or {}, f"{path} source {source_id!r}"),
+            mapper=entry.get("mapper"),
+            harvester=entry.get("harvester"),
+            matches_file=Path(matches_file) if matches_file else None,
+        )
+    return sources
+
+
+@lru_cache(maxsize=None)
+def host_policy(host: str, path: Path = DEFAULT_SOURCES_FILE) -> FetchPolicy:
+    """Fetch policy for a host that is not a source (e.g. Wikimedia Commons), from the config's "hosts"."""
+    config = json.loads(path.read_text(encoding="utf-8"))
+    defaults = _policy(FetchPolicy(), config.get("defaults") or {}, f"{path} defaults")
+    return _policy(defaults, (config.get("hosts") or {}).get(host) or {}, f"{path} host {host!r}")
+
+
+def get_source(source_id: str, path: Path = DEFAULT_SOURCES_FILE) -> SourceConfig:
+    sources = load_sources(path)
+    if source_id not in sources:
+        raise KeyError(f"Unknown source {source_id!r} in {path}")
+    return sources[source_id]
+
+
+def select_sources(
+    role: str,
+    source_ids: Optional[List[str]] = None,
+    path: Path = DEFAULT_SOURCES_FILE,
+) -> List[SourceConfig]:
+    """Sources with a plugin for role ("mapper" or "harvester").
+
+    Without source_ids, every enabled source; enabled sources with no plugin
+    for role are reported and skipped.
+    """
+    sources = load_sources(path)
+    if source_ids:
+        unknown = [source_id for source_id in source_ids if source_id not in sources]
+        if unknown:
+            raise KeyError(f"Unknown source(s) in {path}: {', '.join(unknown)}")
+        chosen = [sources[source_id] for source_id in source_ids]
+    else:
+        chosen = [source for source in sources.values() if source.enabled]
+    selected = []
+    for source in chosen:
+        if getattr(source, role):
+            selected.append(source)
+        else:
+            print(f"[WARN] Source {source.id!r} has no {role} plugin; skipping")
+    return selected
+
+
+def create_mapper(source: SourceConfig, metrics: HttpMetrics) -> MapperPlugin:
+    return importlib.import_module(source.mapper).create_mapper(source, metrics)  # type: ignore[arg-type]
+
+
+def create_harvester(source: SourceConfig, metrics: HttpMetrics, **options: Any) -> HarvesterPlugin:
+    return importlib.import_module(source.harvester).create_harvester(source, metrics, **options)  # type: ignore[arg-type]
+
+
+def build_session(policy: FetchPolicy, name: str, metrics: Optional[HttpMetrics] = None) -> requests.Session:
+    """Instrumented session with the policy's user agent, retries and pool size.
+
+    The policy stays on the session as session.fetch_policy, where fetch()
+    and the crawl scheduler read its rate, concurrency and timeout. urllib3
+    only retries transport errors and 500/502/504; 429 and 503 reach the
+    scheduler, which slows the host down and retries after Retry-After.
+    """
+    session = requests.Session()
+    session.headers.update({"User-Agent": policy.user_agent})
+    retry = Retry(
+        total=policy.max_retries,
+        backoff_factor=policy.backoff_factor,
+        status_forcelist=(500, 502, 504),
+        allowed_methods=("GET",),
+        respect_retry_after_header=False,
+    )
+    pool_size = max(10, policy.concurrency)
+    session.mount("https://", HTTPAdapter(max_retries=retry, pool_maxsize=pool_size))
+    session.mount("http://", HTTPAdapter(max_retries=retry, pool_maxsize=pool_size))
+    instrument_session(session, name, metrics)
+    session.fetch_policy = policy
+    return session
+
+
+def fetch(session: requests.Session, url: str, headers: Optional[Dict[str, str]] = None, **kwargs: Any) -> Response:
+    """GET through the process-wide crawl scheduler within the session's policy; raises for HTTP errors."""
+    return default_scheduler().fetch(session, url, headers=headers, **kwargs)
+
+
+def write_harvest_payload(output_dir: Path, payload: Dict[str, Any]) -> Path:
+    """Write one harvest payload to <output_dir>/<collection>/<slug>.json."""
+    out_dir = output_dir / payload["collection"]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_file = out_dir / f"{payload['slug']}.json"
+    out_file.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return out_file
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="List the configured sources and their fetch policy.")
+    parser.add_argument("--sources-file", type=Path, default=DEFAULT_SOURCES_FILE, help="Source config JSON.")
+    args = parser.parse_args()
+
+    for source in load_sources(args.sources_file).values():
+        policy = source.policy
+        rate = f"{policy.requests_per_second:g} req/s" if policy.requests_per_second else "unlimited"
+        if policy.adaptive and policy.requests_per_second:
+            rate += f" ({policy.min_requests_per_second:g}-{policy.rate_ceiling:g} adaptive)"
+        plugins = ", ".join(f"{role}={getattr(source, role)}" for role in ("mapper", "harvester") if getattr(source, role))
+        print(
+            f"{source.id:<18} {'enabled ' if source.enabled else 'disabled'}  "
+            f"{rate} x{policy.concurrency}, timeout {policy.timeout_seconds:g}s, "
+            f"{policy.max_retries} retries, {policy.parser}, index TTL {policy.index_ttl_hours:g}h"
+            + (f"  [{plugins}]" if plugins else "")
+        )
+
+
+if __name__ == "__main__":
+    run_profiled(main)
@@ -0,0 +1,87 @@
+"""
+Shared URL canonicalization for the harvest, merge, apply and register stages.
+
+Every stage dedupes works by URL, so they must agree on what "the same URL"
+means. canonicalize_url is the single definition used across the pipeline:
+
+  * query string and fragment are dropped
+  * scheme and host are lower-cased, default ports (:80/:443) removed
+  * an empty path becomes "/"
+  * with collapse_index=True a trailing index.htm/index.html collapses to
+    its directory
+
+Results are memoized, since the same author and work URLs are seen many
+times per run (every link on every crawled page, every work in every
+payload). url_equivalence_key is a looser key for cross-source dedupe.
+
+Scripts outside util/ import this module after putting scripts/python on
+sys.path:
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from util.urls import canonicalize_url
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable, List
+from urllib.parse import urlsplit, urlunsplit
+
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+INDEX_PAGE_PATTERN = re.compile(r"/index\.html?$", re.IGNORECASE)
+CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonicalize_url(url: str, collapse_index: bool = False) -> str:
+    """Return the canonical form of an absolute URL, or "" if it has no scheme or host."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return ""
+    if not parts.scheme or not parts.netloc:
+        return ""
+
+    scheme = parts.scheme.lower()
+    userinfo, at, hostport = parts.netloc.rpartition("@")
+    host, colon, port = hostport.rpartition(":")
+    if not colon or "]" in port:
+        host, port = hostport, ""
+    host = host.lower()
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    netloc = f"{userinfo}{at}{host}"
+
+    path = parts.path or "/"
+    if collapse_index:
+        path = INDEX_PAGE_PATTERN.sub("/", path)
+
+    return urlunsplit((scheme, netloc, path, "", ""))
+
+
+def canonicalize_urls(urls: Iterable[str], collapse_index: bool = False) -> List[str]:
+    """Canonicalize a batch of URLs; entries that cannot be canonicalized map to ""."""
+    canonicalize = canonicalize_url
+    return [canonicalize(url, collapse_index) if url else "" for url in urls]
+
+
+def dedupe_urls(urls: Iterable[str], collapse_index: bool = False) -> List[str]:
+    """Return the distinct canonical URLs in first-seen order, dropping invalid ones."""
+    seen = dict.fromkeys(canonicalize_urls(urls, collapse_index))
+    seen.pop("", None)
+    return list(seen)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def url_equivalence_key(url: str) -> str:
+    """Key under which http/https, www., index pages and trailing slashes collapse."""
+    canonical = canonicalize_url(url, collapse_index=True)
+    if not canonical:
+        return ""
+    parts = urlsplit(canonical)
+    host = parts.netloc
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/')}"
@@ -0,0 +1,496 @@
+"""
+Offline full-text BM25 index over the works in public/data-v2.
+
+Walks every works file (<collection>/<Thinker>/<Subject>.json), indexes the
+title, thinker, subject and description of each work, and optionally the
+text of the work page itself (fetched through the harvester's throttled,
+retrying session and cached on disk). The index is sharded by collection:
+
+    <index-dir>/index.json           shard list, BM25 parameters, corpus doc count
+                                     and average doc length
+    <index-dir>/doc-freqs.json       document frequency of every term over all shards
+    <index-dir>/<collection>.json    term dictionary, doc table, doc lengths
+    <index-dir>/<collection>.post    postings, memory-mapped at query time
+
+IDF and length normalization use the corpus-wide statistics, not the
+shard's own, so scores from different collections rank against each other.
+
+Each term's postings are (doc id gap, term frequency) pairs written as
+LEB128 varints, so a shard's postings file is a fraction of the raw id
+lists and only the terms a query touches are ever read.
+
+Usage:
+    python scripts/python/util/works_index.py build
+    python scripts/python/util/works_index.py build --fetch-text --fetch-limit 500
+    python scripts/python/util/works_index.py query "surplus value"
+    python scripts/python/util/works_index.py bench
+
+Query API:
+    from util.works_index import WorksIndex
+    with WorksIndex(Path("data/works-index")) as index:
+        for hit in index.search("imperialism", limit=5):
+            print(hit.score, hit.thinker, hit.title)
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import re
+import statistics
+import sys
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.profiling import run_profiled, stage  # noqa: E402
+from util.works_pages import iter_subject_works, list_subjects, read_subject_works  # noqa: E402
+
+
+INDEX_VERSION = 2
+DEFAULT_DATA_DIR = Path("public/data-v2")
+DEFAULT_INDEX_DIR = Path("data/works-index")
+DEFAULT_TEXT_CACHE_DIR = Path("data/works-index-texts")
+TOKEN_PATTERN = re.compile(r"\w+")
+MIN_TOKEN_LENGTH = 2
+TITLE_WEIGHT = 3
+MAX_TEXT_CHARS = 200_000
+FETCHABLE_EXTENSIONS = (".htm", ".html", ".txt")
+BM25_K1 = 1.2
+BM25_B = 0.75
+BENCH_QUERIES = (
+    "capital",
+    "surplus value",
+    "imperialism",
+    "national question",
+    "woman",
+    "anarchism and the state",
+    "letter to",
+    "revolution in spain",
+)
+
+
+@dataclass
+class WorkDocument:
+    thinker: str
+    subject: str
+    title: str
+    url: str
+    description: str = ""
+
+
+@dataclass
+class SearchHit:
+    score: float
+    collection: str
+    thinker: str
+    subject: str
+    title: str
+    url: str
+
+
+def tokenize(text: str) -> List[str]:
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return [token for token in TOKEN_PATTERN.findall(folded) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_postings(buffer, offset: int, count: int) -> Iterator[Tuple[int, int]]:
+    """Yield (doc id, term frequency) for `count` postings starting at `offset`."""
+    doc_id = 0
+    for _ in range(count):
+        values = []
+        for _ in range(2):
+            value = shift = 0
+            while True:
+                byte = buffer[offset]
+                offset += 1
+                value |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            values.append(value)
+        doc_id += values[0]
+        yield doc_id, values[1]
+
+
+# ---------------------------------------------------------------------------
+# Building
+
+
+def iter_collection_works(collection_dir: Path) -> Iterator[WorkDocument]:
+    for thinker_dir in sorted(path for path in collection_dir.iterdir() if path.is_dir()):
+        for subject in list_subjects(thinker_dir):
+            try:
+                works = read_subject_works(thinker_dir, subject)
+            except (OSError, json.JSONDecodeError) as exc:
+                print(f"[WARN] Skipping {thinker_dir / subject}: {exc}")
+                continue
+            for work in works if isinstance(works, list) else []:
+                title = (work.get("title") or "").strip()
+                url = (work.get("url") or "").strip()
+                if not title and not url:
+                    continue
+                yield WorkDocument(
+                    thinker=thinker_dir.name,
+                    subject=subject,
+                    title=title,
+                    url=url,
+                    description=(work.get("description") or "").strip(),
+                )
+
+
+class TextFetcher:
+    """Fetch and cache the visible text of work pages via the harvester session."""
+
+    def __init__(self, cache_dir: Path, limit: Optional[int] = None):
+        from scrapers.harvest_zero_work_thinkers import WorkHarvester, normalize_whitespace
+
+        self.harvester = WorkHarvester()
+        self.normalize_whitespace = normalize_whitespace
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.limit = limit
+        self.fetched = 0
+        self.failed = 0
+
+    def _cache_path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.txt"
+
+    def text_for(self, url: str) -> str:
+        if not url.lower().endswith(FETCHABLE_EXTENSIONS):
+            return ""
+        cache_path = self._cache_path(url)
+        if cache_path.exists():
+            return cache_path.read_text(encoding="utf-8")
+        if self.limit is not None and self.fetched >= self.limit:
+            return ""
+
+        self.fetched += 1
+        try:
+            soup, _ = self.harvester._parse(url)
+        except Exception as exc:  # noqa: BLE001 - any fetch failure just leaves the text out
+            self.failed += 1
+            print(f"[WARN] Failed to fetch {url}: {exc}")
+            return ""
+        for element in soup(["script", "style", "nav", "header", "footer"]):
+            element.decompose()
+        text = self.normalize_whitespace(soup.get_text(" "))[:MAX_TEXT_CHARS]
+        cache_path.write_text(text, encoding="utf-8")
+        return text
+
+
+def document_terms(document: WorkDocument, text: str = "") -> Counter:
+    terms = Counter(tokenize(document.title) * TITLE_WEIGHT)
+    terms.update(tokenize(f"{document.thinker} {document.subject} {document.description} {text}"))
+    return terms
+
+
+def build_shard(
+    collection: str,
+    documents: Iterable[WorkDocument],
+    index_dir: Path,
+    fetcher: Optional[TextFetcher] = None,
+    doc_freqs: Optional[Counter] = None,
+) -> Dict[str, object]:
+    """Write one collection's shard; adds its document frequencies to doc_freqs."""
+    docs: List[List[str]] = []
+    lengths: List[int] = []
+    postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+    for doc_id, document in enumerate(documents):
+        text = fetcher.text_for(document.url) if fetcher and document.url else ""
+        terms = document_terms(document, text)
+        docs.append([document.thinker, document.subject, document.title, document.url])
+        lengths.append(sum(terms.values()))
+        for term, frequency in terms.items():
+            postings[term].append((doc_id, frequency))
+
+    blob = bytearray()
+    terms_table: Dict[str, List[int]] = {}
+    for term in sorted(postings):
+        entries = postings[term]
+        offset = len(blob)
+        previous = 0
+        for doc_id, frequency in entries:
+            encode_varint(doc_id - previous, blob)
+            encode_varint(frequency, blob)
+            previous = doc_id
+        terms_table[term] = [offset, len(entries)]
+        if doc_freqs is not None:
+            doc_freqs[term] += len(entries)
+
+    (index_dir / f"{collection}.post").write_bytes(bytes(blob))
+    shard = {
+        "version": INDEX_VERSION,
+        "collection": collection,
+        "docCount": len(docs),
+        "terms": terms_table,
+        "docs": docs,
+        "lengths": lengths,
+    }
+    (index_dir / f"{collection}.json").write_text(
+        json.dumps(shard, ensure_ascii=False, separators=(",", ":")) + "\n",
+        encoding="utf-8",
+    )
+    return {
+        "collection": collection,
+        "docs": len(docs),
+        "terms": len(terms_table),
+        "postingsBytes": len(blob),
+        "totalLength": sum(lengths),
+    }
+
+
+def build_index(data_dir: Path, index_dir: Path, fetcher: Optional[TextFetcher] = None) -> Dict[str, object]:
+    index_dir.mkdir(parents=True, exist_ok=True)
+    category_index = json.loads((data_dir / "index.json").read_text(encoding="utf-8"))
+
+    shards = []
+    doc_freqs: Counter = Counter()
+    for category in category_index["categories"]:
+        collection = category["path"]
+        collection_dir = data_dir / collection
+        if not collection_dir.is_dir():
+            print(f"[WARN] Missing collection directory: {collection_dir}")
+            continue
+        with stage("index collections"):
+            summary = build_shard(collection, iter_collection_works(collection_dir), index_dir, fetcher, doc_freqs)
+        print(
+            f"{collection}: {summary['docs']} works, {summary['terms']} terms, "
+            f"{summary['postingsBytes']:,} postings bytes"
+        )
+        shards.append(summary)
+
+    doc_count = sum(shard["docs"] for shard in shards)
+    manifest = {
+        "version": INDEX_VERSION,
+        "k1": BM25_K1,
+        "b": BM25_B,
+        "titleWeight": TITLE_WEIGHT,
+        "withText": fetcher is not None,
+        "docCount": doc_count,
+        "avgDocLength": sum(shard["totalLength"] for shard in shards) / doc_count if doc_count else 0.0,
+        "shards": shards,
+    }
+    with stage("write manifest"):
+        (index_dir / "doc-freqs.json").write_text(
+            json.dumps(dict(sorted(doc_freqs.items())), ensure_ascii=False, separators=(",", ":")) + "\n",
+            encoding="utf-8",
+        )
+        (index_dir / "index.json").write_text(
+            json.dumps(manifest, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Querying
+
+
+class IndexShard:
+    def __init__(self, index_dir: Path, collection: str):
+        self.collection = collection
+        meta = json.loads((index_dir / f"{collection}.json").read_text(encoding="utf-8"))
+        self.doc_count: int = meta["docCount"]
+        self.terms: Dict[str, List[int]] = meta["terms"]
+        self.docs: List[List[str]] = meta["docs"]
+        self.lengths: List[int] = meta["lengths"]
+
+        postings_path = index_dir / f"{collection}.post"
+        self._file = postings_path.open("rb")
+        if postings_path.stat().st_size:
+            self._postings = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._postings = b""
+
+    def close(self) -> None:
+        if isinstance(self._postings, mmap.mmap):
+            self._postings.close()
+        self._file.close()
+
+    def score(
+        self,
+        terms: List[str],
+        idfs: Dict[str, float],
+        avg_doc_length: float,
+        k1: float,
+        b: float,
+    ) -> Dict[int, float]:
+        """BM25 scores of this shard's docs, with corpus-wide idfs and average length."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            entry = self.terms.get(term)
+            if not entry:
+                continue
+            offset, count = entry
+            idf = idfs[term]
+            for doc_id, frequency in decode_postings(self._postings, offset, count):
+                norm = k1 * (1 - b + b * self.lengths[doc_id] / avg_doc_length)
+                scores[doc_id] += idf * frequency * (k1 + 1) / (frequency + norm)
+        return scores
+
+
+class WorksIndex:
+    """Read-only handle on a built works index; shards are opened lazily."""
+
+    def __init__(self, index_dir: Path = DEFAULT_INDEX_DIR):
+        self.index_dir = index_dir
+        manifest = json.loads((index_dir / "index.json").read_text(encoding="utf-8"))
+        if manifest.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported works index version: {manifest.get('version')}")
+        self.k1: float = manifest["k1"]
+        self.b: float = manifest["b"]
+        self.doc_count: int = manifest["docCount"]
+        self.avg_doc_length: float = manifest["avgDocLength"] or 1.0
+        self.doc_freqs: Dict[str, int] = json.loads((index_dir / "doc-freqs.json").read_text(encoding="utf-8"))
+        self.collections: List[str] = [shard["collection"] for shard in manifest["shards"]]
+        self._shards: Dict[str, IndexShard] = {}
+
+    def __enter__(self) -> "WorksIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for shard in self._shards.values():
+            shard.close()
+        self._shards.clear()
+
+    def shard(self, collection: str) -> IndexShard:
+        if collection not in self._shards:
+            self._shards[collection] = IndexShard(self.index_dir, collection)
+        return self._shards[collection]
+
+    def idf(self, term: str) -> float:
+        doc_freq = self.doc_freqs.get(term, 0)
+        return math.log(1 + (self.doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def search(self, query: str, limit: int = 10, collections: Optional[Iterable[str]] = None) -> List[SearchHit]:
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self.doc_freqs]
+        if not terms:
+            return []
+
+        idfs = {term: self.idf(term) for term in terms}
+        ranked: List[Tuple[float, str, int]] = []
+        for collection in collections or self.collections:
+            shard = self.shard(collection)
+            for doc_id, score in shard.score(terms, idfs, self.avg_doc_length, self.k1, self.b).items():
+                ranked.append((score, collection, doc_id))
+
+        hits = []
+        for score, collection, doc_id in heapq.nlargest(limit, ranked):
+            thinker, subject, title, url = self.shard(collection).docs[doc_id]
+            hits.append(SearchHit(round(score, 4), collection, thinker, subject, title, url))
+        return hits
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+
+
+def scan_titles(data_dir: Path, query: str) -> int:
+    """Baseline: load every works file and substring-match titles, as a JSON-tree scan would."""
+    needle = query.lower()
+    matches = 0
+    for thinker_dir in data_dir.glob("*/*/"):
+        for _, works in iter_subject_works(thinker_dir):
+            for work in works:
+                if needle in (work.get("title") or "").lower():
+                    matches += 1
+    return matches
+
+
+def run_benchmark(index_dir: Path, data_dir: Path, queries: Iterable[str], repeat: int) -> None:
+    queries = list(queries)
+    with WorksIndex(index_dir) as index:
+        start = time.perf_counter()
+        for collection in index.collections:
+            index.shard(collection)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        timings = []
+        for _ in range(repeat):
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query)
+                timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for query in queries:
+        scan_titles(data_dir, query)
+    scan_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"Opened {len(index.collections)} shards in {open_ms:.1f} ms")
+    print(
+        f"Index search over {len(timings)} queries: median {statistics.median(timings):.2f} ms, "
+        f"p95 {p95:.2f} ms, max {timings[-1]:.2f} ms"
+    )
+    print(f"JSON tree title scan: {scan_ms:.1f} ms per query")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and query the offline works full-text index.")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="Root of the data-v2 tree.")
+    parser.add_argument("--index-dir", type=Path, default=DEFAULT_INDEX_DIR, help="Directory holding the index shards.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Build the index from data-v2.")
+    build_parser.add_argument("--fetch-text", action="store_true", help="Fetch and index the text of each work page.")
+    build_parser.add_argument(
+        "--text-cache-dir",
+        type=Path,
+        default=DEFAULT_TEXT_CACHE_DIR,
+        help="Where fetched work texts are cached between builds.",
+    )
+    build_parser.add_argument("--fetch-limit", type=int, help="Fetch at most this many uncached pages per build.")
+
+    query_parser = subparsers.add_parser("query", help="Run a query against a built index.")
+    query_parser.add_argument("query", help="Search terms.")
+    query_parser.add_argument("--limit", type=int, default=10, help="Number of hits to print.")
+    query_parser.add_argument("--collection", action="append", help="Restrict to a collection (repeatable).")
+
+    bench_parser = subparsers.add_parser("bench", help="Time index queries against a JSON tree scan.")
+    bench_parser.add_argument("--query", action="append", help="Query to time (repeatable; defaults to a fixed set).")
+    bench_parser.add_argument("--repeat", type=int, default=20, help="Times to run each query.")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if not args.data_dir.exists():
+            raise FileNotFoundError(f"Data directory not found: {args.data_dir}")
+        fetcher = TextFetcher(args.text_cache_dir, args.fetch_limit) if args.fetch_text else None
+        start = time.perf_counter()
+        manifest = build_index(args.data_dir, args.index_dir, fetcher)
+        total_docs = sum(shard["docs"] for shard in manifest["shards"])
+        print(f"Indexed {total_docs} works in {len(manifest['shards'])} shards in {time.perf_counter() - start:.1f}s")
+        if fetcher:
+            print(f"Fetched {fetcher.fetched} pages ({fetcher.failed} failed)")
+    elif args.command == "query":
+        with WorksIndex(args.index_dir) as index:
+            for hit in index.search(args.query, limit=args.limit, collections=args.collection):
+                print(f"{hit.score:8.3f}  {hit.collection}/{hit.thinker}/{hit.subject}  {hit.title}  {hit.url}")
+    else:
+        run_benchmark(args.index_dir, args.data_dir, args.query or BENCH_QUERIES, args.repeat)
+
+
+if __name__ == "__main__":
+    run_profiled(main)
@@ -0,0 +1,124 @@
+"""
+Paginated subject works files for thinkers with very large subjects.
+
+By default a subject is one file, <Thinker>/<Subject>.json. With a page
+size set, subjects longer than one page are written instead as
+
+    <Thinker>/<Subject>/index.json   {"subject", "count", "pageSize", "pages": [...]}
+    <Thinker>/<Subject>/1.json       first page_size works
+    <Thinker>/<Subject>/2.json       ...
+
+where each "pages" entry is {"page", "count", "first", "last"} with the
+titles of its first and last work. The metadata subject entry gains a
+"pages" count, so the UI can load page 1 immediately and fetch the rest on
+demand. Readers that need a whole subject use read_subject_works or
+iter_subject_works, which understand both layouts.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+PAGE_INDEX_FILE = "index.json"
+DEFAULT_PAGE_SIZE = 200
+
+
+def _write_json(path: Path, data) -> None:
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def write_subject_works(
+    thinker_dir: Path,
+    subject: str,
+    works: List[Dict[str, object]],
+    page_size: Optional[int] = None,
+) -> Dict[str, object]:
+    """Write one subject's works, paginated if page_size is set and exceeded.
+
+    Returns the metadata subject entry ({"name", "count"} plus "pages" when
+    paginated). Whichever layout is not written is removed, so switching
+    modes never leaves stale files behind.
+    """
+    subject_file = thinker_dir / f"{subject}.json"
+    pages_dir = thinker_dir / subject
+    entry: Dict[str, object] = {"name": subject, "count": len(works)}
+
+    if not page_size or len(works) <= page_size:
+        if pages_dir.is_dir():
+            shutil.rmtree(pages_dir)
+        _write_json(subject_file, works)
+        return entry
+
+    if subject_file.exists():
+        subject_file.unlink()
+    if pages_dir.is_dir():
+        shutil.rmtree(pages_dir)
+    pages_dir.mkdir(parents=True)
+
+    pages = []
+    for page, start in enumerate(range(0, len(works), page_size), start=1):
+        chunk = works[start:start + page_size]
+        _write_json(pages_dir / f"{page}.json", chunk)
+        pages.append(
+            {
+                "page": page,
+                "count": len(chunk),
+                "first": chunk[0].get("title", ""),
+                "last": chunk[-1].get("title", ""),
+            }
+        )
+
+    _write_json(
+        pages_dir / PAGE_INDEX_FILE,
+        {"subject": subject, "count": len(works), "pageSize": page_size, "pages": pages},
+    )
+    entry["pages"] = len(pages)
+    return entry
+
+
+def remove_subject_works(thinker_dir: Path, subject: str) -> None:
+    """Delete a subject in either layout."""
+    subject_file = thinker_dir / f"{subject}.json"
+    if subject_file.exists():
+        subject_file.unlink()
+    pages_dir = thinker_dir / subject
+    if (pages_dir / PAGE_INDEX_FILE).exists():
+        shutil.rmtree(pages_dir)
+
+
+def read_subject_works(thinker_dir: Path, subject: str) -> List[Dict[str, object]]:
+    """Return a subject's works in order, whichever layout it was written in."""
+    subject_file = thinker_dir / f"{subject}.json"
+    if subject_file.exists():
+        return json.loads(subject_file.read_text(encoding="utf-8"))
+
+    pages_dir = thinker_dir / subject
+    index = json.loads((pages_dir / PAGE_INDEX_FILE).read_text(encoding="utf-8"))
+    works: List[Dict[str, object]] = []
+    for page in index["pages"]:
+        works.extend(json.loads((pages_dir / f"{page['page']}.json").read_text(encoding="utf-8")))
+    return works
+
+
+def subject_files(thinker_dir: Path, subject: str) -> List[Path]:
+    """The files holding a subject: <Subject>.json, or its page index and pages."""
+    subject_file = thinker_dir / f"{subject}.json"
+    if subject_file.exists():
+        return [subject_file]
+    return sorted((thinker_dir / subject).glob("*.json"))
+
+
+def list_subjects(thinker_dir: Path) -> List[str]:
+    """Subject names under a thinker directory, single-file and paginated, sorted."""
+    subjects = {path.stem for path in thinker_dir.glob("*.json")}
+    subjects.update(path.parent.name for path in thinker_dir.glob(f"*/{PAGE_INDEX_FILE}"))
+    return sorted(subjects)
+
+
+def iter_subject_works(thinker_dir: Path) -> Iterator[Tuple[str, List[Dict[str, object]]]]:
+    for subject in list_subjects(thinker_dir):
+        yield subject, read_subject_works(thinker_dir, subject)
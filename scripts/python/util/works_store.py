@@ -0,0 +1,395 @@
+"""
+Binary columnar store for the data-v2 works tree.
+
+The thousand-odd per-subject JSON files repeat the same URLs and titles across
+subjects and thinkers, and reading one thinker means opening one file per
+subject. This packs every works file into a single memory-mappable file:
+
+  * string dictionaries (offsets + UTF-8 blob) for labels (collections,
+    thinker names, subjects, source ids), titles, URLs and descriptions;
+    each distinct string is stored once
+  * one uint32 column per work field, holding a dictionary id (0 = absent)
+  * a thinker table (collection, name, first slice) and a slice table
+    (subject, first work), so a thinker-subject slice is two offset lookups
+
+Reading a slice touches only the pages holding its rows and strings;
+reading everything goes through iter_slices(), which decodes each string
+dictionary once instead of string by string.
+
+Usage:
+    python scripts/python/util/works_store.py build
+    python scripts/python/util/works_store.py get first-international "Karl Marx" Economics
+    python scripts/python/util/works_store.py verify
+    python scripts/python/util/works_store.py bench
+
+Reader API:
+    from util.works_store import WorksStore
+    with WorksStore(Path("data/works-store.bin")) as store:
+        works = store.works("first-international", "Karl Marx", "Economics")
+        for collection, thinker, subject, works in store.iter_slices():
+            ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import random
+import statistics
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from util.profiling import run_profiled  # noqa: E402
+from util.works_pages import list_subjects, read_subject_works  # noqa: E402
+
+
+STORE_MAGIC = b"MXWS"
+STORE_VERSION = 1
+DEFAULT_DATA_DIR = Path("public/data-v2")
+DEFAULT_STORE_FILE = Path("data/works-store.bin")
+WORK_FIELDS = ("title", "url", "description", "source_id")
+DICTIONARIES = ("labels", "titles", "urls", "descriptions")
+FIELD_DICTIONARY = {"title": "titles", "url": "urls", "description": "descriptions", "source_id": "labels"}
+COLUMNS = (
+    "thinker_collection",
+    "thinker_name",
+    "thinker_slices",
+    "slice_subject",
+    "slice_works",
+    *(f"work_{field}" for field in WORK_FIELDS),
+)
+SECTIONS = tuple(f"{name}_offsets" for name in DICTIONARIES) + tuple(f"{name}_blob" for name in DICTIONARIES) + COLUMNS
+HEADER = struct.Struct(f"<4sHH{len(SECTIONS) * 2}Q")
+ALIGNMENT = 8
+
+
+class StringDictionaryBuilder:
+    """Interns strings; id 0 is reserved for "field absent"."""
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.offsets = array("I", [0, 0])
+        self.blob = bytearray()
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.offsets) - 1
+            self.ids[value] = string_id
+            self.blob.extend(value.encode("utf-8"))
+            self.offsets.append(len(self.blob))
+        return string_id
+
+
+def iter_works_files(data_dir: Path) -> Iterator[Tuple[str, str, str, Path]]:
+    index = json.loads((data_dir / "index.json").read_text(encoding="utf-8"))
+    for category in index["categories"]:
+        collection = category["path"]
+        collection_dir = data_dir / collection
+        if not collection_dir.is_dir():
+            continue
+        for thinker_dir in sorted(path for path in collection_dir.iterdir() if path.is_dir()):
+            for subject in list_subjects(thinker_dir):
+                yield collection, thinker_dir.name, subject, thinker_dir
+
+
+def build_store(data_dir: Path, store_file: Path) -> Dict[str, int]:
+    dictionaries = {name: StringDictionaryBuilder() for name in DICTIONARIES}
+    labels = dictionaries["labels"]
+    columns = {name: array("I") for name in COLUMNS}
+    thinker_keys: Dict[Tuple[str, str], int] = {}
+
+    for collection, thinker, subject, thinker_dir in iter_works_files(data_dir):
+        try:
+            works = read_subject_works(thinker_dir, subject)
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"[WARN] Skipping {thinker_dir / subject}: {exc}")
+            continue
+
+        if (collection, thinker) not in thinker_keys:
+            thinker_keys[(collection, thinker)] = len(columns["thinker_name"])
+            columns["thinker_collection"].append(labels.intern(collection))
+            columns["thinker_name"].append(labels.intern(thinker))
+            columns["thinker_slices"].append(len(columns["slice_subject"]))
+
+        columns["slice_subject"].append(labels.intern(subject))
+        columns["slice_works"].append(len(columns["work_title"]))
+        for work in works:
+            for field in WORK_FIELDS:
+                columns[f"work_{field}"].append(dictionaries[FIELD_DICTIONARY[field]].intern(work.get(field)))
+
+    # Closing offsets so slice i always spans [start[i], start[i + 1])
+    columns["thinker_slices"].append(len(columns["slice_subject"]))
+    columns["slice_works"].append(len(columns["work_title"]))
+
+    sections: Dict[str, bytes] = {}
+    for name, builder in dictionaries.items():
+        sections[f"{name}_offsets"] = builder.offsets
+        sections[f"{name}_blob"] = bytes(builder.blob)
+    sections.update(columns)
+
+    if sys.byteorder != "little":
+        for name, values in sections.items():
+            if isinstance(values, array):
+                values.byteswap()
+
+    store_file.parent.mkdir(parents=True, exist_ok=True)
+    with store_file.open("wb") as handle:
+        handle.write(b"\0" * HEADER.size)
+        positions = []
+        for name in SECTIONS:
+            handle.write(b"\0" * (-handle.tell() % ALIGNMENT))
+            data = sections[name]
+            data = data.tobytes() if isinstance(data, array) else data
+            positions.extend((handle.tell(), len(data)))
+            handle.write(data)
+        handle.seek(0)
+        handle.write(HEADER.pack(STORE_MAGIC, STORE_VERSION, 0, *positions))
+
+    return {
+        "thinkers": len(thinker_keys),
+        "slices": len(columns["slice_subject"]),
+        "works": len(columns["work_title"]),
+        "titles": len(dictionaries["titles"].ids),
+        "urls": len(dictionaries["urls"].ids),
+        "bytes": store_file.stat().st_size,
+    }
+
+
+class StringDictionary:
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+        self._cache: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 2
+
+    def get(self, string_id: int) -> Optional[str]:
+        if string_id == 0:
+            return None
+        value = self._cache.get(string_id)
+        if value is None:
+            value = str(self.blob[self.offsets[string_id]:self.offsets[string_id + 1]], "utf-8")
+            self._cache[string_id] = value
+        return value
+
+    def decode_all(self) -> List[Optional[str]]:
+        """Every string, indexed by id (index 0, "absent", is None)."""
+        offsets = self.offsets.tolist()
+        blob = bytes(self.blob)
+        return [None] + [blob[start:end].decode("utf-8") for start, end in zip(offsets[1:-1], offsets[2:])]
+
+
+class WorksStore:
+    """Read-only, memory-mapped view of a works store file."""
+
+    def __init__(self, store_file: Path = DEFAULT_STORE_FILE):
+        if sys.byteorder != "little":
+            raise ValueError("WorksStore reads little-endian columns directly and needs a little-endian host")
+        self._file = store_file.open("rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+
+        magic, version, _reserved, *positions = HEADER.unpack_from(self._map)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            view.release()
+            self.close()
+            raise ValueError(f"{store_file} is not a version {STORE_VERSION} works store")
+        sections = {
+            name: view[positions[2 * i]:positions[2 * i] + positions[2 * i + 1]] for i, name in enumerate(SECTIONS)
+        }
+        self._views = list(sections.values())
+
+        self.dictionaries = {
+            name: StringDictionary(sections[f"{name}_offsets"].cast("I"), sections[f"{name}_blob"])
+            for name in DICTIONARIES
+        }
+        self.columns = {name: sections[name].cast("I") for name in COLUMNS}
+        self._work_columns = [
+            (field, self.columns[f"work_{field}"], self.dictionaries[FIELD_DICTIONARY[field]])
+            for field in WORK_FIELDS
+        ]
+
+        labels = self.dictionaries["labels"]
+        self.thinkers: Dict[Tuple[str, str], int] = {
+            (labels.get(collection_id), labels.get(name_id)): position
+            for position, (collection_id, name_id) in enumerate(
+                zip(self.columns["thinker_collection"], self.columns["thinker_name"])
+            )
+        }
+
+    def __enter__(self) -> "WorksStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for attr in ("columns", "dictionaries", "_work_columns"):
+            if hasattr(self, attr):
+                delattr(self, attr)
+        for view in getattr(self, "_views", []):
+            view.release()
+        self._views = []
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def _slice_range(self, thinker_position: int) -> range:
+        slices = self.columns["thinker_slices"]
+        return range(slices[thinker_position], slices[thinker_position + 1])
+
+    def subjects(self, collection: str, thinker: str) -> List[str]:
+        position = self.thinkers.get((collection, thinker))
+        if position is None:
+            return []
+        labels = self.dictionaries["labels"]
+        return [labels.get(self.columns["slice_subject"][i]) for i in self._slice_range(position)]
+
+    def _rows(self, slice_position: int) -> List[Dict[str, str]]:
+        starts = self.columns["slice_works"]
+        start, end = starts[slice_position], starts[slice_position + 1]
+        works: List[Dict[str, str]] = [{} for _ in range(end - start)]
+        # Column at a time: one slice copy per field instead of a lookup per cell
+        for field, column, dictionary in self._work_columns:
+            get = dictionary.get
+            for work, string_id in zip(works, column[start:end].tolist()):
+                if string_id:
+                    work[field] = get(string_id)
+        return works
+
+    def works(self, collection: str, thinker: str, subject: str) -> List[Dict[str, str]]:
+        """Return the works of one thinker-subject slice, as stored in <Subject>.json."""
+        position = self.thinkers.get((collection, thinker))
+        if position is None:
+            return []
+        labels = self.dictionaries["labels"]
+        for slice_position in self._slice_range(position):
+            if labels.get(self.columns["slice_subject"][slice_position]) == subject:
+                return self._rows(slice_position)
+        return []
+
+    def iter_slices(self) -> Iterator[Tuple[str, str, str, List[Dict[str, str]]]]:
+        """Yield (collection, thinker, subject, works) for every slice in store order."""
+        strings = {name: dictionary.decode_all() for name, dictionary in self.dictionaries.items()}
+        labels = strings["labels"]
+        columns = {name: self.columns[name].tolist() for name in COLUMNS}
+        work_columns = [(field, columns[f"work_{field}"], strings[FIELD_DICTIONARY[field]]) for field in WORK_FIELDS]
+        slice_works = columns["slice_works"]
+        slice_subject = columns["slice_subject"]
+        thinker_slices = columns["thinker_slices"]
+
+        thinker_names = zip(columns["thinker_collection"], columns["thinker_name"])
+        for position, (collection_id, name_id) in enumerate(thinker_names):
+            collection, thinker = labels[collection_id], labels[name_id]
+            for slice_position in range(thinker_slices[position], thinker_slices[position + 1]):
+                start, end = slice_works[slice_position], slice_works[slice_position + 1]
+                works: List[Dict[str, str]] = [{} for _ in range(end - start)]
+                for field, column, values in work_columns:
+                    for work, string_id in zip(works, column[start:end]):
+                        if string_id:
+                            work[field] = values[string_id]
+                yield collection, thinker, labels[slice_subject[slice_position]], works
+
+
+def verify_store(data_dir: Path, store_file: Path) -> int:
+    mismatches = 0
+    with WorksStore(store_file) as store:
+        for collection, thinker, subject, thinker_dir in iter_works_files(data_dir):
+            expected = read_subject_works(thinker_dir, subject)
+            expected = [{field: work[field] for field in WORK_FIELDS if field in work} for work in expected]
+            if store.works(collection, thinker, subject) != expected:
+                mismatches += 1
+                print(f"[WARN] Mismatch for {thinker_dir / subject}")
+    return mismatches
+
+
+def run_benchmark(data_dir: Path, store_file: Path, samples: int) -> None:
+    files = list(iter_works_files(data_dir))
+    picks = random.Random(0).choices(files, k=samples)
+
+    start = time.perf_counter()
+    store = WorksStore(store_file)
+    open_ms = (time.perf_counter() - start) * 1000
+
+    def time_reads(read) -> List[float]:
+        timings = []
+        for collection, thinker, subject, thinker_dir in picks:
+            start = time.perf_counter()
+            read(collection, thinker, subject, thinker_dir)
+            timings.append((time.perf_counter() - start) * 1e6)
+        return timings
+
+    json_timings = time_reads(lambda c, t, s, thinker_dir: read_subject_works(thinker_dir, s))
+    store_timings = time_reads(lambda c, t, s, thinker_dir: store.works(c, t, s))
+
+    start = time.perf_counter()
+    for _, _, subject, thinker_dir in files:
+        read_subject_works(thinker_dir, subject)
+    json_full_ms = (time.perf_counter() - start) * 1000
+    store.close()
+    # A fresh store, so the full read does not start from strings cached by the slice reads
+    start = time.perf_counter()
+    with WorksStore(store_file) as store:
+        for _slice in store.iter_slices():
+            pass
+    store_full_ms = (time.perf_counter() - start) * 1000
+
+    json_bytes = sum(path.stat().st_size for path in data_dir.glob("*/*/**/*.json"))
+    print(f"Store: {store_file.stat().st_size:,} bytes vs {json_bytes:,} bytes of JSON for {len(files)} subjects")
+    print(f"Opened store in {open_ms:.1f} ms")
+    print(
+        f"Slice read ({samples} samples): JSON median {statistics.median(json_timings):.0f} us, "
+        f"store median {statistics.median(store_timings):.0f} us"
+    )
+    print(f"Full tree read: JSON {json_full_ms:.0f} ms, store {store_full_ms:.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and read the binary columnar works store.")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="Root of the data-v2 tree.")
+    parser.add_argument("--store-file", type=Path, default=DEFAULT_STORE_FILE, help="Path of the store file.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("build", help="Pack the data-v2 works files into the store.")
+    get_parser = subparsers.add_parser("get", help="Print one thinker-subject slice as JSON.")
+    get_parser.add_argument("collection")
+    get_parser.add_argument("thinker")
+    get_parser.add_argument("subject")
+    subparsers.add_parser("verify", help="Check every slice against its JSON file.")
+    bench_parser = subparsers.add_parser("bench", help="Compare slice reads against the JSON tree.")
+    bench_parser.add_argument("--samples", type=int, default=500, help="Number of random slices to read.")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if not args.data_dir.exists():
+            raise FileNotFoundError(f"Data directory not found: {args.data_dir}")
+        stats = build_store(args.data_dir, args.store_file)
+        print(
+            f"Packed {stats['works']} works ({stats['titles']} titles, {stats['urls']} urls) for "
+            f"{stats['thinkers']} thinkers / {stats['slices']} subjects into {args.store_file} ({stats['bytes']:,} bytes)"
+        )
+    elif args.command == "get":
+        with WorksStore(args.store_file) as store:
+            print(json.dumps(store.works(args.collection, args.thinker, args.subject), indent=2, ensure_ascii=False))
+    elif args.command == "verify":
+        mismatches = verify_store(args.data_dir, args.store_file)
+        print("Store matches the JSON tree" if not mismatches else f"{mismatches} slices differ")
+        if mismatches:
+            sys.exit(1)
+    else:
+        run_benchmark(args.data_dir, args.store_file, args.samples)
+
+
+if __name__ == "__main__":
+    run_profiled(main)